@@ -0,0 +1,112 @@
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "playwright"))
+from rate_extractors import HTML_EXTRACTORS, IN_PAGE_EXTRACTOR, EXTRACT_RATES_JS, lxml
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+def load_corpus(corpus_dir):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        with open(path, mode='r', encoding='utf-8') as infile:
+            pages[os.path.basename(path)] = infile.read()
+    return pages
+
+def bench_html_backend(extract_rates, pages, repeat):
+    outputs = {}
+    times_ms = []
+    peaks_kb = []
+    for name, html in pages.items():
+        # tracemalloc slows parsing down, so memory and time are measured in separate passes
+        tracemalloc.start()
+        outputs[name] = extract_rates(html)
+        peaks_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            extract_rates(html)
+            samples.append((time.perf_counter() - started) * 1000)
+        times_ms.append(statistics.median(samples))
+    return outputs, times_ms, peaks_kb
+
+async def bench_in_page_backend(pages, repeat):
+    from playwright.async_api import async_playwright
+    from scrape_single_url import CHROMIUM_ARGS
+    outputs = {}
+    times_ms = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        page = await browser.new_page()
+        try:
+            for name, html in pages.items():
+                await page.set_content(html)
+                outputs[name] = [tuple(item) for item in await page.evaluate(EXTRACT_RATES_JS)]
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await page.evaluate(EXTRACT_RATES_JS)
+                    samples.append((time.perf_counter() - started) * 1000)
+                times_ms.append(statistics.median(samples))
+        finally:
+            await browser.close()
+    return outputs, times_ms, []
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rate extractor backends on the saved page corpus")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directory of saved rate pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed parses per page and backend")
+    parser.add_argument("--browser", action="store_true", help=f"Also benchmark the in-page '{IN_PAGE_EXTRACTOR}' backend (needs Chromium)")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"No pages found in {args.corpus}; run build_corpus.py first", file=sys.stderr)
+        return 2
+
+    backends = {}
+    for name, extract_rates in HTML_EXTRACTORS.items():
+        if name == 'lxml' and lxml is None:
+            print("lxml not installed, skipping the lxml backend", file=sys.stderr)
+            continue
+        backends[name] = bench_html_backend(extract_rates, pages, args.repeat)
+    if args.browser:
+        backends[IN_PAGE_EXTRACTOR] = asyncio.run(bench_in_page_backend(pages, args.repeat))
+
+    results = {'pages': len(pages), 'backends': {}, 'mismatches': []}
+    print(f"{'backend':<10} {'median ms/page':>15} {'p95 ms/page':>12} {'peak py-heap KiB':>17}")
+    for name, (_, times_ms, peaks_kb) in backends.items():
+        p95 = sorted(times_ms)[max(0, int(len(times_ms) * 0.95) - 1)]
+        peak = statistics.median(peaks_kb) if peaks_kb else None
+        results['backends'][name] = {'median_ms': statistics.median(times_ms), 'p95_ms': p95, 'median_peak_kib': peak}
+        peak_text = f"{peak:.1f}" if peak is not None else "n/a"
+        print(f"{name:<10} {statistics.median(times_ms):>15.3f} {p95:>12.3f} {peak_text:>17}")
+
+    reference_name = next(iter(backends))
+    reference_outputs = backends[reference_name][0]
+    for name, (outputs, _, _) in backends.items():
+        for page_name, extracted in outputs.items():
+            if extracted != reference_outputs[page_name]:
+                results['mismatches'].append({'page': page_name, 'backend': name, 'reference': reference_name})
+                print(f"MISMATCH {page_name}: {name} != {reference_name}\n  {extracted}\n  {reference_outputs[page_name]}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, mode='w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, indent=2)
+    if results['mismatches']:
+        print(f"{len(results['mismatches'])} page(s) differ between backends", file=sys.stderr)
+        return 1
+    print(f"All {len(backends)} backends agree on {len(pages)} pages")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
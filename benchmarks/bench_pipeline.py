@@ -0,0 +1,308 @@
+import io
+import os
+import sys
+import glob
+import json
+import time
+import signal
+import asyncio
+import argparse
+import datetime
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "playwright"))
+sys.path.insert(0, REPO_DIR)
+from http_fetcher import HttpConnectionPool, fetch_via_http, parse_fetched
+from credit_union_directory import parse_site_options
+from pipeline import percentile
+from process_stats import ProcessTreeSampler
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+STAND_IN = os.path.join(BENCH_DIR, "stand_in_site.py")
+# Settings that must match for two results to be comparable
+COMPARABLE_SETTINGS = ("sites", "latency", "jitter", "timeout_rate", "error_rate", "dynamic_share", "concurrency", "rate", "repeat")
+
+def latency_summary(durations) -> dict:
+    p50, p95 = percentile(durations, 0.5), percentile(durations, 0.95)
+    return {'count': len(durations),
+            'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 3) if p95 is not None else None}
+
+def start_stand_in(args):
+    """Start stand_in_site.py in its own process (its CPU and memory stay out of the
+    measurements) and return (process, site URL)."""
+    command = [sys.executable, STAND_IN, "--port", "0", "--corpus", args.corpus, "--sites", str(args.sites),
+               "--latency", str(args.latency), "--jitter", str(args.jitter), "--timeout-rate", str(args.timeout_rate),
+               "--hang", str(args.hang), "--error-rate", str(args.error_rate), "--dynamic-share", str(args.dynamic_share)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    url = process.stdout.readline().strip()
+    if not url:
+        process.wait()
+        raise RuntimeError("stand-in site did not start")
+    return process, url
+
+def stop_stand_in(process):
+    process.send_signal(signal.SIGINT) # Lets it print its request counts
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+async def bench_fetch(site_url: str, concurrency: int) -> tuple:
+    """Directory fetch, then fetch_via_http() for every site, `concurrency` at a time.
+    Returns (stats, fetch results)."""
+    pool = HttpConnectionPool(max_idle_per_host=concurrency)
+    started = time.perf_counter()
+    response = await asyncio.to_thread(pool.get, f"{site_url}/start_up.asp")
+    sites = parse_site_options(response.text)
+    directory_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    in_flight = asyncio.Semaphore(concurrency)
+    durations = []
+
+    async def fetch_one(site_id, name):
+        async with in_flight:
+            fetch_started = time.perf_counter()
+            result = await fetch_via_http(pool, name, f"{site_url}/default.asp?siteId={site_id}")
+            durations.append(time.perf_counter() - fetch_started)
+            return result
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    results = await asyncio.gather(*(fetch_one(site_id, name) for site_id, name in sites.items()))
+    wall = time.perf_counter() - wall_started
+    pool.close()
+    stats = {
+        'directory_ms': directory_ms,
+        'pages': len(results),
+        'to_parse': sum(1 for result in results if 'fragment' in result),
+        'errors': sum(1 for result in results if 'fragment' not in result and result['status'] != "SUCCESS"),
+        'pages_per_minute': round(len(results) / wall * 60, 1) if wall > 0 else None,
+        'cpu_seconds': round(time.process_time() - cpu_started, 3),
+        **latency_summary(durations),
+    }
+    return stats, results
+
+def bench_parse(fetched: list, repeat: int) -> dict:
+    """parse_fetched() on every fetched fragment, `repeat` times each (single thread)."""
+    fragments = [result for result in fetched if 'fragment' in result]
+    samples = []
+    per_page = []
+    cpu_started = time.process_time()
+    for result in fragments:
+        page_samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with contextlib.redirect_stderr(io.StringIO()): # One progress line per parse
+                # parse_fetched consumes the fragment, so parse a copy; without the fingerprint
+                # it skips the shared-sheet parse cache and every repeat really parses
+                parse_fetched(dict(result, fingerprint={}))
+            page_samples.append(time.perf_counter() - started)
+        samples.extend(page_samples)
+        per_page.append(statistics.median(page_samples))
+    parse_seconds = sum(per_page)
+    return {
+        'pages': len(fragments),
+        'pages_per_minute': round(len(fragments) / parse_seconds * 60, 1) if parse_seconds > 0 else None,
+        'cpu_seconds': round(time.process_time() - cpu_started, 3),
+        **latency_summary(samples),
+    }
+
+def bench_scrape(site_url: str, args) -> dict:
+    """scrape_mortgage_data() against the stand-in, in a child process with a fresh store,
+    sampling the RSS of its process tree (Python, Playwright driver, Chromium)."""
+    with tempfile.TemporaryDirectory(prefix="bench_scrape_") as output_dir:
+        env = dict(os.environ)
+        env.update({'SCRAPE_SITE_URL': site_url, 'SCRAPE_DB': os.path.join(output_dir, "mortgage_rates.db")})
+        # Politeness limits are for the live site; against the stand-in they would be all we measure
+        env.setdefault('SCRAPE_INITIAL_RATE', str(args.rate))
+        env.setdefault('SCRAPE_MAX_RATE', str(args.rate))
+        env.setdefault('SCRAPE_INITIAL_CONCURRENCY', str(args.concurrency))
+        usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--scrape-child", output_dir, "--concurrency", str(args.concurrency)],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL if not args.verbose else None, text=True, env=env)
+        with ProcessTreeSampler(process.pid) as sampler:
+            output, _ = process.communicate()
+        wall = time.perf_counter() - started
+        usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    lines = output.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        raise RuntimeError(f"scrape child exited with {process.returncode}")
+    summary = json.loads(lines[-1])
+    pages = sum(summary.get('tiers', {}).values())
+    # RUSAGE_CHILDREN covers the whole reaped tree, Chromium included
+    tree_cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    stats = {
+        'pages': pages,
+        'stored': summary['changes']['changed'] + summary['changes']['unchanged'],
+        'tiers': summary.get('tiers', {}),
+        'wall_seconds': round(wall, 3),
+        'pages_per_minute': round(pages / wall * 60, 1) if wall > 0 else None,
+        'cpu_seconds': round(tree_cpu, 3),
+        'python_cpu_seconds': summary['python_cpu_seconds'],
+        'peak_rss_python_mib': round(sampler.peaks['python'] / 2**20, 1),
+        'peak_rss_chromium_mib': round(sampler.peaks['chromium'] / 2**20, 1),
+        'peak_rss_total_mib': round(sampler.peaks['total'] / 2**20, 1),
+        'bottleneck': summary.get('bottleneck'),
+        'stages': {name: {'p50_ms': stage.get('p50_ms'), 'p95_ms': stage.get('p95_ms'), 'per_second': stage.get('per_second'),
+                          'utilization': stage.get('utilization')}
+                   for name, stage in summary.get('pipeline', {}).items() if 'depth' in stage},
+    }
+    return stats
+
+def scrape_child(output_dir: str, concurrency: int):
+    from scrape_mortgage_data import scrape_mortgage_data
+    summary = scrape_mortgage_data("mortgage_rates.csv", concurrency=concurrency, output_dir=output_dir) or {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    summary['python_cpu_seconds'] = round(usage.ru_utime + usage.ru_stime, 3)
+    summary.setdefault('tiers', {})
+    summary.setdefault('changes', {'changed': 0, 'unchanged': 0})
+    print(json.dumps(summary)) # Last stdout line, read by bench_scrape()
+
+def flatten(results: dict) -> dict:
+    """{'scrape.stages.fetch.p95_ms': 12.3, ...} of the numeric metrics of a result."""
+    flat = {}
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f"{prefix}.{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+    for section in ("fetch", "parse", "scrape"):
+        walk(section, results.get(section, {}))
+    return flat
+
+def direction(metric: str) -> int:
+    """+1 when higher is better, -1 when lower is better, 0 for counts and shares."""
+    if metric.endswith("pages_per_minute") or metric.endswith("per_second"):
+        return 1
+    if metric.endswith(("_ms", "_seconds", "_mib")):
+        return -1
+    return 0
+
+def compare(current: dict, previous: dict, threshold: float) -> list:
+    """Print the change of every metric and return the ones worse by more than threshold."""
+    regressions = []
+    previous_flat = flatten(previous)
+    print(f"\nCompared with {previous.get('timestamp')} ({previous.get('label') or previous.get('commit') or 'unlabelled'}):")
+    print(f"{'metric':<42} {'previous':>12} {'current':>12} {'change':>9}")
+    for metric, value in flatten(current).items():
+        sign = direction(metric)
+        old = previous_flat.get(metric)
+        if not sign or old is None:
+            continue
+        change = (value - old) / old if old else 0.0
+        regressed = change * sign < -threshold
+        print(f"{metric:<42} {old:>12} {value:>12} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(metric)
+    return regressions
+
+def latest_result(results_dir: str, settings: dict) -> dict | None:
+    """Most recent saved result whose settings match, so like is compared with like."""
+    for path in sorted(glob.glob(os.path.join(results_dir, "bench-*.json")), reverse=True):
+        with open(path, mode='r', encoding='utf-8') as infile:
+            result = json.load(infile)
+        if all(result.get('settings', {}).get(key) == settings.get(key) for key in COMPARABLE_SETTINGS):
+            return result
+    return None
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_section(name: str, stats: dict):
+    fields = ", ".join(f"{key}={value}" for key, value in stats.items() if not isinstance(value, dict))
+    print(f"{name:<7} {fields}")
+    for stage, stage_stats in stats.get('stages', {}).items():
+        print(f"  {stage:<8} " + ", ".join(f"{key}={value}" for key, value in stage_stats.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the fetch and parse stages and of a whole scrape_mortgage_data() run, against the local stand-in site")
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "corpus"), help="Recorded pages served by the stand-in site")
+    parser.add_argument("--sites", type=int, default=200, help="Sites served (recordings are cloned up to this many)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean injected latency per request, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform +/- jitter around --latency, in seconds")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that hang past the client timeout")
+    parser.add_argument("--hang", type=float, default=35.0, help="Seconds a timed-out request hangs (the HTTP client gives up after 30)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--dynamic-share", type=float, default=0.1, help="Share of pages that need the browser tier")
+    parser.add_argument("--concurrency", type=int, default=8, help="Fetches in flight at once")
+    parser.add_argument("--rate", type=float, default=200.0, help="Scheduler request rate for the scrape run (requests/s)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed parses per page")
+    parser.add_argument("--only", default="fetch,parse,scrape", help="Comma separated subset of fetch, parse, scrape")
+    parser.add_argument("--label", help="Name stored with the result, e.g. the change being measured")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where results are saved as bench-<timestamp>.json")
+    parser.add_argument("--compare", help="Result file to compare with (default: the latest one with the same settings)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a metric regressed")
+    parser.add_argument("--verbose", action="store_true", help="Show the scrape run's stderr")
+    parser.add_argument("--scrape-child", metavar="OUTPUT_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scrape_child:
+        scrape_child(args.scrape_child, args.concurrency)
+        return 0
+
+    only = set(args.only.split(","))
+    settings = {key: getattr(args, key) for key in COMPARABLE_SETTINGS}
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'commit': git_commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'settings': settings,
+    }
+    stand_in, site_url = start_stand_in(args)
+    try:
+        print(f"Stand-in site at {site_url}: {args.sites} sites, latency {args.latency}s +/- {args.jitter}s, "
+              f"timeouts {args.timeout_rate:.0%}, errors {args.error_rate:.0%}, dynamic {args.dynamic_share:.0%}")
+        if only & {"fetch", "parse"}:
+            fetch_stats, fetched = asyncio.run(bench_fetch(site_url, args.concurrency))
+            if "fetch" in only:
+                results['fetch'] = fetch_stats
+                print_section("fetch", fetch_stats)
+            if "parse" in only:
+                results['parse'] = bench_parse(fetched, args.repeat)
+                print_section("parse", results['parse'])
+        if "scrape" in only:
+            results['scrape'] = bench_scrape(site_url, args)
+            print_section("scrape", results['scrape'])
+    finally:
+        stop_stand_in(stand_in)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, mode='r', encoding='utf-8') as infile:
+            previous = json.load(infile)
+    else:
+        previous = latest_result(args.results_dir, settings)
+    os.makedirs(args.results_dir, exist_ok=True)
+    result_path = os.path.join(args.results_dir, f"bench-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(result_path, mode='w', encoding='utf-8') as outfile:
+        json.dump(results, outfile, indent=2)
+    print(f"\nSaved {result_path}")
+
+    if previous is None:
+        print("No earlier result with the same settings to compare with")
+        return 0
+    regressions = compare(results, previous, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1 if args.fail_on_regression else 0
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
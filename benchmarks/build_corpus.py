@@ -0,0 +1,101 @@
+import csv
+import os
+import sys
+import argparse
+
+# Rebuilds benchmarks/corpus/ from mortgage_rates.csv using the markup cumortgage.net
+# serves inside #rate_box (caption per program, sr-only labels before each value).
+# Real pages saved from the site can be dropped into the same directory as *.html.
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{credit_union} - Mortgage Rates</title>
+<link rel="stylesheet" href="/css/bootstrap.min.css">
+<link rel="stylesheet" href="/css/site.css">
+<script src="/js/jquery.min.js"></script>
+<script src="/js/bootstrap.min.js"></script>
+</head>
+<body>
+<header class="navbar navbar-default">
+<div class="container"><a class="navbar-brand" href="default.asp?siteId={site_id}">{credit_union}</a>
+<ul class="nav navbar-nav">{nav_items}</ul></div>
+</header>
+<main class="container">
+<h1>Today's Mortgage Rates</h1>
+<p class="lead">{boilerplate}</p>
+<div id="rate_box" class="row">
+{tables}
+</div>
+<section class="disclosures">{disclosures}</section>
+</main>
+<footer class="footer"><p>{boilerplate}</p></footer>
+<script>var siteId = "{site_id}";</script>
+</body>
+</html>
+"""
+
+TABLE_TEMPLATE = """<div class="col-md-6 rate-table-wrap">
+<table class="table table-striped rates">
+<caption>{caption}</caption>
+<thead><tr><th scope="col">Interest Rate</th><th scope="col">APR</th><th scope="col">Points</th><th scope="col">Sample Payment</th></tr></thead>
+<tbody>
+<tr>
+<td><span class="sr-only">Interest Rate</span>{rate}</td>
+<td><span class="sr-only">APR</span>{apr}</td>
+<td><span class="sr-only">Points</span>0.000</td>
+<td><a class="productDetailsSamplePmt" href="#details">$1,{payment}</a></td>
+</tr>
+</tbody>
+</table>
+</div>"""
+
+BOILERPLATE = "Rates are effective as of today and subject to change without notice. " * 12
+DISCLOSURE = "<p>Annual Percentage Rate (APR) assumes a loan amount of $200,000 with 20% down. Taxes and insurance are not included; actual payment obligation will be greater.</p>"
+
+def program_caption(loan_type):
+    # The site appends the conforming/jumbo limit to most captions
+    if loan_type.startswith("Jumbo"):
+        return f"{loan_type} - Jumbo"
+    if "ARM" in loan_type or "FHA" in loan_type or "VA" in loan_type:
+        return loan_type
+    return f"{loan_type} - Conforming"
+
+def render_page(row):
+    site_id = row['Link'].split('siteId=', 1)[-1]
+    tables = []
+    for index, rate_entry in enumerate(row['Rates'].split('|') if row['Rates'] != "None" else []):
+        loan_type, _, rate = rate_entry.rpartition('-')
+        apr = f"{float(rate.strip('%')) + 0.037:.3f}%" if rate.endswith('%') else "N/A"
+        tables.append(TABLE_TEMPLATE.format(caption=program_caption(loan_type), rate=rate, apr=apr, payment=100 + index * 37))
+    nav_items = "".join(f'<li><a href="#section{i}">Section {i}</a></li>' for i in range(12))
+    return PAGE_TEMPLATE.format(
+        credit_union=row['CreditUnion'], site_id=site_id, nav_items=nav_items,
+        boilerplate=BOILERPLATE, tables="\n".join(tables), disclosures=DISCLOSURE * 20,
+    )
+
+def build_corpus(csv_path, corpus_dir, limit):
+    os.makedirs(corpus_dir, exist_ok=True)
+    with open(csv_path, mode='r', newline='', encoding='utf-8') as infile:
+        rows = list(csv.DictReader(infile))[:limit]
+
+    # Edge cases the extractors must agree on
+    rows.append({'CreditUnion': 'No Rate Box', 'Link': 'default.asp?siteId=NO-RATE-BOX', 'Rates': 'None'})
+    rows.append({'CreditUnion': 'Rate Without Percent', 'Link': 'default.asp?siteId=NO-PERCENT', 'Rates': '30 Year Fixed-Call|15 Year Fixed-4.750%'})
+
+    for index, row in enumerate(rows):
+        html = render_page(row)
+        if row['Rates'] == 'None':
+            html = html.replace('<div id="rate_box" class="row">', '<div id="rate_box_unavailable" class="row">')
+        with open(os.path.join(corpus_dir, f"page_{index:03d}.html"), mode='w', encoding='utf-8') as outfile:
+            outfile.write(html)
+    print(f"Wrote {len(rows)} pages to {corpus_dir}", file=sys.stderr)
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Build the rate page corpus used by the extractor benchmark")
+    parser.add_argument("--csv", default=os.path.join(script_dir, "..", "mortgage_rates.csv"), help="CSV of scraped rates to render pages from")
+    parser.add_argument("--limit", type=int, default=20, help="Number of credit unions to render")
+    args = parser.parse_args()
+    build_corpus(args.csv, os.path.join(script_dir, "corpus"), args.limit)
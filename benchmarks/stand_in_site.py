@@ -0,0 +1,195 @@
+import os
+import re
+import sys
+import glob
+import html
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "playwright"))
+from change_detector import extract_rate_box_fragment
+
+# Local stand-in for mortgages.cumortgage.net serving the recorded pages of
+# benchmarks/corpus/ (see build_corpus.py) as start_up.asp and default.asp?siteId=...
+# Point the scraper at it with SCRAPE_SITE_URL=http://127.0.0.1:<port>.
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+SITE_ID = re.compile(r"""siteId\s*=\s*["']?([\w-]+)""")
+TITLE = re.compile(r"<title>(.*?)(?: - Mortgage Rates)?</title>", re.IGNORECASE | re.DOTALL)
+
+# Dynamic pages ship an empty #rate_box that this script fills in, the way the live site
+# does for some credit unions; only a browser (the scraper's second tier) sees those rates
+RATE_BOX_SCRIPT = """<script>
+fetch("rate_box.asp?siteId={site_id}").then(response => response.text()).then(fragment => {{
+    document.getElementById("rate_box").innerHTML = fragment;
+}});
+</script>
+"""
+
+class RecordedPage:
+    def __init__(self, site_id: str, name: str, body: str):
+        self.site_id = site_id
+        self.name = name
+        self.body = body
+        fragment = extract_rate_box_fragment(body)
+        # Inner HTML of the rate box, served separately to dynamic pages
+        self.rate_box_inner = fragment[fragment.index('>') + 1:fragment.rindex('<')] if fragment else None
+        self.dynamic_body = None
+        if fragment:
+            opening = fragment[:fragment.index('>') + 1]
+            self.dynamic_body = body.replace(fragment, f"{opening}</div>").replace(
+                "</body>", RATE_BOX_SCRIPT.format(site_id=site_id) + "</body>")
+
+def load_recordings(corpus_dir: str, sites: int = 0) -> list:
+    """RecordedPages of corpus_dir/*.html (start_up.html, if recorded, is served as is).
+    With `sites` above the number of recordings, they are cloned under new siteIds."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        if os.path.basename(path) == "start_up.html":
+            continue
+        with open(path, mode='r', encoding='utf-8') as infile:
+            body = infile.read()
+        site_id = SITE_ID.search(body)
+        title = TITLE.search(body)
+        site_id = site_id.group(1) if site_id else os.path.splitext(os.path.basename(path))[0]
+        pages.append(RecordedPage(site_id, html.unescape(title.group(1).strip()) if title else site_id, body))
+    recorded = len(pages)
+    for index in range(recorded, sites if recorded else 0):
+        original = pages[index % recorded]
+        clone_id = f"{original.site_id}-{index // recorded}"
+        pages.append(RecordedPage(clone_id, f"{original.name} {index // recorded}", original.body.replace(original.site_id, clone_id)))
+    return pages
+
+def start_up_page(pages: list) -> str:
+    options = "".join(f'<option value="{html.escape(page.site_id)}">{html.escape(page.name)}</option>' for page in pages)
+    return f'<!DOCTYPE html>\n<html><body><form action="default.asp"><select name="siteId"><option value="0">Select your credit union</option>{options}</select></form></body></html>\n'
+
+class StandInSite:
+    """Recorded pages plus the fault knobs applied to every request: added latency
+    (mean and uniform jitter, in seconds), a share of requests that hang for `hang`
+    seconds and then drop the connection (client timeouts), and a share answered
+    with HTTP 503. `dynamic_share` of the pages fill #rate_box from a script."""
+
+    def __init__(self, pages, start_up=None, latency=0.0, jitter=0.0, timeout_rate=0.0, hang=60.0,
+                 error_rate=0.0, dynamic_share=0.0, seed=0):
+        self.pages = {page.site_id: page for page in pages}
+        self.start_up = start_up or start_up_page(pages)
+        self.latency = latency
+        self.jitter = jitter
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.dynamic = {page.site_id for page in pages if page.dynamic_body and self.random.random() < dynamic_share}
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'errors': 0, 'timeouts': 0, 'not_modified': 0}
+
+    def draw(self):
+        """(delay, fault) for one request; fault is None, 'timeout' or 'error'."""
+        with self.lock:
+            self.counts['requests'] += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            roll = self.random.random()
+            fault = 'timeout' if roll < self.timeout_rate else 'error' if roll < self.timeout_rate + self.error_rate else None
+            if fault:
+                self.counts[f"{fault}s"] += 1
+            return delay, fault
+
+    def respond(self, path: str, query: dict) -> tuple:
+        """(status, body) for a GET."""
+        site_id = query.get('siteId', [''])[0]
+        if path.endswith("/start_up.asp"):
+            return 200, self.start_up
+        page = self.pages.get(site_id)
+        if path.endswith("/default.asp") and page:
+            return 200, page.dynamic_body if site_id in self.dynamic else page.body
+        if path.endswith("/rate_box.asp") and page and page.rate_box_inner is not None:
+            return 200, page.rate_box_inner
+        return 404, "<html><body>Not found</body></html>"
+
+def make_handler(site: StandInSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the live site
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            delay, fault = site.draw()
+            if fault == 'timeout':
+                time.sleep(site.hang)
+                self.close_connection = True
+                return
+            time.sleep(delay)
+            if fault == 'error':
+                self.send_body(503, "<html><body>Service Unavailable</body></html>")
+                return
+            parts = urllib.parse.urlsplit(self.path)
+            status, body = site.respond(parts.path, urllib.parse.parse_qs(parts.query))
+            self.send_body(status, body)
+
+        def send_body(self, status, body):
+            content = body.encode('utf-8')
+            etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                with site.lock:
+                    site.counts['not_modified'] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            if status == 200:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(content)
+    return Handler
+
+def serve(site: StandInSite, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded cumortgage.net pages locally, with injectable latency and faults")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directory of recorded default.asp pages (*.html), optionally with start_up.html")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700, help="0 picks a free port")
+    parser.add_argument("--sites", type=int, default=0, help="Serve this many sites, cloning the recordings under new siteIds")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added latency per request, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter around --latency, in seconds")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that hang for --hang seconds, then drop the connection")
+    parser.add_argument("--hang", type=float, default=60.0, help="Seconds a timed-out request hangs")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--dynamic-share", type=float, default=0.0, help="Share of pages whose #rate_box is filled in by a script")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pages = load_recordings(args.corpus, args.sites)
+    if not pages:
+        print(f"No recorded pages in {args.corpus}; run build_corpus.py first", file=sys.stderr)
+        sys.exit(2)
+    start_up = None
+    if os.path.exists(os.path.join(args.corpus, "start_up.html")) and not args.sites:
+        with open(os.path.join(args.corpus, "start_up.html"), mode='r', encoding='utf-8') as infile:
+            start_up = infile.read()
+    site = StandInSite(pages, start_up, args.latency, args.jitter, args.timeout_rate, args.hang,
+                       args.error_rate, args.dynamic_share, args.seed)
+    server = serve(site, args.host, args.port)
+    # First stdout line is the site URL, for scripts that start this with --port 0
+    print(f"http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    print(f"[StandIn] Serving {len(pages)} sites ({len(site.dynamic)} dynamic)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[StandIn] {site.counts}", file=sys.stderr)
@@ -3,99 +3,327 @@ import os
 import sys
 import datetime
 import json
-import urllib.parse
+import re
+import gzip
+import hashlib
+import argparse
+from rate_store import RATE_SCALE, rate_to_units
 
-def convert_csv_to_html(csv_file_path, html_file_path, template_path):
-    try:
-        with open(csv_file_path, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.reader(infile)
-            headers = next(reader) # Get headers
-            raw_data = []
-            for row in reader:
-                raw_data.append(row)
-
-            # Update headers list for internal processing
-            if 'Rates(30Years)' in headers:
-                rates_column_index = headers.index('Rates(30Years)')
-                headers[rates_column_index] = 'Rates' # Rename for consistency
-
-            # Process data to store all rates for each credit union
-            processed_credit_unions_data = []
-            for row_data in raw_data:
-                credit_union_name = row_data[headers.index('CreditUnion')]
-                link = row_data[headers.index('Link')]
-                rates_raw = row_data[headers.index('Rates')] # Use new header name
-                best_rate_overall_raw = row_data[headers.index('BestRate')]
-
-                parsed_rates = []
-                if rates_raw != "None":
-                    for rate_entry in rates_raw.split('|'):
-                        parts = rate_entry.rsplit('-', 1) # Split from right, once
-                        if len(parts) == 2:
-                            loan_type_full = parts[0].strip()
-                            rate_str = parts[1].strip()
-                            numeric_rate = None
-                            try:
-                                numeric_rate = float(rate_str.strip('%'))
-                            except ValueError:
-                                pass
-
-                            # Determine simplified loan type for filtering and display
-                            simplified_type = "Conventional"
-                            year_term = None
-                            if "ARM" in loan_type_full.upper():
-                                simplified_type = "ARM"
-                            elif "30 Year Fixed" in loan_type_full:
-                                year_term = "30 Years"
-                            elif "20 Year Fixed" in loan_type_full:
-                                year_term = "20 Years"
-                            elif "15 Year Fixed" in loan_type_full:
-                                year_term = "15 Years"
-                            elif "Jumbo 30 Year Fixed" in loan_type_full:
-                                simplified_type = "Jumbo"
-                                year_term = "30 Years"
-                            elif "Jumbo 15 Year Fixed" in loan_type_full:
-                                simplified_type = "Jumbo"
-                                year_term = "15 Years"
-
-                            parsed_rates.append({
-                                'loanTypeFull': loan_type_full,
-                                'rateStr': rate_str,
-                                'numericRate': numeric_rate,
-                                'simplifiedType': simplified_type,
-                                'yearTerm': year_term # Will be None for ARM or other types
-                            })
-
-                processed_credit_unions_data.append({
-                    'CreditUnion': credit_union_name,
-                    'Link': link,
-                    'Rates': rates_raw, # Use new header name
-                    'BestRateOverall': best_rate_overall_raw, # Keep original best rate
-                    'parsedRates': parsed_rates
+try:
+    import brotli
+except ImportError: # Optional: only the .gz output is written without it
+    brotli = None
+
+try:
+    import payment_engine
+except ImportError: # NumPy is optional: the page is built without payment estimates
+    payment_engine = None
+
+PAYLOAD_VERSION = 3
+# The page is a static shell (mortgage_rates.html) plus this data file, which is the only
+# output that changes with the rates; the manifest records the inputs of the last build.
+DATA_FILENAME = "mortgage_rates_data.js"
+MANIFEST_FILENAME = "mortgage_rates_build.json"
+
+# Filter categories of the page (the loanTypeFilter option values) as (type, term) keys;
+# "all" and "arm" match any term.
+CATEGORIES = {
+    'all': (None, None),
+    'arm': ("ARM", None),
+    'conventional30': ("Conventional", "30 Years"),
+    'conventional20': ("Conventional", "20 Years"),
+    'conventional15': ("Conventional", "15 Years"),
+    'jumbo30': ("Jumbo", "30 Years"),
+    'jumbo15': ("Jumbo", "15 Years"),
+}
+# "30 Year", "20 Yr.", "FHA 30-Year"
+YEAR_TERM = re.compile(r"\b(\d+)\s*-?\s*(?:Year|Yr\b)", re.IGNORECASE)
+# Loan scenarios of the page's payment estimates (home price x down payment share)
+PAGE_HOME_PRICES = (200000, 300000, 400000, 500000, 750000, 1000000)
+PAGE_DOWN_PAYMENTS = (0.10, 0.20)
+
+def classify_program(loan_type_full: str) -> tuple:
+    """(simplified type, year term) of a program name, e.g. "Jumbo 30 Year Fixed" ->
+    ("Jumbo", "30 Years"); ARMs have no term."""
+    upper = loan_type_full.upper()
+    if "ARM" in upper:
+        return "ARM", None
+    simplified_type = "Jumbo" if "JUMBO" in upper else "Conventional"
+    term = YEAR_TERM.search(loan_type_full) if "FIXED" in upper else None
+    return simplified_type, f"{term.group(1)} Years" if term else None
+
+def program_categories(simplified_type, year_term) -> list:
+    return [category for category, (category_type, category_term) in CATEGORIES.items()
+            if category_type in (None, simplified_type) and category_term in (None, year_term)]
+
+def best_rate_index(parsed_rates: list) -> dict:
+    """{category: index into parsed_rates of the lowest rate} for every category the
+    credit union offers a program in; -1 when none of those programs has a numeric rate."""
+    best = {}
+    for index, rate in enumerate(parsed_rates):
+        for category in program_categories(rate['simplifiedType'], rate['yearTerm']):
+            current = best.get(category, -1)
+            if rate['numericRate'] is not None and (current == -1 or rate['numericRate'] < parsed_rates[current]['numericRate']):
+                best[category] = index
+            else:
+                best.setdefault(category, -1)
+    return best
+
+def split_link(link: str) -> tuple:
+    """('https://.../default.asp?siteId=', '1234'): the shared prefix and the per-row suffix."""
+    prefix, separator, suffix = link.partition('siteId=')
+    return (prefix + separator, suffix) if separator else ('', link)
+
+def build_payload(credit_unions: list) -> dict:
+    """Columnar page data: one array per field instead of one object per credit union.
+    Programs and link prefixes are dictionary-encoded, and so are rate sheets:
+    sheet[i] is credit union i's sheet, shared by every credit union posting the
+    same programs and rates. Rates are integers in 1/RATE_SCALE percent (-1: no
+    numeric rate, the text is kept in rateText), and rateStart[s]:rateStart[s + 1]
+    are sheet s's positions in program/rate. best[category][s] is the position of
+    sheet s's best rate in that category, -1 when it has no numeric rate there and
+    -2 when it has no program. With NumPy installed, payments.monthly[k][position] is
+    the whole-dollar monthly payment at that rate for scenario k (homePrice[k],
+    downPayment[k]), -1 without a numeric rate. market, when the build is given the day's
+    market aggregates (market_aggregates.read_aggregates), is their per-category statistics."""
+    program_ids = {}
+    prefix_ids = {}
+    sheet_ids = {}
+    sheets = [] # parsedRates of each sheet, in payload order
+    payload = {
+        'version': PAYLOAD_VERSION,
+        'rateScale': RATE_SCALE,
+        'programs': [],
+        'linkPrefixes': [],
+        'name': [],
+        'linkPrefix': [],
+        'linkSuffix': [],
+        'sheet': [],
+        'rateStart': [0],
+        'program': [],
+        'rate': [],
+        'rateText': {},
+        'best': {category: [] for category in CATEGORIES},
+    }
+    for credit_union in credit_unions:
+        prefix, suffix = split_link(credit_union['Link'])
+        if prefix not in prefix_ids:
+            prefix_ids[prefix] = len(payload['linkPrefixes'])
+            payload['linkPrefixes'].append(prefix)
+        payload['name'].append(credit_union['CreditUnion'])
+        payload['linkPrefix'].append(prefix_ids[prefix])
+        payload['linkSuffix'].append(suffix)
+        if credit_union['sheet'] in sheet_ids:
+            payload['sheet'].append(sheet_ids[credit_union['sheet']])
+            continue
+        sheet_ids[credit_union['sheet']] = len(sheet_ids)
+        payload['sheet'].append(sheet_ids[credit_union['sheet']])
+        sheets.append(credit_union['parsedRates'])
+
+        first_position = len(payload['rate'])
+        for rate in credit_union['parsedRates']:
+            if rate['loanTypeFull'] not in program_ids:
+                program_ids[rate['loanTypeFull']] = len(payload['programs'])
+                payload['programs'].append(rate['loanTypeFull'])
+            units = rate_to_units(rate['rateStr'])
+            if units is None or f"{units / RATE_SCALE:.3f}%" != rate['rateStr']:
+                payload['rateText'][len(payload['rate'])] = rate['rateStr'] # Not reproducible from the integer
+            payload['program'].append(program_ids[rate['loanTypeFull']])
+            payload['rate'].append(-1 if units is None else units)
+        payload['rateStart'].append(len(payload['rate']))
+
+        best = credit_union['best']
+        for category, column in payload['best'].items():
+            index = best.get(category, -2)
+            column.append(first_position + index if index >= 0 else index)
+
+    if payment_engine is not None:
+        prices, downs, principals = payment_engine.scenario_grid(PAGE_HOME_PRICES, PAGE_DOWN_PAYMENTS)
+        engine = payment_engine.PaymentEngine(sheets)
+        payload['payments'] = {
+            'homePrice': [int(price) for price in prices],
+            'downPayment': [float(down) for down in downs],
+            'monthly': payment_engine.monthly_payments_by_position(engine, sheets, principals),
+        }
+    return payload
+
+def write_precompressed(path: str, content: bytes) -> dict:
+    """Write path.gz (and path.br when brotli is installed) next to path; returns their sizes."""
+    sizes = {}
+    with open(f"{path}.gz", mode='wb') as outfile:
+        outfile.write(gzip.compress(content, compresslevel=9, mtime=0))
+    sizes['gz'] = os.path.getsize(f"{path}.gz")
+    if brotli is not None:
+        with open(f"{path}.br", mode='wb') as outfile:
+            outfile.write(brotli.compress(content, quality=11))
+        sizes['br'] = os.path.getsize(f"{path}.br")
+    return sizes
+
+def parse_rate_sheet(rates_raw: str) -> tuple:
+    """(parsedRates, best) of one CSV 'Rates' value."""
+    parsed_rates = []
+    if rates_raw != "None":
+        for rate_entry in rates_raw.split('|'):
+            parts = rate_entry.rsplit('-', 1) # Split from right, once
+            if len(parts) == 2:
+                loan_type_full = parts[0].strip()
+                rate_str = parts[1].strip()
+                units = rate_to_units(rate_str)
+                numeric_rate = None if units is None else units / RATE_SCALE
+
+                # Classified once here; the page only looks up the precomputed best rates
+                simplified_type, year_term = classify_program(loan_type_full)
+
+                parsed_rates.append({
+                    'loanTypeFull': loan_type_full,
+                    'rateStr': rate_str,
+                    'numericRate': numeric_rate,
+                    'simplifiedType': simplified_type,
+                    'yearTerm': year_term # Will be None for ARM or other types
                 })
+    return parsed_rates, best_rate_index(parsed_rates) # Best program per filter category
+
+def read_credit_unions(csv_file_path: str) -> list:
+    """Parse the CSV into [{'CreditUnion', 'Link', 'sheet', 'parsedRates', 'best'}] rows.
+    Each distinct Rates value ('sheet') is parsed and ranked once; credit unions posting
+    the same sheet share its parsedRates and best."""
+    with open(csv_file_path, mode='r', newline='', encoding='utf-8') as infile:
+        reader = csv.reader(infile)
+        headers = next(reader) # Get headers
+        raw_data = []
+        for row in reader:
+            raw_data.append(row)
+
+        # Update headers list for internal processing
+        if 'Rates(30Years)' in headers:
+            rates_column_index = headers.index('Rates(30Years)')
+            headers[rates_column_index] = 'Rates' # Rename for consistency
+
+        # Process data to store all rates for each credit union
+        processed_credit_unions_data = []
+        sheets = {}
+        for row_data in raw_data:
+            credit_union_name = row_data[headers.index('CreditUnion')]
+            link = row_data[headers.index('Link')]
+            rates_raw = row_data[headers.index('Rates')] # Use new header name
+            if rates_raw not in sheets:
+                sheets[rates_raw] = parse_rate_sheet(rates_raw)
+            parsed_rates, best = sheets[rates_raw]
+
+            processed_credit_unions_data.append({
+                'CreditUnion': credit_union_name,
+                'Link': link,
+                'sheet': rates_raw,
+                'parsedRates': parsed_rates,
+                'best': best
+            })
+
+    return processed_credit_unions_data
+
+def write_output(path: str, content: bytes) -> dict:
+    """Atomically replace path (temp file + rename) and its precompressed variants; returns sizes."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, mode='wb') as outfile:
+        outfile.write(content)
+    os.replace(temp_path, path)
+    return {'raw': len(content), **write_precompressed(path, content)}
 
-            # Convert processed data to a URL-encoded JSON string for safe embedding in JS
-            json_data_for_js_encoded = urllib.parse.quote(json.dumps(processed_credit_unions_data))
+def file_hash(path: str) -> str:
+    with open(path, mode='rb') as infile:
+        return hashlib.sha256(infile.read()).hexdigest()
 
-        # Read the HTML template file
+def format_sizes(sizes: dict) -> str:
+    return ", ".join(f"{kind} {size} bytes" for kind, size in sizes.items())
+
+def build_site(csv_file_path, html_file_path, template_path, force=False, market=None) -> bool:
+    """Incremental build of the page: the shell (html_file_path, from the template) and the
+    data file (DATA_FILENAME next to it, from the CSV and the optional market aggregates) are
+    each rebuilt only when their input's hash differs from the build manifest. The shell
+    loads the data file as DATA_FILENAME?v=<hash of its content>, so caches never pair a new
+    shell with an old data file; the shell is rewritten whenever that hash changes.
+    Returns True if anything was written."""
+    output_dir = os.path.dirname(os.path.abspath(html_file_path))
+    data_file_path = os.path.join(output_dir, DATA_FILENAME)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, mode='r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    if manifest.get('version') != PAYLOAD_VERSION:
+        force = True # Output format changed since the last build
+
+    # 'builder' and 'payments': this file and the payment engine, so a change to the classification,
+    # payload or payment math rebuilds the data file
+    inputs = {'csv': file_hash(csv_file_path), 'template': file_hash(template_path), 'builder': file_hash(__file__),
+              'payments': file_hash(payment_engine.__file__) if payment_engine is not None else None,
+              'market': hashlib.sha256(json.dumps(market, sort_keys=True).encode('utf-8')).hexdigest() if market else None}
+    rebuilt = []
+    data_hash = manifest.get('data')
+    if data_hash is None and os.path.exists(data_file_path):
+        data_hash = file_hash(data_file_path)[:12] # Manifest from before versioned data URLs
+    if (force or manifest.get('csv') != inputs['csv'] or manifest.get('builder') != inputs['builder'] or manifest.get('payments') != inputs['payments']
+            or manifest.get('market') != inputs['market'] or not os.path.exists(data_file_path)):
+        payload = build_payload(read_credit_unions(csv_file_path))
+        if market:
+            payload['market'] = market
+        payload['dataVersion'] = inputs['csv'][:12]
+        payload['generated'] = datetime.datetime.now().isoformat(timespec='seconds')
+        # Columnar JSON is a valid JS object literal; "</" is escaped in case it is ever inlined
+        data_script = "window.mortgageRatesData = {};\n".format(json.dumps(payload, separators=(',', ':')).replace('</', '<\\/'))
+        sizes = write_output(data_file_path, data_script.encode('utf-8'))
+        data_hash = hashlib.sha256(data_script.encode('utf-8')).hexdigest()[:12]
+        rebuilt.append(f"data {DATA_FILENAME} (version {payload['dataVersion']}, hash {data_hash}): {format_sizes(sizes)}")
+    inputs['data'] = data_hash
+    if (force or manifest.get('template') != inputs['template'] or manifest.get('data') != data_hash
+            or not os.path.exists(html_file_path)):
         with open(template_path, mode='r', encoding='utf-8') as template_file:
             html_template = template_file.read()
+        # The shell has no data in it, only the versioned URL of the data file
+        sizes = write_output(html_file_path, html_template.format(data_src=f"{DATA_FILENAME}?v={data_hash}").encode('utf-8'))
+        rebuilt.insert(0, f"shell {os.path.basename(html_file_path)}: {format_sizes(sizes)}")
 
-        # Format the template with the dynamic JSON data (no encoded JS logic needed now)
-        html_content = html_template.format(json_data_for_js_encoded=json_data_for_js_encoded)
+    if not rebuilt:
+        print(f"'{csv_file_path}' and '{template_path}' unchanged since the last build, nothing to do")
+        return False
+    with open(manifest_path, mode='w', encoding='utf-8') as manifest_file:
+        json.dump({'version': PAYLOAD_VERSION, **inputs, 'built': datetime.datetime.now().isoformat(timespec='seconds')}, manifest_file, indent=1)
+    print("Successfully converted '{}' to '{}'".format(csv_file_path, html_file_path))
+    for line in rebuilt:
+        print(f"Rebuilt {line}")
+    return True
 
-        with open(html_file_path, mode='w', encoding='utf-8') as outfile:
-            outfile.write(html_content)
-        print("Successfully converted '{}' to '{}'".format(csv_file_path, html_file_path))
+def convert_csv_to_html(csv_file_path, html_file_path, template_path, force=False, market=None) -> bool | None:
+    """build_site() with errors reported on stderr; None when the build failed."""
+    try:
+        return build_site(csv_file_path, html_file_path, template_path, force=force, market=market)
     except FileNotFoundError:
         print("Error: One of the required files (CSV, HTML template) was not found.", file=sys.stderr)
     except Exception as e:
         print("An error occurred: {}".format(e), file=sys.stderr)
+    return None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build mortgage_rates.html and its data file from mortgage_rates.csv")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the inputs are unchanged")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(__file__)
     csv_input_path = os.path.join(script_dir, "mortgage_rates.csv")
     html_output_path = os.path.join(script_dir, "mortgage_rates.html")
     html_template_path = os.path.join(script_dir, "mortgage_rates_base64_template.html")
-    
-    convert_csv_to_html(csv_input_path, html_output_path, html_template_path)
+
+    # Latest market aggregates from the rate store, when it and NumPy are there
+    market = None
+    db_path = os.environ.get("SCRAPE_DB") or os.path.join(script_dir, "mortgage_rates.db")
+    if os.path.exists(db_path):
+        try:
+            from market_aggregates import read_aggregates # Imported here: it imports this module
+            from rate_store import RateStore
+            store = RateStore(db_path)
+            market = read_aggregates(store.conn)
+            store.close()
+        except ImportError:
+            pass
+
+    convert_csv_to_html(csv_input_path, html_output_path, html_template_path, force=args.force, market=market)
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import datetime
+import numpy as np
+
+from rate_store import RATE_SCALE, RateStore, rate_to_units
+from run_state import exported_site_ids
+from convert_csv_to_html import CATEGORIES, classify_program, program_categories
+
+PERCENTILES = (10, 25, 50, 75, 90)
+STAT_COLUMNS = ('min_rate', 'p10', 'p25', 'median', 'p75', 'p90', 'max_rate', 'mean')
+INITIAL_CAPACITY = 256 # Credit union slots per category array; doubled as needed
+
+_program_categories = {}
+
+def categories_of(program: str) -> list:
+    """Filter categories of a program name, classified once per name (convert_csv_to_html rules)."""
+    categories = _program_categories.get(program)
+    if categories is None:
+        categories = _program_categories[program] = program_categories(*classify_program(program))
+    return categories
+
+def best_by_category(programs) -> dict:
+    """{category: lowest rate in units} over [(program, rate text)], programs without a numeric rate skipped."""
+    best = {}
+    for program, rate_str in programs:
+        units = rate_to_units(rate_str)
+        if units is None:
+            continue
+        for category in categories_of(program):
+            if units < best.get(category, units + 1):
+                best[category] = units
+    return best
+
+class MarketAggregates:
+    """Market-wide statistics of one day per loan category: how many credit unions offer
+    the category, and the min, 10/25/50/75/90th percentiles, max and mean of their best
+    rate in it, plus the change of the min and median since the previous stored day.
+
+    Each credit union holds one slot in a NumPy array per category (NaN: no numeric rate
+    there). A stored result overwrites its credit union's slots and marks the categories
+    whose value moved; flush() recomputes only those categories from the arrays and
+    upserts them into the market_aggregates table, so nothing rereads the results.
+    Rates are integers in 1/RATE_SCALE percent, like the rest of the store."""
+
+    def __init__(self, conn, run_date: str):
+        self.conn = conn
+        self.run_date = run_date
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS market_aggregates (
+                run_date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                credit_unions INTEGER NOT NULL,
+                min_rate INTEGER,
+                p10 INTEGER,
+                p25 INTEGER,
+                median INTEGER,
+                p75 INTEGER,
+                p90 INTEGER,
+                max_rate INTEGER,
+                mean INTEGER,
+                min_change INTEGER,
+                median_change INTEGER,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_date, category)
+            ) WITHOUT ROWID""")
+        self.conn.commit()
+        self.slots = {} # siteId -> slot in the category arrays
+        self.rates = {category: np.full(INITIAL_CAPACITY, np.nan) for category in CATEGORIES}
+        self.dirty = set()
+        self.previous = self._previous_day()
+
+    def _previous_day(self) -> dict:
+        """{category: (min_rate, median)} of the latest stored day before run_date."""
+        cursor = self.conn.execute("""
+            SELECT category, min_rate, median FROM market_aggregates
+            WHERE run_date = (SELECT MAX(run_date) FROM market_aggregates WHERE run_date < ?)""", (self.run_date,))
+        return {category: (min_rate, median) for category, min_rate, median in cursor}
+
+    def update(self, site_id: str, programs) -> set:
+        """Replace one credit union's best rates with those of [(program, rate text)]; returns
+        the categories whose value changed (flushed on the next flush())."""
+        slot = self.slots.get(site_id)
+        if slot is None:
+            slot = self.slots[site_id] = len(self.slots)
+            capacity = len(self.rates['all'])
+            if slot >= capacity:
+                for category, column in self.rates.items():
+                    self.rates[category] = np.concatenate([column, np.full(capacity, np.nan)])
+        best = best_by_category(programs)
+        changed = set()
+        for category, column in self.rates.items():
+            value = best.get(category, np.nan)
+            old = column[slot]
+            if not (old == value or (np.isnan(old) and np.isnan(value))):
+                column[slot] = value
+                changed.add(category)
+        self.dirty |= changed
+        return changed
+
+    def seed(self, rate_store: RateStore, site_ids=None):
+        """Load the rates in effect on run_date (one query), e.g. those of the credit unions a
+        run will not rewrite because they did not change, and flush every category. Only the
+        credit unions in `site_ids` count, by default those of run_date's CSV export
+        (run_state.exported_site_ids; all with rates in effect for a day without run state);
+        any other credit union already in the arrays is cleared."""
+        wanted = set(site_ids) if site_ids is not None else exported_site_ids(self.conn, self.run_date)
+        programs = {}
+        for site_id, _, program, rate, _ in rate_store.rates_on(self.run_date):
+            if wanted is not None and site_id not in wanted:
+                continue
+            programs.setdefault(site_id, []).append((program, None if rate is None else f"{rate:.3f}%"))
+        for site_id in self.slots:
+            if site_id not in programs:
+                self.update(site_id, [])
+        for site_id, site_programs in programs.items():
+            self.update(site_id, site_programs)
+        self.dirty = set(CATEGORIES)
+        self.flush()
+
+    def statistics(self, category: str) -> dict:
+        values = self.rates[category][:len(self.slots)]
+        values = values[~np.isnan(values)]
+        stats = {'credit_unions': int(values.size)}
+        if values.size:
+            quantiles = np.percentile(values, PERCENTILES)
+            stats.update(zip(STAT_COLUMNS, [round(value) for value in (values.min(), *quantiles, values.max(), values.mean())]))
+        else:
+            stats.update(dict.fromkeys(STAT_COLUMNS))
+        previous_min, previous_median = self.previous.get(category, (None, None))
+        stats['min_change'] = stats['min_rate'] - previous_min if stats['min_rate'] is not None and previous_min is not None else None
+        stats['median_change'] = stats['median'] - previous_median if stats['median'] is not None and previous_median is not None else None
+        return stats
+
+    def flush(self, commit: bool = True) -> int:
+        """Recompute and store the categories changed since the last flush; returns how many."""
+        flushed = 0
+        for category in sorted(self.dirty):
+            stats = self.statistics(category)
+            self.conn.execute(f"""
+                INSERT OR REPLACE INTO market_aggregates (run_date, category, credit_unions, {', '.join(STAT_COLUMNS)},
+                    min_change, median_change, updated_at)
+                VALUES (?, ?, ?, {', '.join('?' for _ in STAT_COLUMNS)}, ?, ?, ?)""",
+                (self.run_date, category, stats['credit_unions'], *[stats[column] for column in STAT_COLUMNS],
+                 stats['min_change'], stats['median_change'], datetime.datetime.now().isoformat(timespec='seconds')))
+            flushed += 1
+        self.dirty.clear()
+        if commit:
+            self.conn.commit()
+        return flushed
+
+def read_aggregates(conn, run_date: str | None = None) -> dict:
+    """{category: {'creditUnions', 'min', 'p10', ..., 'minChange', 'medianChange'}} stored for
+    run_date (default: the latest day aggregated), rates in 1/RATE_SCALE percent; the shape
+    the page payload carries as 'market'."""
+    try:
+        cursor = conn.execute(f"""
+            SELECT category, credit_unions, {', '.join(STAT_COLUMNS)}, min_change, median_change
+            FROM market_aggregates WHERE run_date = COALESCE(?, (SELECT MAX(run_date) FROM market_aggregates))""", (run_date,))
+    except sqlite3.OperationalError as e: # No table yet: nothing aggregated
+        print(f"[MarketAggregates] Could not read the aggregates of {run_date}: {e}", file=sys.stderr)
+        return {}
+    keys = ('creditUnions', 'min', 'p10', 'p25', 'median', 'p75', 'p90', 'max', 'mean', 'minChange', 'medianChange')
+    return {row[0]: dict(zip(keys, row[1:])) for row in cursor}
+
+def rebuild(rate_store: RateStore, start_date: str, end_date: str) -> int:
+    """Recompute the aggregates of every day between two ISO dates from the stored history,
+    oldest first so each day's change is against the day before, each over the credit unions
+    that day's export held (see MarketAggregates.seed). Returns the number of days."""
+    day = datetime.date.fromisoformat(start_date)
+    days = 0
+    while day <= datetime.date.fromisoformat(end_date):
+        MarketAggregates(rate_store.conn, day.isoformat()).seed(rate_store)
+        day += datetime.timedelta(days=1)
+        days += 1
+    return days
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Market-wide rate statistics per loan category and day")
+    parser.add_argument("--db", default=os.environ.get("SCRAPE_DB") or os.path.join(script_dir, "mortgage_rates.db"), help="Path to the rate store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    show_parser = subparsers.add_parser("show", help="Stored aggregates of one date")
+    show_parser.add_argument("date", nargs="?", default=datetime.date.today().isoformat(), help="YYYY-MM-DD (default: today)")
+    rebuild_parser = subparsers.add_parser("rebuild", help="Recompute the aggregates of a date range from the rate history")
+    rebuild_parser.add_argument("start_date", help="YYYY-MM-DD")
+    rebuild_parser.add_argument("end_date", nargs="?", help="YYYY-MM-DD (default: start_date)")
+    args = parser.parse_args()
+
+    store = RateStore(args.db)
+    if args.command == "rebuild":
+        days = rebuild(store, args.start_date, args.end_date or args.start_date)
+        print(f"Recomputed the market aggregates of {days} days")
+    else:
+        aggregates = read_aggregates(store.conn, args.date)
+        json.dump({category: {key: value / RATE_SCALE if value is not None and key != 'creditUnions' else value
+                              for key, value in stats.items()} for category, stats in aggregates.items()}, sys.stdout, indent=1)
+        print()
+    store.close()
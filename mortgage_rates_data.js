@@ -0,0 +1 @@
+window.mortgageRatesData = {"version":3,"rateScale":1000,"programs":["30 Year Fixed","20 Year Fixed","15 Year Fixed","5/5 Year ARM","Jumbo 30 Year Fixed","15/15 ARM 1","Jumbo 15 Year Fixed","FHA 30-Year Fixed","VA 30 Year Fixed","7/1 Year ARM","5/1 Year ARM","3/1 Year ARM","30 Year Fixed - 3% Down Pmt","10/1 Year ARM","5/5 ARM","20 Yr. Fixed","10 Yr. Fixed","15 Yr. Fixed","20 Year Fixed.","15 Year Fixed.","10 Year Fixed","15/15 ARM"],"linkPrefixes":["https://mortgages.cumortgage.net/default.asp?siteId="],"name":["ACT 1st Federal Credit Union","Advantage Financial Federal Credit Union","AFLCIO Employees Federal Credit Union","Agriculture Federal Credit Union","American Partners Federal Credit Union","Andrews Federal Credit Union","APCI Federal Credit Union","APL Federal Credit Union","APL Federal Credit Union Home Equity","Apple Federal Credit Union","Arlington Community Federal Credit Union","Autotruck Financial Credit Union","Beach Municipal Federal Credit Union","Blackstone River Federal Credit Union","Bragg Mutual Federal Credit Union","BrownForman Employees Credit Union","Canandaigua Federal Credit Union","Census Federal Credit Union","Chessie Federal Credit Union","Civic FCU Employees Only","Civic Federal Credit Union","Credit Union Employees Only","Credit Union Mortgage","Credit Union Mortgage  Retail","CUMA Employees Only","CUMALSI","Dakota Plains Federal Credit Union","DC Federal Credit Union","Democracy Federal Credit Union","Destinations Credit Union","EP Federal Credit Union","F R B Federal Credit Union","FAA Federal Credit Union","FedChoice Federal Credit Union","Fieldstone Credit Union","Firefighters First Federal Credit Union","First American Credit Union","First Eagle Federal Credit Union","Five Star of Maryland Federal Credit Union","Florida A&M University Federal Credit Union","Fort Bragg Federal Credit Union","Freedom of Maryland Federal Credit Union","Front Royal Federal Credit Union","Genesee Coop Federal Credit Union","Gold Coast Federal Credit Union","Government Printing Office Federal Credit Union","Greater Niagara Federal Credit Union","GSA Federal Credit Union","Guardians Credit Union","Guthrie Community Credit Union","Hampton Roads Educators Credit Union","HealthCare Associates Credit Union","Healthcare Employees Federal Credit Union","Healthcare Systems Federal Credit Union","Henrico Federal Credit Union","High Desert Community Credit Union","Howard County Education Federal Credit Union","HUD Federal Credit Union","InFirst Federal Credit Union","IngersollRand Federal Credit Union","Interior Federal","Jackson River Community Credit Union","Jemez Valley Credit Union","Kemba Roanoke Federal Credit Union","Labor Federal Credit Union","Loudoun Credit Union","Loyalty Credit Union","Market USA Federal Credit Union","Medisys Employees Federal Credit Union","Molokai Community Federal Credit Union","Money One Federal Credit Union","Muskogee Federal Credit Union","N A E Federal Credit Union","Newport News Municipal Employees Credit Union","None Suffer Lack Federal Credit Union","Northeast Community Federal Credit Union","Northwest Federal Credit Union","O and R Utilities Employees Federal Credit Union","OAS Staff Federal Credit Union","OC Federal Credit Union","PAHO/WHO Federal Credit Union","Palisades Federal Credit Union","Patent and Trademark Office Federal Credit Union","Patriot Equity Credit Union","Peake Federal Credit Union","Peoples Advantage Federal Credit Union","Piedmont Advantage Credit Union","Police Federal Credit Union","Port of Hampton Roads ILA Federal Credit Union","Post Office Employees Credit Union","Prince Georges Community Federal Credit Union","Quest Federal Credit Union","River City Federal Credit Union","Rural Cooperatives Credit Union Inc","RVA Financial Federal Credit Union","SkyPoint Federal Credit Union","Southern Chautauqua Federal Credit Union","Spencerport Federal Credit Union","Spero Financial Federal Credit Union","St Pius X Church Federal Credit Union","State Department Federal Credit Union","Stepping Stones Community Federal Credit Union","Strategic Federal Credit Union","Susquehanna Valley Federal Credit Union","The United Methodist Credit Union","tnConnect Credit Union","Topside Federal Credit Union","Town of Cheektowaga Federal Credit Union","Transportation Federal Credit Union","Treasury Department Federal Credit Union","TruEnergy Federal Credit Union","UHS Employees Federal Credit Union","US Postal Service Federal Credit Union","US Postal Service Federal Credit Union  Relo","Ulster Federal Credit Union","United Local Credit Union","United States Senate Federal Credit Union","Upstate Federal Credit Union","We Florida Financial","WSSC Federal Credit Union","WVU Employees Federal Credit Union","XCEL Federal Credit Union","Your Best Credit Union"],"linkPrefix":[0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0],"linkSuffix":["19A8538A-275B-48C3-B178-135960E426A5","89A7CB7E-CA50-420E-A902-A60DF2A870BD","C1F6DBB4-762D-4B27-9741-459D6025E2B2","6E5CC923-F933-40CA-B1B0-A20A68D95F94","35C5411C-7A2C-4B22-BD97-02FC6D8A5BCE","62164F8D-49F1-47B5-895E-4C4F7558EF83","F4E0E245-3E84-414B-82ED-D879425EE640","C9796FA5-9A5E-4F21-824D-F88F5CF17F28","432AF8BF-268B-4EE9-985E-849DC58D73EF","3A1B0044-C042-4C1D-ADC6-984B4E4AE66E","EFE2F354-28CC-4C97-9690-04B28CE15AD7","A7FC4327-2340-45D1-AF41-4127E7EB9BEA","254A10C8-8BC6-48BE-B89D-C1ADA101EB65","70B8287F-21B7-4EA5-B48B-0F21609154B5","61976FE1-B5E2-4F2A-A159-9385FC8A3A2A","6CC9B22B-FD9B-47BB-BF8C-98123B2BA5BD","BA4B8C2F-8B87-4326-B309-19B7801636EE","652FCC4F-51F6-4674-92E7-D6C19F1EFC02","B7F133AA-1CD3-4152-849C-9A4B370F9A98","2A907B66-4776-41AA-9272-79894AB26397","4087C423-821C-451F-92DD-EE5E931B7E99","9D872503-B0A8-4552-9749-425F3197E743","2B8C95D8-7B93-4949-BF83-DBAD2514C6CB","C0914E58-C400-4F9B-B78C-C41C5A04E17A","0FB50884-39D7-4F58-B428-F48302A5DBC2","E415A428-4A9A-4C53-B75A-3B14E5C117C0","24913549-04D0-4A65-8FA8-FD788A533FC4","AA35CE55-E768-48F1-A3CD-9407521E7CA6","671706E8-76E9-45CB-AC00-DB9F7A50FD77","A7476438-8CE5-4015-A01E-5A027FA6957D","F5855795-99A7-4FFC-8B96-7408D2340B5E","762E3A02-114D-48C2-95E3-2069380F6125","0B09E938-2D30-4482-87C4-F0B636AB737D","493F19CB-9B4C-4F01-8807-241987166E35","85FD3DC2-B23A-4F65-A6D5-88B4748F8748","3799D442-E132-494D-9271-CAF0F83DCD70","F3626724-9BF4-401B-B07F-10A1078C9D9A","8B3C5791-C16C-4B47-84A5-3F865802AECB","C529D915-8CB6-4462-9233-604B6DF3CB59","DE826C6A-D89F-4863-A430-1D6D59245BB4","3DC48A2C-EFAC-4682-A32A-0728D269CFCD","EBACE7AF-6F14-42A6-9FC1-D1380F6E9A80","C0391878-2D80-4F1E-B5F5-0A1B4AB5A663","C2CF0F4D-7CFA-461D-9E0A-EBE80CC1C1BF","53189796-EE2D-444C-B4CD-F4D7D260102F","2036C20B-8970-488B-9338-0B74ACC4122F","70832813-9C0B-462F-8671-5CC63EF5A51C","7BAD6EAD-27D6-435F-9A65-2499780C5307","2074FB0B-A552-425C-B60D-FD52A36A6C82","95D089B8-52B8-41AB-BC22-950DFC44112F","24223EF5-90EE-4A4A-BFB4-64DC4518FDE5","F7B22BB1-FCBD-4A3D-A2C2-2BB655E300AC","3140EFB7-2704-4E63-BEAD-A9814BEA19FA","38D63B97-52A9-4E49-8BA2-F996D6593E5C","E9EAF897-7A7E-4BD2-AFA4-B1A156A354FB","F28967C7-C10C-48D8-9FA5-06EE08A74275","A7039C62-3DF5-4526-8399-5AC472FBCC88","5DC4A4D9-D04E-4346-AA7A-E1C9E552EFCD","E656227A-7812-43D9-B2D6-E0E6CADCD9C5","1811D9BF-694C-4ABA-8699-ADF35E81C7AB","54990627-321E-441F-991E-998E4B5E0F20","4C1C9653-2775-4B8A-92A8-856945F0CC1B","29CE38C6-B3EA-4BB4-8DC3-EAA8ECE5F932","F488BC1F-EBC0-4F58-A85F-9225873F164C","15875CEF-86CC-4F7E-B2EC-9D673FEFBE90","6F5E5671-AB36-4147-A09E-A1093555709A","1BC3909E-84A4-46D1-89CD-A54304B54E8A","01879C10-0545-4789-A202-5047D7C80742","7DAB951A-023B-4EDD-AB49-8AA73A076A8C","34F7323B-47F2-4C76-A099-53B03959F11E","2C84FE47-D3F6-4798-8242-4816A623F043","4C080000-4980-410C-95D1-924B5115D595","D7100A86-FCC8-446A-98CB-7083D90CA63C","6D9D4484-3B15-46D7-A022-C30B1AA1D3A5","D8CBDDEB-FE8A-4340-A9BF-E036392C2528","35F04DE2-9133-48DC-ABD5-30115BC5A009","CD9A9818-138F-407A-9A90-E2BF334120D3","D03FF183-478E-4BDC-8DEF-15297C4D4FE0","5DA92C31-BC4E-4DAB-A642-6B60E43B50C6","37306A41-2904-4293-BE93-1701CB35E441","5CE2EB33-83D0-407A-943E-9CAB4C7AF575","43EEEFD9-B486-41E3-BEC7-F111290993A3","8350C7CC-072E-400D-8487-91284F0CBF3F","C8EE794A-22C7-4B17-B5EE-DA29C50A9E5D","F239B9FA-C6FB-421E-9334-B7FE347A9B12","B24AA3ED-41E6-4E52-9D0A-2B3445EEF982","56DC8311-62E0-4D4B-93B5-F6B86DBE6058","76D2EB72-314B-4BB9-B498-0CD777CABF52","B5336E19-B823-4D6A-B451-406BDE1A8A4D","E034BD1E-C21F-4234-8657-22BA85235756","61AD3247-D1A6-422C-BA37-5BB68871DAF1","6D3481AD-7001-4671-BCB6-45855B230AC0","926877ED-E9EA-4A12-8748-24A3948B7AB7","5DAB2700-5983-4651-8191-9558A45EC05F","86C225A0-F45B-4599-98BE-407785E1B4CA","D1E51499-596F-4DBF-8696-1D31B17D3F72","D02CB31D-FB78-48DA-91A3-6EE35B615553","F4DA0326-BC9D-4B94-9B11-BB59F370348D","A6F35BF1-FA80-4D92-8874-8DE6B62A2DEF","6AE36891-F1A9-4BED-A4AB-5240973FD582","7DE36F64-365C-40F2-875D-E50FA8826316","18B14B97-9A7A-44B2-AB4A-1D2D91F718CD","B5717843-89C1-4029-B372-31D3C94C8D94","A516E5B9-95F7-4EAC-B684-41EE2BD3FBED","DE779FBE-48F1-49D7-8D6B-27BD26B78DBF","ED8D61FF-25B2-499A-B522-0DD67B97C506","05F7A35B-0616-4B05-8A20-3218BAC44269","26A749BA-1032-45FD-95DC-649839BA67D3","5AA5A11D-011F-4B90-BFC9-C6EC5ACB5D2D","2E764D44-2AAC-4C72-B238-CF911BB2BA5B","E0A1C09F-DEFB-464C-92E7-16A293DC7F7A","1B09B25A-7AD3-4EBD-87F0-7581D9AA2EE8","BDC85A94-05B1-4714-9D96-2E384D7A519E","84CAFCFD-2DF4-4356-8703-1EEA30C95E6A","AE5CACB2-455C-40C9-B572-DBD43C9AA592","A8A9BE69-D1BD-4857-95AD-37A8CBAA1409","A47C14CE-61CF-41F6-927E-1AA49A077AE1","01EFA8F6-E8E4-44DA-936D-D6C4A7920D8D","508BB446-E215-4A57-BFEA-ECB927F7B263","18A8CFA4-0F83-4654-B330-9C0F13355BEC","459A15F3-37C0-424A-B113-71303DD0FCC3","628B2A93-5DE7-4A8B-A0E3-08D0D9E28A58","24984918-4472-4988-93CF-FAA7E8228082"],"sheet":[0,1,2,3,2,4,5,6,7,8,9,10,11,2,12,9,3,2,2,13,14,8,15,16,8,8,9,17,2,18,19,2,20,2,3,21,22,23,24,25,26,27,10,2,2,2,9,2,9,1,9,28,2,29,9,30,15,15,15,8,31,8,8,8,32,15,15,33,3,3,34,15,3,8,15,8,8,8,35,15,36,37,15,3,38,8,15,39,8,8,40,15,41,15,42,43,3,3,15,44,7,8,45,46,8,8,15,3,15,47,48,3,49,50,3,8,15,8,51,15,15,52,15],"rateStart":[0,5,10,15,20,22,27,32,32,37,42,47,52,57,62,66,71,76,81,86,91,96,101,106,111,115,120,125,130,135,140,145,150,155,160,165,170,175,180,185,190,195,200,205,210,215,220,225,230,235,240,245,249,254],"program":[0,1,2,3,4,0,1,2,5,4,0,1,2,4,6,0,1,2,6,7,7,8,0,1,2,4,6,0,1,2,3,4,0,4,1,2,6,0,1,2,4,6,0,1,2,5,4,0,1,9,10,11,10,0,2,4,6,0,12,2,13,10,0,2,13,10,0,4,1,2,6,5,0,4,1,2,0,1,2,3,9,0,1,2,14,4,0,1,2,9,4,0,1,2,13,9,0,15,14,16,17,0,1,2,4,6,0,1,2,4,6,18,19,7,8,0,1,2,4,6,3,0,1,2,6,0,1,2,6,7,0,1,2,20,13,0,1,5,3,4,0,1,2,5,3,3,0,4,1,2,3,5,0,4,1,0,4,1,2,6,3,9,5,0,4,4,2,6,7,8,21,3,0,1,2,10,9,0,4,1,0,1,2,4,6,5,0,4,1,2,5,3,9,0,4,0,1,2,20,13,5,0,4,1,2,5,0,4,1,2,1,2,6,7,8,0,4,1,2,6,5,0,4,1,2,0,4,1,2,6,5,0,4,1,2,5,0,4,1,2,0,4,1,2,6,0,8,7,4,0,4,1,2,6],"rate":[5375,5375,4750,5250,6375,5375,5375,4750,5000,6375,5625,5500,5250,6375,6875,5375,5375,4750,6875,5375,5375,5500,5750,5625,5375,6500,7000,5625,5500,5250,5500,6375,5375,6375,5375,4750,6875,5375,5375,4750,6375,6875,5375,5375,4750,4750,6375,5625,5500,5875,5875,7875,5250,5625,5250,6375,6875,5625,6000,5250,6000,5875,5625,5250,6000,5875,5625,6375,5500,5250,6875,5125,5375,6375,5375,4750,5625,5375,4750,5250,5125,5625,5500,4750,5250,6375,5625,5500,5250,5875,6375,5625,5375,4750,5500,5125,6125,5625,5750,5375,5500,5250,5125,4875,6375,6875,5625,5625,5000,6375,6875,5375,4750,5375,5500,5000,4875,4500,6125,6625,4875,5625,5500,5250,6875,5625,5500,5250,6875,5375,5375,5375,4750,4750,6000,5625,5500,4750,5875,6375,5375,5375,4750,5000,5250,5500,5625,6375,5500,5250,6250,5750,5625,6375,5500,5625,6375,5500,4750,6875,5250,5125,5000,5375,6375,6375,5250,6875,5375,5500,6125,5500,5875,5625,5375,5375,5500,5625,6375,5500,5750,5750,5125,6375,7000,5750,5625,6375,5500,5250,5000,5250,5125,5375,6375,5375,5375,4750,4750,5500,5250,5625,6375,5500,5250,5250,5875,6375,5875,5250,5375,4750,6875,5375,5500,5125,6125,4875,4375,6625,5000,5625,6375,5375,4750,5750,6375,5750,5125,6875,4750,5375,6375,5375,4750,5500,5625,6375,5500,5250,5375,6125,5250,5000,6625,5625,5500,5375,6375,5500,6625,5500,4875,7125],"rateText":{},"best":{"all":[2,7,12,17,20,24,29,-2,35,39,44,48,52,59,63,69,75,78,83,88,93,99,103,108,112,117,120,127,132,137,142,149,154,158,162,166,174,175,182,189,190,197,200,205,211,218,224,228,230,239,243,247,252],"arm":[3,8,-2,-2,-2,-2,30,-2,-2,-2,45,49,52,61,65,-2,71,80,84,89,95,98,-2,-2,-2,-2,120,-2,134,137,143,145,151,-2,162,-2,171,175,-2,185,190,199,200,205,-2,-2,220,-2,230,235,-2,-2,-2],"conventional30":[0,5,10,15,20,22,27,-2,32,37,42,47,53,57,62,66,72,76,81,86,91,96,101,106,113,115,121,129,130,135,140,146,152,155,163,168,172,177,180,186,193,195,201,206,213,215,221,225,231,236,240,247,249],"conventional20":[1,6,11,16,-2,23,28,-2,34,38,43,48,-2,-2,-2,68,74,77,82,87,92,97,102,107,111,116,122,126,131,136,141,148,154,157,-2,-2,173,179,181,188,-2,196,203,208,210,217,223,227,233,238,242,-2,251],"conventional15":[2,7,12,17,-2,24,29,-2,35,39,44,-2,54,59,63,69,75,78,83,88,93,100,103,108,112,117,123,127,132,-2,142,149,-2,158,-2,166,174,-2,182,189,-2,197,204,209,211,218,224,228,234,239,243,-2,252],"jumbo30":[4,9,13,-2,-2,25,31,-2,33,40,46,-2,55,-2,-2,67,73,-2,85,90,-2,-2,104,109,-2,118,-2,-2,-2,139,-2,147,153,156,164,165,-2,178,183,187,194,-2,202,207,-2,216,222,226,232,237,241,248,250],"jumbo15":[-2,-2,14,18,-2,26,-2,-2,36,41,-2,-2,56,-2,-2,70,-2,-2,-2,-2,-2,-2,105,110,-2,119,124,128,-2,-2,-2,-2,-2,159,-2,167,-2,-2,184,-2,-2,-2,-2,-2,212,219,-2,229,-2,-2,244,-2,253]},"payments":{"homePrice":[200000,200000,300000,300000,400000,400000,500000,500000,750000,750000,1000000,1000000],"downPayment":[0.1,0.2,0.1,0.2,0.1,0.2,0.1,0.2,0.1,0.2,0.1,0.2],"monthly":[[1008,1226,1400,994,1123,1008,1226,1400,966,1123,1036,1238,1447,1123,1605,1008,1226,1400,1605,1008,1008,1022,1050,1251,1459,1138,1618,1036,1238,1447,1022,1123,1008,1123,1226,1400,1605,1008,1226,1400,1123,1605,1008,1226,1400,939,1123,1036,1238,1065,1065,1305,994,1036,1447,1123,1605,1036,1079,1447,1079,1065,1036,1447,1079,1065,1036,1123,1238,1447,1605,980,1008,1123,1226,1400,1036,1226,1400,994,980,1036,1238,1400,994,1123,1036,1238,1447,1065,1123,1036,1226,1400,1022,980,1094,1251,1050,1942,1471,994,1200,1412,1123,1605,1036,1251,1423,1123,1605,1226,1400,1008,1022,966,1176,1377,1094,1580,953,1036,1238,1447,1605,1036,1238,1447,1605,1008,1008,1226,1400,1887,1079,1036,1238,939,1065,1123,1008,1226,1400,966,994,1022,1036,1123,1238,1447,1108,1050,1036,1123,1238,1036,1123,1238,1400,1605,994,980,966,1008,1123,1123,1447,1605,1008,1022,1094,1022,1065,1251,1459,1008,1022,1036,1123,1238,1050,1264,1435,1123,1618,1050,1036,1123,1238,1447,966,994,980,1008,1123,1008,1226,1400,1887,1022,994,1036,1123,1238,1447,994,1065,1123,1277,1447,1226,1400,1605,1008,1022,980,1094,1176,1366,1580,966,1036,1123,1226,1400,1050,1123,1264,1435,1605,939,1008,1123,1226,1400,1022,1036,1123,1238,1447,1008,1094,1213,1423,1580,1036,1022,1008,1123,1022,1153,1238,1412,1630],[896,1089,1245,884,998,896,1089,1245,859,998,921,1101,1286,998,1427,896,1089,1245,1427,896,896,908,934,1112,1297,1011,1438,921,1101,1286,908,998,896,998,1089,1245,1427,896,1089,1245,998,1427,896,1089,1245,835,998,921,1101,946,946,1160,884,921,1286,998,1427,921,959,1286,959,946,921,1286,959,946,921,998,1101,1286,1427,871,896,998,1089,1245,921,1089,1245,884,871,921,1101,1245,884,998,921,1101,1286,946,998,921,1089,1245,908,871,972,1112,934,1727,1307,884,1067,1255,998,1427,921,1112,1265,998,1427,1089,1245,896,908,859,1045,1224,972,1405,847,921,1101,1286,1427,921,1101,1286,1427,896,896,1089,1245,1678,959,921,1101,835,946,998,896,1089,1245,859,884,908,921,998,1101,1286,985,934,921,998,1101,921,998,1101,1245,1427,884,871,859,896,998,998,1286,1427,896,908,972,908,946,1112,1297,896,908,921,998,1101,934,1123,1276,998,1438,934,921,998,1101,1286,859,884,871,896,998,896,1089,1245,1678,908,884,921,998,1101,1286,884,946,998,1135,1286,1089,1245,1427,896,908,871,972,1045,1214,1405,859,921,998,1089,1245,934,998,1123,1276,1427,835,896,998,1089,1245,908,921,998,1101,1286,896,972,1078,1265,1405,921,908,896,998,908,1024,1101,1255,1449],[1512,1838,2100,1491,1684,1512,1838,2100,1449,1684,1554,1857,2170,1684,2408,1512,1838,2100,2408,1512,1512,1533,1576,1876,2188,1707,2427,1554,1857,2170,1533,1684,1512,1684,1838,2100,2408,1512,1838,2100,1684,2408,1512,1838,2100,1408,1684,1554,1857,1597,1597,1958,1491,1554,2170,1684,2408,1554,1619,2170,1619,1597,1554,2170,1619,1597,1554,1684,1857,2170,2408,1470,1512,1684,1838,2100,1554,1838,2100,1491,1470,1554,1857,2100,1491,1684,1554,1857,2170,1597,1684,1554,1838,2100,1533,1470,1641,1876,1576,2914,2206,1491,1801,2118,1684,2408,1554,1876,2135,1684,2408,1838,2100,1512,1533,1449,1763,2065,1641,2371,1429,1554,1857,2170,2408,1554,1857,2170,2408,1512,1512,1838,2100,2831,1619,1554,1857,1408,1597,1684,1512,1838,2100,1449,1491,1533,1554,1684,1857,2170,1662,1576,1554,1684,1857,1554,1684,1857,2100,2408,1491,1470,1449,1512,1684,1684,2170,2408,1512,1533,1641,1533,1597,1876,2188,1512,1533,1554,1684,1857,1576,1896,2153,1684,2427,1576,1554,1684,1857,2170,1449,1491,1470,1512,1684,1512,1838,2100,2831,1533,1491,1554,1684,1857,2170,1491,1597,1684,1915,2170,1838,2100,2408,1512,1533,1470,1641,1763,2048,2371,1449,1554,1684,1838,2100,1576,1684,1896,2153,2408,1408,1512,1684,1838,2100,1533,1554,1684,1857,2170,1512,1641,1819,2135,2371,1554,1533,1512,1684,1533,1729,1857,2118,2446],[1344,1634,1867,1325,1497,1344,1634,1867,1288,1497,1382,1651,1929,1497,2140,1344,1634,1867,2140,1344,1344,1363,1401,1668,1945,1517,2157,1382,1651,1929,1363,1497,1344,1497,1634,1867,2140,1344,1634,1867,1497,2140,1344,1634,1867,1252,1497,1382,1651,1420,1420,1740,1325,1382,1929,1497,2140,1382,1439,1929,1439,1420,1382,1929,1439,1420,1382,1497,1651,1929,2140,1307,1344,1497,1634,1867,1382,1634,1867,1325,1307,1382,1651,1867,1325,1497,1382,1651,1929,1420,1497,1382,1634,1867,1363,1307,1458,1668,1401,2590,1961,1325,1601,1882,1497,2140,1382,1668,1898,1497,2140,1634,1867,1344,1363,1288,1567,1836,1458,2107,1270,1382,1651,1929,2140,1382,1651,1929,2140,1344,1344,1634,1867,2516,1439,1382,1651,1252,1420,1497,1344,1634,1867,1288,1325,1363,1382,1497,1651,1929,1478,1401,1382,1497,1651,1382,1497,1651,1867,2140,1325,1307,1288,1344,1497,1497,1929,2140,1344,1363,1458,1363,1420,1668,1945,1344,1363,1382,1497,1651,1401,1685,1914,1497,2157,1401,1382,1497,1651,1929,1288,1325,1307,1344,1497,1344,1634,1867,2516,1363,1325,1382,1497,1651,1929,1325,1420,1497,1702,1929,1634,1867,2140,1344,1363,1307,1458,1567,1821,2107,1288,1382,1497,1634,1867,1401,1497,1685,1914,2140,1252,1344,1497,1634,1867,1363,1382,1497,1651,1929,1344,1458,1617,1898,2107,1382,1363,1344,1497,1363,1537,1651,1882,2174],[2016,2451,2800,1988,2246,2016,2451,2800,1933,2246,2072,2476,2894,2246,3211,2016,2451,2800,3211,2016,2016,2044,2101,2502,2918,2275,3236,2072,2476,2894,2044,2246,2016,2246,2451,2800,3211,2016,2451,2800,2246,3211,2016,2451,2800,1878,2246,2072,2476,2130,2130,2610,1988,2072,2894,2246,3211,2072,2158,2894,2158,2130,2072,2894,2158,2130,2072,2246,2476,2894,3211,1960,2016,2246,2451,2800,2072,2451,2800,1988,1960,2072,2476,2800,1988,2246,2072,2476,2894,2130,2246,2072,2451,2800,2044,1960,2187,2502,2101,3885,2942,1988,2401,2823,2246,3211,2072,2502,2847,2246,3211,2451,2800,2016,2044,1933,2351,2754,2187,3161,1905,2072,2476,2894,3211,2072,2476,2894,3211,2016,2016,2451,2800,3775,2158,2072,2476,1878,2130,2246,2016,2451,2800,1933,1988,2044,2072,2246,2476,2894,2217,2101,2072,2246,2476,2072,2246,2476,2800,3211,1988,1960,1933,2016,2246,2246,2894,3211,2016,2044,2187,2044,2130,2502,2918,2016,2044,2072,2246,2476,2101,2528,2870,2246,3236,2101,2072,2246,2476,2894,1933,1988,1960,2016,2246,2016,2451,2800,3775,2044,1988,2072,2246,2476,2894,1988,2130,2246,2553,2894,2451,2800,3211,2016,2044,1960,2187,2351,2731,3161,1933,2072,2246,2451,2800,2101,2246,2528,2870,3211,1878,2016,2246,2451,2800,2044,2072,2246,2476,2894,2016,2187,2426,2847,3161,2072,2044,2016,2246,2044,2305,2476,2823,3261],[1792,2179,2489,1767,1996,1792,2179,2489,1718,1996,1842,2201,2572,1996,2854,1792,2179,2489,2854,1792,1792,1817,1867,2224,2593,2023,2876,1842,2201,2572,1817,1996,1792,1996,2179,2489,2854,1792,2179,2489,1996,2854,1792,2179,2489,1669,1996,1842,2201,1893,1893,2320,1767,1842,2572,1996,2854,1842,1919,2572,1919,1893,1842,2572,1919,1893,1842,1996,2201,2572,2854,1742,1792,1996,2179,2489,1842,2179,2489,1767,1742,1842,2201,2489,1767,1996,1842,2201,2572,1893,1996,1842,2179,2489,1817,1742,1944,2224,1867,3453,2615,1767,2134,2510,1996,2854,1842,2224,2531,1996,2854,2179,2489,1792,1817,1718,2090,2448,1944,2810,1693,1842,2201,2572,2854,1842,2201,2572,2854,1792,1792,2179,2489,3355,1919,1842,2201,1669,1893,1996,1792,2179,2489,1718,1767,1817,1842,1996,2201,2572,1970,1867,1842,1996,2201,1842,1996,2201,2489,2854,1767,1742,1718,1792,1996,1996,2572,2854,1792,1817,1944,1817,1893,2224,2593,1792,1817,1842,1996,2201,1867,2247,2551,1996,2876,1867,1842,1996,2201,2572,1718,1767,1742,1792,1996,1792,2179,2489,3355,1817,1767,1842,1996,2201,2572,1767,1893,1996,2270,2572,2179,2489,2854,1792,1817,1742,1944,2090,2428,2810,1718,1842,1996,2179,2489,1867,1996,2247,2551,2854,1669,1792,1996,2179,2489,1817,1842,1996,2201,2572,1792,1944,2156,2531,2810,1842,1817,1792,1996,1817,2049,2201,2510,2899],[2520,3064,3500,2485,2807,2520,3064,3500,2416,2807,2590,3095,3617,2807,4013,2520,3064,3500,4013,2520,2520,2555,2626,3127,3647,2844,4045,2590,3095,3617,2555,2807,2520,2807,3064,3500,4013,2520,3064,3500,2807,4013,2520,3064,3500,2347,2807,2590,3095,2662,2662,3263,2485,2590,3617,2807,4013,2590,2698,3617,2698,2662,2590,3617,2698,2662,2590,2807,3095,3617,4013,2450,2520,2807,3064,3500,2590,3064,3500,2485,2450,2590,3095,3500,2485,2807,2590,3095,3617,2662,2807,2590,3064,3500,2555,2450,2734,3127,2626,4856,3677,2485,3001,3529,2807,4013,2590,3127,3559,2807,4013,3064,3500,2520,2555,2416,2939,3442,2734,3951,2381,2590,3095,3617,4013,2590,3095,3617,4013,2520,2520,3064,3500,4718,2698,2590,3095,2347,2662,2807,2520,3064,3500,2416,2485,2555,2590,2807,3095,3617,2771,2626,2590,2807,3095,2590,2807,3095,3500,4013,2485,2450,2416,2520,2807,2807,3617,4013,2520,2555,2734,2555,2662,3127,3647,2520,2555,2590,2807,3095,2626,3159,3588,2807,4045,2626,2590,2807,3095,3617,2416,2485,2450,2520,2807,2520,3064,3500,4718,2555,2485,2590,2807,3095,3617,2485,2662,2807,3192,3617,3064,3500,4013,2520,2555,2450,2734,2939,3414,3951,2416,2590,2807,3064,3500,2626,2807,3159,3588,4013,2347,2520,2807,3064,3500,2555,2590,2807,3095,3617,2520,2734,3032,3559,3951,2590,2555,2520,2807,2555,2881,3095,3529,4076],[2240,2723,3111,2209,2495,2240,2723,3111,2147,2495,2303,2752,3216,2495,3567,2240,2723,3111,3567,2240,2240,2271,2334,2780,3242,2528,3595,2303,2752,3216,2271,2495,2240,2495,2723,3111,3567,2240,2723,3111,2495,3567,2240,2723,3111,2087,2495,2303,2752,2366,2366,2900,2209,2303,3216,2495,3567,2303,2398,3216,2398,2366,2303,3216,2398,2366,2303,2495,2752,3216,3567,2178,2240,2495,2723,3111,2303,2723,3111,2209,2178,2303,2752,3111,2209,2495,2303,2752,3216,2366,2495,2303,2723,3111,2271,2178,2430,2780,2334,4316,3268,2209,2668,3137,2495,3567,2303,2780,3163,2495,3567,2723,3111,2240,2271,2147,2612,3060,2430,3512,2117,2303,2752,3216,3567,2303,2752,3216,3567,2240,2240,2723,3111,4194,2398,2303,2752,2087,2366,2495,2240,2723,3111,2147,2209,2271,2303,2495,2752,3216,2463,2334,2303,2495,2752,2303,2495,2752,3111,3567,2209,2178,2147,2240,2495,2495,3216,3567,2240,2271,2430,2271,2366,2780,3242,2240,2271,2303,2495,2752,2334,2808,3189,2495,3595,2334,2303,2495,2752,3216,2147,2209,2178,2240,2495,2240,2723,3111,4194,2271,2209,2303,2495,2752,3216,2209,2366,2495,2837,3216,2723,3111,3567,2240,2271,2178,2430,2612,3034,3512,2147,2303,2495,2723,3111,2334,2495,2808,3189,3567,2087,2240,2495,2723,3111,2271,2303,2495,2752,3216,2240,2430,2695,3163,3512,2303,2271,2240,2495,2271,2561,2752,3137,3623],[3780,4596,5250,3727,4211,3780,4596,5250,3624,4211,3886,4643,5426,4211,6020,3780,4596,5250,6020,3780,3780,3833,3939,4691,5471,4266,6067,3886,4643,5426,3833,4211,3780,4211,4596,5250,6020,3780,4596,5250,4211,6020,3780,4596,5250,3521,4211,3886,4643,3993,3993,4894,3727,3886,5426,4211,6020,3886,4047,5426,4047,3993,3886,5426,4047,3993,3886,4211,4643,5426,6020,3675,3780,4211,4596,5250,3886,4596,5250,3727,3675,3886,4643,5250,3727,4211,3886,4643,5426,3993,4211,3886,4596,5250,3833,3675,4101,4691,3939,7284,5515,3727,4501,5294,4211,6020,3886,4691,5338,4211,6020,4596,5250,3780,3833,3624,4408,5164,4101,5926,3572,3886,4643,5426,6020,3886,4643,5426,6020,3780,3780,4596,5250,7077,4047,3886,4643,3521,3993,4211,3780,4596,5250,3624,3727,3833,3886,4211,4643,5426,4156,3939,3886,4211,4643,3886,4211,4643,5250,6020,3727,3675,3624,3780,4211,4211,5426,6020,3780,3833,4101,3833,3993,4691,5471,3780,3833,3886,4211,4643,3939,4739,5382,4211,6067,3939,3886,4211,4643,5426,3624,3727,3675,3780,4211,3780,4596,5250,7077,3833,3727,3886,4211,4643,5426,3727,3993,4211,4787,5426,4596,5250,6020,3780,3833,3675,4101,4408,5121,5926,3624,3886,4211,4596,5250,3939,4211,4739,5382,6020,3521,3780,4211,4596,5250,3833,3886,4211,4643,5426,3780,4101,4548,5338,5926,3886,3833,3780,4211,3833,4322,4643,5294,6114],[3360,4085,4667,3313,3743,3360,4085,4667,3221,3743,3454,4127,4823,3743,5351,3360,4085,4667,5351,3360,3360,3407,3501,4170,4863,3792,5393,3454,4127,4823,3407,3743,3360,3743,4085,4667,5351,3360,4085,4667,3743,5351,3360,4085,4667,3130,3743,3454,4127,3549,3549,4350,3313,3454,4823,3743,5351,3454,3597,4823,3597,3549,3454,4823,3597,3549,3454,3743,4127,4823,5351,3267,3360,3743,4085,4667,3454,4085,4667,3313,3267,3454,4127,4667,3313,3743,3454,4127,4823,3549,3743,3454,4085,4667,3407,3267,3646,4170,3501,6474,4903,3313,4001,4706,3743,5351,3454,4170,4745,3743,5351,4085,4667,3360,3407,3221,3918,4590,3646,5268,3175,3454,4127,4823,5351,3454,4127,4823,5351,3360,3360,4085,4667,6291,3597,3454,4127,3130,3549,3743,3360,4085,4667,3221,3313,3407,3454,3743,4127,4823,3694,3501,3454,3743,4127,3454,3743,4127,4667,5351,3313,3267,3221,3360,3743,3743,4823,5351,3360,3407,3646,3407,3549,4170,4863,3360,3407,3454,3743,4127,3501,4213,4784,3743,5393,3501,3454,3743,4127,4823,3221,3313,3267,3360,3743,3360,4085,4667,6291,3407,3313,3454,3743,4127,4823,3313,3549,3743,4255,4823,4085,4667,5351,3360,3407,3267,3646,3918,4552,5268,3221,3454,3743,4085,4667,3501,3743,4213,4784,5351,3130,3360,3743,4085,4667,3407,3454,3743,4127,4823,3360,3646,4043,4745,5268,3454,3407,3360,3743,3407,3842,4127,4706,5435],[5040,6128,7000,4970,5615,5040,6128,7000,4831,5615,5181,6191,7235,5615,8027,5040,6128,7000,8027,5040,5040,5110,5252,6255,7294,5689,8089,5181,6191,7235,5110,5615,5040,5615,6128,7000,8027,5040,6128,7000,5615,8027,5040,6128,7000,4695,5615,5181,6191,5324,5324,6526,4970,5181,7235,5615,8027,5181,5396,7235,5396,5324,5181,7235,5396,5324,5181,5615,6191,7235,8027,4900,5040,5615,6128,7000,5181,6128,7000,4970,4900,5181,6191,7000,4970,5615,5181,6191,7235,5324,5615,5181,6128,7000,5110,4900,5468,6255,5252,9712,7354,4970,6002,7059,5615,8027,5181,6255,7117,5615,8027,6128,7000,5040,5110,4831,5878,6885,5468,7902,4763,5181,6191,7235,8027,5181,6191,7235,8027,5040,5040,6128,7000,9436,5396,5181,6191,4695,5324,5615,5040,6128,7000,4831,4970,5110,5181,5615,6191,7235,5541,5252,5181,5615,6191,5181,5615,6191,7000,8027,4970,4900,4831,5040,5615,5615,7235,8027,5040,5110,5468,5110,5324,6255,7294,5040,5110,5181,5615,6191,5252,6319,7176,5615,8089,5252,5181,5615,6191,7235,4831,4970,4900,5040,5615,5040,6128,7000,9436,5110,4970,5181,5615,6191,7235,4970,5324,5615,6383,7235,6128,7000,8027,5040,5110,4900,5468,5878,6828,7902,4831,5181,5615,6128,7000,5252,5615,6319,7176,8027,4695,5040,5615,6128,7000,5110,5181,5615,6191,7235,5040,5468,6065,7117,7902,5181,5110,5040,5615,5110,5763,6191,7059,8152],[4480,5447,6223,4418,4991,4480,5447,6223,4295,4991,4605,5503,6431,4991,7135,4480,5447,6223,7135,4480,4480,4542,4669,5560,6484,5057,7191,4605,5503,6431,4542,4991,4480,4991,5447,6223,7135,4480,5447,6223,4991,7135,4480,5447,6223,4173,4991,4605,5503,4732,4732,5801,4418,4605,6431,4991,7135,4605,4796,6431,4796,4732,4605,6431,4796,4732,4605,4991,5503,6431,7135,4356,4480,4991,5447,6223,4605,5447,6223,4418,4356,4605,5503,6223,4418,4991,4605,5503,6431,4732,4991,4605,5447,6223,4542,4356,4861,5560,4669,8633,6537,4418,5335,6274,4991,7135,4605,5560,6326,4991,7135,5447,6223,4480,4542,4295,5225,6120,4861,7024,4234,4605,5503,6431,7135,4605,5503,6431,7135,4480,4480,5447,6223,8388,4796,4605,5503,4173,4732,4991,4480,5447,6223,4295,4418,4542,4605,4991,5503,6431,4926,4669,4605,4991,5503,4605,4991,5503,6223,7135,4418,4356,4295,4480,4991,4991,6431,7135,4480,4542,4861,4542,4732,5560,6484,4480,4542,4605,4991,5503,4669,5617,6379,4991,7191,4669,4605,4991,5503,6431,4295,4418,4356,4480,4991,4480,5447,6223,8388,4542,4418,4605,4991,5503,6431,4418,4732,4991,5674,6431,5447,6223,7135,4480,4542,4356,4861,5225,6069,7024,4295,4605,4991,5447,6223,4669,4991,5617,6379,7135,4173,4480,4991,5447,6223,4542,4605,4991,5503,6431,4480,4861,5391,6326,7024,4605,4542,4480,4991,4542,5122,5503,6274,7247]]},"market":{"all":{"creditUnions":121,"min":4375,"p10":4750,"p25":4750,"median":4875,"p75":5250,"p90":5250,"max":5500,"mean":4992,"minChange":null,"medianChange":null},"arm":{"creditUnions":33,"min":4750,"p10":4775,"p25":5000,"median":5250,"p75":5500,"p90":5875,"max":6000,"mean":5307,"minChange":null,"medianChange":null},"conventional15":{"creditUnions":113,"min":4375,"p10":4750,"p25":4750,"median":4750,"p75":5250,"p90":5250,"max":5500,"mean":4979,"minChange":null,"medianChange":null},"conventional20":{"creditUnions":113,"min":4875,"p10":5375,"p25":5375,"median":5375,"p75":5500,"p90":5500,"max":5875,"mean":5436,"minChange":null,"medianChange":null},"conventional30":{"creditUnions":121,"min":5000,"p10":5375,"p25":5375,"median":5375,"p75":5625,"p90":5625,"max":6125,"mean":5503,"minChange":null,"medianChange":null},"jumbo15":{"creditUnions":87,"min":6625,"p10":6875,"p25":6875,"median":6875,"p75":6875,"p90":6875,"max":7125,"mean":6872,"minChange":null,"medianChange":null},"jumbo30":{"creditUnions":94,"min":6125,"p10":6375,"p25":6375,"median":6375,"p75":6375,"p90":6375,"max":6625,"mean":6371,"minChange":null,"medianChange":null}},"dataVersion":"5e3a9bbbb2f3","generated":"2026-10-17T23:58:38"};
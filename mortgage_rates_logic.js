@@ -1,286 +1,290 @@
 document.addEventListener('DOMContentLoaded', function () {
     const table = document.getElementById('mortgageRatesTable');
     const tbody = table.querySelector('tbody');
+    const viewport = document.getElementById('tableViewport');
     const headers = table.querySelectorAll('th.sortable');
     const creditUnionSearchInput = document.getElementById('creditUnionSearch');
     const loanTypeFilter = document.getElementById('loanTypeFilter');
+    const paymentScenario = document.getElementById('paymentScenario');
+    const marketSummary = document.getElementById('marketSummary');
     const bestRateHeader = document.getElementById('bestRateHeader');
-    const bestProgram30yrHeader = document.getElementById('bestProgram30yrHeader'); 
+    const bestProgram30yrHeader = document.getElementById('bestProgram30yrHeader');
+
+    // Columnar payload loaded from mortgage_rates_data.js (convert_csv_to_html.build_payload)
+    const data = window.mortgageRatesData;
+    const creditUnionCount = data.name.length;
+    // Rate sheets are shared: rateStart and best are indexed by data.sheet[creditUnion]
+    const sheetOf = data.sheet;
+    const rateStr = position => data.rateText[position] ?? `${(data.rate[position] / data.rateScale).toFixed(3)}%`;
+
+    // Column headers per filter category; the best program of each category is precomputed
+    // per rate sheet by convert_csv_to_html.py (data.best)
+    const categoryHeaders = {
+        all: ["BEST RATE", "OVERALL BEST PROGRAM"],
+        arm: ["BEST ARM RATE", "BEST ARM PROGRAM"],
+        conventional30: ["BEST 30YR CONV FIXED RATE", "BEST 30YR CONV FIXED PROGRAM"],
+        conventional20: ["BEST 20YR CONV FIXED RATE", "BEST 20YR CONV FIXED PROGRAM"],
+        conventional15: ["BEST 15YR CONV FIXED RATE", "BEST 15YR CONV FIXED PROGRAM"],
+        jumbo30: ["BEST 30YR JUMBO FIXED RATE", "BEST 30YR JUMBO FIXED PROGRAM"],
+        jumbo15: ["BEST 15YR JUMBO FIXED RATE", "BEST 15YR JUMBO FIXED PROGRAM"],
+    };
+    const creditUnionNames = data.name.map(name => name.toLowerCase());
+
+    // Monthly payments per rate position and loan scenario (payment_engine.py); absent
+    // when the page was built without NumPy
+    const payments = data.payments;
+    if (payments) {
+        payments.homePrice.forEach((price, scenario) => {
+            paymentScenario.add(new Option(`$${price.toLocaleString()} home, ${Math.round(payments.downPayment[scenario] * 100)}% down`, scenario));
+        });
+        paymentScenario.hidden = false;
+    }
+
+    // Sort keys live in typed arrays, computed once per category: the numeric best rate
+    // (Infinity when there is none) and the alphabetical rank of the best program name
+    const programNames = data.programs.concat(["None"]);
+    const programRank = new Int32Array(programNames.length);
+    Array.from(programNames.keys())
+        .sort((a, b) => programNames[a].localeCompare(programNames[b]))
+        .forEach((programId, rank) => { programRank[programId] = rank; });
+    const sortKeyCache = {};
+
+    function sortKeys(category) {
+        if (!sortKeyCache[category]) {
+            const best = data.best[category];
+            const bestrate = new Float64Array(creditUnionCount);
+            const bestprogram30yr = new Int32Array(creditUnionCount);
+            for (let index = 0; index < creditUnionCount; index++) {
+                const position = best[sheetOf[index]];
+                bestrate[index] = position >= 0 ? data.rate[position] / data.rateScale : Infinity;
+                bestprogram30yr[index] = programRank[position >= 0 ? data.program[position] : programNames.length - 1];
+            }
+            sortKeyCache[category] = { bestrate, bestprogram30yr };
+        }
+        return sortKeyCache[category];
+    }
+
+    // Virtual scrolling: only the rows inside the viewport (plus OVERSCAN on each side) are in
+    // the DOM, between two spacer rows standing in for the rest. Row heights start as an
+    // estimate from the program count and are replaced by measured heights once rendered.
+    const OVERSCAN = 10;
+    const ESTIMATED_ROW_HEIGHT = 60;
+    const ESTIMATED_PROGRAM_HEIGHT = 24;
+    const rowHeight = new Float64Array(creditUnionCount);
+    for (let index = 0; index < creditUnionCount; index++) {
+        const sheet = sheetOf[index];
+        rowHeight[index] = ESTIMATED_ROW_HEIGHT + ESTIMATED_PROGRAM_HEIGHT * (data.rateStart[sheet + 1] - data.rateStart[sheet]);
+    }
+    const rowCache = new Map(); // credit union index -> <tr>, built on first render
+    const programsTableCache = new Map(); // sheet -> programs table HTML, shared by its credit unions
+    const topSpacer = document.createElement('tr');
+    const bottomSpacer = document.createElement('tr');
+    [topSpacer, bottomSpacer].forEach(spacer => {
+        spacer.className = 'spacer';
+        spacer.appendChild(document.createElement('td')).colSpan = 5;
+    });
 
-    let sortDirection = {};
-    let originalRows = [];
+    let view = new Int32Array(0); // Credit union indices in display order (filtered and sorted)
+    let offsets = new Float64Array(1); // offsets[k]: top of view[k] within tbody
+    let sortState = null; // { sortKey, direction }
+    // Market-wide statistics per category, precomputed by market_aggregates.py (in rate units)
+    const unitsStr = units => `${(units / data.rateScale).toFixed(3)}%`;
+    function showMarketSummary(category) {
+        const stats = data.market && data.market[category];
+        marketSummary.hidden = !stats || stats.min === null;
+        if (marketSummary.hidden) {
+            return;
+        }
+        let text = `Market across ${stats.creditUnions} credit unions: lowest ${unitsStr(stats.min)}, median ${unitsStr(stats.median)}`;
+        if (stats.medianChange !== null) {
+            text += ` (${stats.medianChange >= 0 ? '+' : '-'}${(Math.abs(stats.medianChange) / data.rateScale).toFixed(3)} vs previous day)`;
+        }
+        text += `, middle half ${unitsStr(stats.p25)} to ${unitsStr(stats.p75)}, 90th percentile ${unitsStr(stats.p90)}`;
+        marketSummary.textContent = text;
+    }
 
-    // Populate table body and store original rows
-    allCreditUnionsData.forEach((creditUnionData, index) => {
-        let row = tbody.insertRow();
+    let selectedLoanType = loanTypeFilter.value;
+    let selectedPayments = payments ? payments.monthly[paymentScenario.value] : null;
+    let renderedRange = [0, 0];
+    let renderScheduled = false;
+
+    function buildRow(index) {
+        let row = document.createElement('tr');
         row.dataset.rowIndex = index;
 
         let creditUnionCell = row.insertCell();
-        creditUnionCell.textContent = creditUnionData['CreditUnion'];
+        creditUnionCell.textContent = data.name[index];
 
         let linkCell = row.insertCell();
         let linkAnchor = document.createElement('a');
-        linkAnchor.href = creditUnionData['Link'];
+        linkAnchor.href = data.linkPrefixes[data.linkPrefix[index]] + data.linkSuffix[index];
         linkAnchor.target = '_blank';
-        linkAnchor.textContent = creditUnionData['Link'];
+        linkAnchor.textContent = linkAnchor.href;
         linkCell.appendChild(linkAnchor);
 
         // Programs column (now a nested table)
         let programsCell = row.insertCell();
-        let programsTableHtml = '<table class="program-table"><thead><tr><th>Program</th><th>Interest Rate</th></tr></thead><tbody>';
-        creditUnionData.parsedRates.forEach(rate => {
-            if (rate.loanTypeFull && rate.rateStr) {
-                programsTableHtml += `<tr><td>${rate.loanTypeFull}</td><td>${rate.rateStr}</td></tr>`;
+        const sheet = sheetOf[index];
+        let programsTableHtml = programsTableCache.get(sheet);
+        if (programsTableHtml === undefined) {
+            programsTableHtml = '<table class="program-table"><thead><tr><th>Program</th><th>Interest Rate</th></tr></thead><tbody>';
+            for (let position = data.rateStart[sheet]; position < data.rateStart[sheet + 1]; position++) {
+                programsTableHtml += `<tr><td>${data.programs[data.program[position]]}</td><td>${rateStr(position)}</td></tr>`;
             }
-        });
-        programsTableHtml += '</tbody></table>';
+            programsTableHtml += '</tbody></table>';
+            programsTableCache.set(sheet, programsTableHtml);
+        }
         programsCell.innerHTML = programsTableHtml;
 
-        // Best Program (30 Year) column 
+        // Best Program (30 Year) column
         let bestProgram30yrCell = row.insertCell();
         bestProgram30yrCell.classList.add('dynamic-best-program-30yr');
-        bestProgram30yrCell.textContent = "None"; 
 
-        // Best Rate column 
+        // Best Rate column
         let bestRateCell = row.insertCell();
         bestRateCell.classList.add('dynamic-best-rate');
-        bestRateCell.textContent = "None"; 
-        
-        originalRows.push(row);
-    });
+        return row;
+    }
+
+    function fillBestCells(row, index) {
+        // Position of the best rate; -1: offers the category but without a numeric rate
+        const bestPosition = data.best[selectedLoanType][sheetOf[index]];
+        row.children[3].textContent = bestPosition >= 0 ? data.programs[data.program[bestPosition]] : "None";
+        let bestRateText = bestPosition >= 0 ? rateStr(bestPosition) : "None";
+        if (selectedPayments && bestPosition >= 0 && selectedPayments[bestPosition] >= 0) {
+            bestRateText += ` · $${selectedPayments[bestPosition].toLocaleString()}/mo`;
+        }
+        row.children[4].textContent = bestRateText;
+    }
 
+    function layout() {
+        offsets = new Float64Array(view.length + 1);
+        for (let k = 0; k < view.length; k++) {
+            offsets[k + 1] = offsets[k] + rowHeight[view[k]];
+        }
+    }
 
-    headers.forEach(header => {
-        const sortKey = header.dataset.sortKey;
-        sortDirection[sortKey] = 'asc';
-    });
+    // First view position k whose row ends below pixel y
+    function positionAt(y) {
+        let low = 0, high = view.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (offsets[middle + 1] > y) high = middle; else low = middle + 1;
+        }
+        return low;
+    }
+
+    function setSpacers() {
+        const [start, end] = renderedRange;
+        topSpacer.firstChild.style.height = `${offsets[start]}px`;
+        bottomSpacer.firstChild.style.height = `${offsets[view.length] - offsets[end]}px`;
+        topSpacer.style.display = start > 0 ? '' : 'none';
+        bottomSpacer.style.display = end < view.length ? '' : 'none';
+    }
+
+    function render() {
+        renderScheduled = false;
+        const scrollTop = Math.max(0, viewport.scrollTop - table.tHead.offsetHeight);
+        const start = Math.max(0, positionAt(scrollTop) - OVERSCAN);
+        const end = Math.min(view.length, positionAt(scrollTop + viewport.clientHeight) + 1 + OVERSCAN);
+        renderedRange = [start, end];
+
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(topSpacer);
+        for (let k = start; k < end; k++) {
+            const index = view[k];
+            let row = rowCache.get(index);
+            if (!row) {
+                row = buildRow(index);
+                rowCache.set(index, row);
+            }
+            fillBestCells(row, index);
+            row.classList.toggle('even', k % 2 === 1);
+            fragment.appendChild(row);
+        }
+        fragment.appendChild(bottomSpacer);
+        tbody.replaceChildren(fragment);
+
+        // Replace estimates with measured heights; only the spacers move, the rows stay
+        let remeasured = false;
+        for (let k = start; k < end; k++) {
+            const index = view[k];
+            const height = rowCache.get(index).offsetHeight;
+            if (height && Math.abs(height - rowHeight[index]) > 0.5) {
+                rowHeight[index] = height;
+                remeasured = true;
+            }
+        }
+        if (remeasured) {
+            layout();
+        }
+        setSpacers();
+    }
+
+    function scheduleRender() {
+        if (!renderScheduled) {
+            renderScheduled = true;
+            requestAnimationFrame(render);
+        }
+    }
+
+    // Reorders the filtered index permutation in place by the cached typed-array keys
+    function sortView() {
+        if (sortState) {
+            const keys = sortKeys(selectedLoanType)[sortState.sortKey];
+            const sign = sortState.direction === 'asc' ? 1 : -1;
+            view.sort((a, b) => (keys[a] - keys[b]) * sign || a - b);
+        }
+        layout();
+    }
 
     headers.forEach(header => {
         header.addEventListener('click', function () {
-            const columnIndex = Array.from(header.parentNode.children).indexOf(header);
-            const currentSortKey = header.dataset.sortKey;
-            
-            sortDirection[currentSortKey] = (sortDirection[currentSortKey] === 'asc') ? 'desc' : 'asc';
+            const sortKey = header.dataset.sortKey;
+            const direction = sortState && sortState.sortKey === sortKey && sortState.direction === 'asc' ? 'desc' : 'asc';
+            sortState = { sortKey, direction };
 
             headers.forEach(h => {
                 h.classList.remove('asc', 'desc');
             });
-            header.classList.add(sortDirection[currentSortKey]);
+            header.classList.add(direction);
 
-            sortTable(columnIndex, currentSortKey, sortDirection[currentSortKey]);
+            sortView();
+            viewport.scrollTop = 0;
+            render();
         });
     });
 
-    function sortTable(columnIndex, sortKey, direction) {
-        let rows = Array.from(tbody.children).filter(row => row.style.display !== 'none'); // FIXED: Use tbody.children
-
-        rows.sort((rowA, rowB) => {
-            let cellA = rowA.children[columnIndex].textContent;
-            let cellB = rowB.children[columnIndex].textContent;
-
-            if (sortKey === 'bestrate') {
-                let valA = parseFloat(cellA.replace(/[^\\d.]/g, ''));
-                let valB = parseFloat(cellB.replace(/[^\\d.]/g, ''));
-
-                // Treat "None" or NaN as a very large number for sorting purposes
-                valA = isNaN(valA) ? Infinity : valA;
-                valB = isNaN(valB) ? Infinity : valB;
-
-                if (direction === 'asc') {
-                    return valA - valB;
-                } else {
-                    return valB - valA;
-                }
-            } else if (sortKey === 'bestprogram30yr') {
-                // Sort alphabetically for program names
-                return direction === 'asc' ? cellA.localeCompare(cellB) : cellB.localeCompare(cellA);
-            } else {
-                // Default alphabetical sort for other columns
-                return direction === 'asc' ? cellA.localeCompare(cellB) : cellB.localeCompare(cellA);
-            }
-        });
-
-        tbody.innerHTML = '';
-        rows.forEach(row => tbody.appendChild(row));
-    }
-
     function applyFilters() {
-        const selectedLoanType = loanTypeFilter.value;
+        selectedLoanType = loanTypeFilter.value;
         const creditUnionSearchTerm = creditUnionSearchInput.value.toLowerCase();
-        const bestRateColumnIndex = Array.from(table.querySelectorAll('th')).findIndex(th => th.dataset.sortKey === 'bestrate');
-        const bestProgram30yrColumnIndex = Array.from(table.querySelectorAll('th')).findIndex(th => th.dataset.sortKey === 'bestprogram30yr'); 
-
-
-        if (selectedLoanType === "all") {
-            bestRateHeader.textContent = "BEST RATE";
-            bestProgram30yrHeader.textContent = "OVERALL BEST PROGRAM"; 
-        } else if (selectedLoanType === "arm") {
-            bestRateHeader.textContent = "BEST ARM RATE";
-            bestProgram30yrHeader.textContent = "BEST ARM PROGRAM";
-        } else if (selectedLoanType === "conventional30") {
-            bestRateHeader.textContent = "BEST 30YR CONV FIXED RATE";
-            bestProgram30yrHeader.textContent = "BEST 30YR CONV FIXED PROGRAM";
-        } else if (selectedLoanType === "conventional20") {
-            bestRateHeader.textContent = "BEST 20YR CONV FIXED RATE";
-            bestProgram30yrHeader.textContent = "BEST 20YR CONV FIXED PROGRAM";
-        } else if (selectedLoanType === "conventional15") {
-            bestRateHeader.textContent = "BEST 15YR CONV FIXED RATE";
-            bestProgram30yrHeader.textContent = "BEST 15YR CONV FIXED PROGRAM";
-        } else if (selectedLoanType === "jumbo30") {
-            bestRateHeader.textContent = "BEST 30YR JUMBO FIXED RATE";
-            bestProgram30yrHeader.textContent = "BEST 30YR JUMBO FIXED PROGRAM";
-        } else if (selectedLoanType === "jumbo15") {
-            bestRateHeader.textContent = "BEST 15YR JUMBO FIXED RATE";
-            bestProgram30yrHeader.textContent = "BEST 15YR JUMBO FIXED PROGRAM";
-        } else {
-            bestRateHeader.textContent = "BEST RATE"; 
-            bestProgram30yrHeader.textContent = "BEST PROGRAM"; 
-        }
-
 
-        originalRows.forEach(row => {
-            const rowIndex = parseInt(row.dataset.rowIndex);
-            const creditUnionData = allCreditUnionsData[rowIndex];
-            const creditUnionName = creditUnionData['CreditUnion'].toLowerCase();
-            const rates = creditUnionData.parsedRates;
-
-            let showRow = true;
-            let currentBestRateDisplay = "None"; 
-            let currentBestProgramDisplay = "None"; 
-
-            let minRateValue = Infinity;
-            let bestApplicableRate = null;
-
-
-            if (!creditUnionName.includes(creditUnionSearchTerm)) {
-                showRow = false;
+        const [rateHeader, programHeader] = categoryHeaders[selectedLoanType] || ["BEST RATE", "BEST PROGRAM"];
+        bestRateHeader.textContent = rateHeader;
+        bestProgram30yrHeader.textContent = programHeader;
+        showMarketSummary(selectedLoanType);
+
+        // -2 in data.best: the credit union has no program in the category
+        const best = data.best[selectedLoanType];
+        const visible = new Int32Array(creditUnionCount);
+        let visibleCount = 0;
+        for (let index = 0; index < creditUnionCount; index++) {
+            if ((selectedLoanType === "all" || best[sheetOf[index]] !== -2) && creditUnionNames[index].includes(creditUnionSearchTerm)) {
+                visible[visibleCount++] = index;
             }
-
-            if (showRow) {
-                if (selectedLoanType === "all") {
-                    for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.numericRate < minRateValue) {
-                            minRateValue = rate.numericRate;
-                            bestApplicableRate = rate;
-                        }
-                    }
-                } else if (selectedLoanType === "arm") {
-                    for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.simplifiedType === "ARM") {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                } else if (selectedLoanType === "conventional30") {
-                     for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.yearTerm === "30 Years" && rate.simplifiedType === "Conventional" && !rate.loanTypeFull.includes("ARM")) {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                } else if (selectedLoanType === "conventional20") {
-                     for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.yearTerm === "20 Years" && rate.simplifiedType === "Conventional" && !rate.loanTypeFull.includes("ARM")) {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                } else if (selectedLoanType === "conventional15") {
-                     for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.yearTerm === "15 Years" && rate.simplifiedType === "Conventional" && !rate.loanTypeFull.includes("ARM")) {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                } else if (selectedLoanType === "jumbo30") {
-                     for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.yearTerm === "30 Years" && rate.simplifiedType === "Jumbo" && !rate.loanTypeFull.includes("ARM")) {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                } else if (selectedLoanType === "jumbo15") {
-                     for (const rate of rates) {
-                        if (rate.numericRate !== null && rate.yearTerm === "15 Years" && rate.simplifiedType === "Jumbo" && !rate.loanTypeFull.includes("ARM")) {
-                            if (rate.numericRate < minRateValue) {
-                                minRateValue = rate.numericRate;
-                                bestApplicableRate = rate;
-                            }
-                        }
-                    }
-                }
-
-
-                if (bestApplicableRate) {
-                    currentBestRateDisplay = `${bestApplicableRate.rateStr}`; 
-                    currentBestProgramDisplay = `${bestApplicableRate.loanTypeFull}`; 
-                }
-            }
-
-            let meetsLoanTypeFilter = false;
-            if (selectedLoanType === "all") {
-                meetsLoanTypeFilter = true;
-            } else {
-                for (const rate of rates) {
-                    if (selectedLoanType === "arm" && rate.simplifiedType === "ARM") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    } else if (selectedLoanType === "conventional30" && rate.yearTerm === "30 Years" && rate.simplifiedType === "Conventional") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    } else if (selectedLoanType === "conventional20" && rate.yearTerm === "20 Years" && rate.simplifiedType === "Conventional") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    } else if (selectedLoanType === "conventional15" && rate.yearTerm === "15 Years" && rate.simplifiedType === "Conventional") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    } else if (selectedLoanType === "jumbo30" && rate.yearTerm === "30 Years" && rate.simplifiedType === "Jumbo") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    } else if (selectedLoanType === "jumbo15" && rate.yearTerm === "15 Years" && rate.simplifiedType === "Jumbo") {
-                        meetsLoanTypeFilter = true;
-                        break;
-                    }
-                }
-            }
-            showRow = showRow && meetsLoanTypeFilter;
-
-            if (bestRateColumnIndex !== -1) {
-                const bestRateCell = row.children[bestRateColumnIndex];
-                if (bestRateCell) {
-                    bestRateCell.textContent = currentBestRateDisplay; 
-                }
-            }
-            if (bestProgram30yrColumnIndex !== -1) { 
-                const bestProgram30yrCell = row.children[bestProgram30yrColumnIndex];
-                if (bestProgram30yrCell) {
-                    bestProgram30yrCell.textContent = currentBestProgramDisplay;
-                }
-            }
-
-            row.style.display = showRow ? '' : 'none';
-        });
-        const currentlySortedHeader = table.querySelector('th.asc, th.desc');
-        if (currentlySortedHeader) {
-            const columnIndex = Array.from(currentlySortedHeader.parentNode.children).indexOf(currentlySortedHeader);
-            const currentSortKey = currentlySortedHeader.dataset.sortKey;
-            const currentDirection = currentlySortedHeader.classList.contains('asc') ? 'asc' : 'desc';
-            sortTable(columnIndex, currentSortKey, currentDirection);
         }
-
+        view = visible.subarray(0, visibleCount);
+        sortView();
+        render();
     }
 
+    viewport.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', scheduleRender);
     loanTypeFilter.addEventListener('change', applyFilters);
-    creditUnionSearchInput.addEventListener('keyup', applyFilters);
+    creditUnionSearchInput.addEventListener('input', applyFilters);
+    paymentScenario.addEventListener('change', function () {
+        selectedPayments = payments.monthly[paymentScenario.value];
+        render();
+    });
     applyFilters();
 });
@@ -0,0 +1,195 @@
+import os
+import sys
+import zlib
+import time
+import sqlite3
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "playwright"))
+from change_detector import content_hash
+from rate_extractors import RAW_PAYLOAD, parse_rate_html, parse_rate_payload
+from credit_union_directory import SITEID_URL, CreditUnionDirectory
+from rate_store import RateStore
+from run_state import exported_site_ids
+from convert_csv_to_html import convert_csv_to_html
+
+try:
+    import market_aggregates
+except ImportError: # NumPy is optional: the page is rebuilt without market aggregates
+    market_aggregates = None
+
+ARCHIVE_DIRNAME = "page_archive"
+COMPRESSION_LEVEL = 9 # Written once, read rarely; HTML fragments compress ~10x
+
+class PageArchive:
+    """Content-addressed archive of the raw #rate_box fragments and rate payloads behind
+    every stored result. Blobs are zlib-compressed files named by the SHA-256 of their
+    text (the same content_hash the ChangeDetector keeps), so identical pages are stored
+    once; the page_archive table in the rate store maps (run_date, siteId) to a blob and
+    is committed together with the result it belongs to."""
+
+    def __init__(self, conn, archive_dir: str):
+        self.conn = conn
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_archive (
+                run_date TEXT NOT NULL,
+                site_id TEXT NOT NULL,
+                credit_union TEXT NOT NULL,
+                link TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                tier TEXT,
+                archived_at TEXT NOT NULL,
+                PRIMARY KEY (run_date, site_id)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS page_archive_by_hash ON page_archive (content_hash)")
+        self.conn.commit()
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.archive_dir, digest[:2], f"{digest}.z")
+
+    def put_blob(self, text: str) -> str:
+        """Store text once under its hash (a no-op if it is already there) and return the hash.
+        Safe to call from worker threads and from several processes at once."""
+        digest = content_hash(text)
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{id(text)}.tmp"
+        with open(temp_path, mode='wb') as outfile:
+            outfile.write(zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL))
+        os.replace(temp_path, path)
+        return digest
+
+    def get_blob(self, digest: str) -> str:
+        return read_blob(self.blob_path(digest))
+
+    def record(self, run_date: str, site_id: str, credit_union: str, link: str, digest: str, kind: str,
+               tier: str | None = None, commit: bool = True):
+        self.conn.execute("""
+            INSERT INTO page_archive (run_date, site_id, credit_union, link, content_hash, kind, tier, archived_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (run_date, site_id) DO UPDATE SET
+                credit_union = excluded.credit_union,
+                link = excluded.link,
+                content_hash = excluded.content_hash,
+                kind = excluded.kind,
+                tier = excluded.tier,
+                archived_at = excluded.archived_at""",
+            (run_date, site_id, credit_union, link, digest, kind, tier, datetime.datetime.now().isoformat(timespec='seconds')))
+        if commit:
+            self.conn.commit()
+
+    def entries(self, start_date: str, end_date: str) -> list:
+        """[(run_date, site_id, credit_union, link, content_hash, kind)] archived between two ISO dates (inclusive)."""
+        return self.conn.execute("""
+            SELECT run_date, site_id, credit_union, link, content_hash, kind FROM page_archive
+            WHERE run_date BETWEEN ? AND ? ORDER BY run_date, rowid""", (start_date, end_date)).fetchall()
+
+    def stats(self) -> dict:
+        entries, distinct = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM page_archive").fetchone()
+        stored_bytes = 0
+        for root, _, files in os.walk(self.archive_dir):
+            stored_bytes += sum(os.path.getsize(os.path.join(root, name)) for name in files if name.endswith(".z"))
+        return {'entries': entries, 'distinct_pages': distinct, 'stored_bytes': stored_bytes}
+
+def read_blob(path: str) -> str:
+    with open(path, mode='rb') as infile:
+        return zlib.decompress(infile.read()).decode('utf-8')
+
+def parse_blob(job: tuple) -> tuple:
+    """(content_hash, parsed or None, error) for one (path, content_hash, kind); runs in a worker process."""
+    path, digest, kind = job
+    try:
+        text = read_blob(path)
+        parsed = parse_rate_payload(text) if kind == RAW_PAYLOAD else parse_rate_html(text)
+    except Exception as e:
+        return digest, None, f"{type(e).__name__}: {e}"
+    return digest, parsed, None
+
+def reparse(rate_store, archive: PageArchive, start_date: str, end_date: str, workers: int | None = None) -> dict:
+    """Rerun the current extractor over every page archived between two dates, no network,
+    and rewrite the stored results (scrape_results and sheet_history) from it. Each distinct
+    page is parsed once, in parallel on `workers` processes (default: every core)."""
+    entries = archive.entries(start_date, end_date)
+    jobs = {(digest, kind) for _, _, _, _, digest, kind in entries}
+    started = time.perf_counter()
+    parsed_pages = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for digest, parsed, error in executor.map(parse_blob, [(archive.blob_path(digest), digest, kind) for digest, kind in jobs],
+                                                  chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))):
+            if error:
+                errors[digest] = error
+            else:
+                parsed_pages[digest] = parsed
+    parse_seconds = time.perf_counter() - started
+
+    counts = {'entries': len(entries), 'distinct_pages': len(jobs), 'rewritten': 0, 'no_rates': 0, 'errors': len(errors)}
+    for run_date, site_id, credit_union, link, digest, _ in entries:
+        parsed = parsed_pages.get(digest)
+        if parsed is None:
+            print(f"[PageArchive] Could not re-parse {credit_union} on {run_date}: {errors.get(digest)}", file=sys.stderr)
+            continue
+        if parsed['rates_30_years'] == "None":
+            # Keep the stored row rather than replace rates with nothing
+            counts['no_rates'] += 1
+            print(f"[PageArchive] No rates in the archived page of {credit_union} on {run_date}, keeping the stored row", file=sys.stderr)
+            continue
+        rate_store.record(run_date, {'CreditUnion': credit_union, 'Link': link, 'Rates': parsed['rates_30_years'], 'BestRate': parsed['best_rate']},
+                          rates=parsed['rates'], commit=False)
+        counts['rewritten'] += 1
+    rate_store.conn.commit()
+    counts['parse_seconds'] = round(parse_seconds, 3)
+    return counts
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Re-derive stored results from the raw page archive, or show its size")
+    parser.add_argument("--db", default=os.environ.get("SCRAPE_DB") or os.path.join(script_dir, "mortgage_rates.db"), help="Path to the rate store")
+    parser.add_argument("--archive-dir", default=os.environ.get("SCRAPE_ARCHIVE_DIR") or os.path.join(script_dir, ARCHIVE_DIRNAME))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    reparse_parser = subparsers.add_parser("reparse", help="Rerun the extractor over archived pages and rewrite the stored results")
+    reparse_parser.add_argument("start_date", help="YYYY-MM-DD")
+    reparse_parser.add_argument("end_date", nargs="?", help="YYYY-MM-DD (default: start_date)")
+    reparse_parser.add_argument("--workers", type=int, help="Parser processes (default: one per core)")
+    reparse_parser.add_argument("--export", action="store_true", help="Then export end_date's CSV and rebuild the page")
+    subparsers.add_parser("stats", help="Entries, distinct pages and compressed bytes in the archive")
+    args = parser.parse_args()
+
+    store = RateStore(args.db)
+    archive = PageArchive(store.conn, args.archive_dir)
+    if args.command == "stats":
+        print(archive.stats())
+    else:
+        end_date = args.end_date or args.start_date
+        try:
+            counts = reparse(store, archive, args.start_date, end_date, args.workers)
+        except sqlite3.Error as e:
+            print(f"[PageArchive] Could not rewrite the stored results: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Re-parsed {args.start_date}..{end_date}: {counts}")
+        if market_aggregates is not None:
+            # The rewritten results change the market aggregates of every re-parsed day
+            days = market_aggregates.rebuild(store, args.start_date, end_date)
+            print(f"Recomputed the market aggregates of {days} days")
+        if args.export:
+            csv_path = os.path.join(script_dir, "mortgage_rates.csv")
+            # Only the credit unions still in the directory that end_date's run exported, like the
+            # scraper's own export (all stored ones when no directory has been cached yet)
+            site_ids = list(CreditUnionDirectory(store.conn).sites) or None
+            exported = exported_site_ids(store.conn, end_date)
+            if site_ids is not None and exported is not None:
+                site_ids = [site_id for site_id in site_ids if site_id in exported]
+            links = [f"{SITEID_URL}{site_id}" for site_id in site_ids] if site_ids is not None else None
+            exported = store.export_csv(end_date, csv_path, links)
+            print(f"Exported {exported} rows to {csv_path}")
+            market = market_aggregates.read_aggregates(store.conn, end_date) if market_aggregates is not None else None
+            convert_csv_to_html(csv_path, os.path.join(script_dir, "mortgage_rates.html"),
+                                os.path.join(script_dir, "mortgage_rates_base64_template.html"), market=market)
+    store.close()
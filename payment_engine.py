@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Batched mortgage math over every rate sheet x program x loan scenario at once: one
+# (sheets, programs, scenarios) array per quantity instead of a Python loop per loan.
+
+DEFAULT_AMORTIZATION_YEARS = 30 # ARMs and programs without a term in their name
+DEFAULT_HOME_PRICES = (200000, 300000, 400000, 500000, 750000, 1000000)
+DEFAULT_DOWN_PAYMENTS = (0.05, 0.10, 0.20)
+SUMMARY_YEARS = 5 # Amortization summary horizon: interest paid and balance left after this many years
+
+def scenario_grid(home_prices, down_payments) -> tuple:
+    """(prices, down payment shares, principals) of every price x down payment, flattened
+    price-major, e.g. scenario_grid([400000], [0.1, 0.2]) -> principals [360000, 320000]."""
+    prices, downs = np.meshgrid(np.asarray(home_prices, dtype=float), np.asarray(down_payments, dtype=float), indexing='ij')
+    return prices.ravel(), downs.ravel(), (prices * (1 - downs)).ravel()
+
+def term_years(year_term) -> int:
+    """'30 Years' (convert_csv_to_html.classify_program) -> 30."""
+    return int(year_term.split()[0]) if year_term else DEFAULT_AMORTIZATION_YEARS
+
+class PaymentEngine:
+    """Payment, total interest and amortization summaries of every program of every rate
+    sheet for any number of principals in one broadcast pass.
+
+    `sheets` is a list of parsedRates lists (convert_csv_to_html.read_credit_unions /
+    parse_rate_sheet: dicts with 'numericRate' and 'yearTerm'); `categorize(rate)` returns
+    the filter categories a program belongs to. Programs without a numeric rate are NaN."""
+
+    def __init__(self, sheets: list, categorize=None):
+        width = max((len(sheet) for sheet in sheets), default=0)
+        self.rates = np.full((len(sheets), width), np.nan) # Annual %, NaN: padding or no numeric rate
+        self.years = np.full((len(sheets), width), DEFAULT_AMORTIZATION_YEARS, dtype=float)
+        self.categories = {}
+        for sheet_index, sheet in enumerate(sheets):
+            for program_index, rate in enumerate(sheet):
+                if rate['numericRate'] is not None:
+                    self.rates[sheet_index, program_index] = rate['numericRate']
+                self.years[sheet_index, program_index] = term_years(rate['yearTerm'])
+                for category in (categorize(rate) if categorize else ()):
+                    mask = self.categories.get(category)
+                    if mask is None:
+                        mask = self.categories[category] = np.zeros(self.rates.shape, dtype=bool)
+                    mask[sheet_index, program_index] = True
+
+    def schedule(self, principals, summary_years: int = SUMMARY_YEARS) -> dict:
+        """{'monthly', 'total_paid', 'total_interest', 'interest_in_summary', 'balance_after_summary'},
+        each of shape (sheets, programs, len(principals))."""
+        principal = np.asarray(principals, dtype=float)[None, None, :]
+        monthly_rate = (self.rates / 1200)[:, :, None]
+        months = (self.years * 12)[:, :, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (1 + monthly_rate) ** months
+            # NaN (no numeric rate, or the padding of a shorter sheet) stays NaN instead of passing for 0%
+            monthly = np.where(np.isnan(monthly_rate), np.nan,
+                               np.where(monthly_rate == 0, principal / months, principal * monthly_rate * growth / (growth - 1)))
+            total_paid = monthly * months
+            # Balance after k payments: P(1+r)^k - M((1+r)^k - 1)/r
+            paid_months = np.minimum(summary_years * 12, months)
+            growth_k = (1 + monthly_rate) ** paid_months
+            balance = np.where(np.isnan(monthly_rate), np.nan,
+                               np.where(monthly_rate == 0, principal - monthly * paid_months,
+                                        principal * growth_k - monthly * (growth_k - 1) / monthly_rate))
+            balance = np.maximum(balance, 0)
+        return {
+            'monthly': monthly,
+            'total_paid': total_paid,
+            'total_interest': total_paid - principal,
+            'interest_in_summary': monthly * paid_months - (principal - balance),
+            'balance_after_summary': balance,
+        }
+
+    def rank(self, principals, sheet_of, category: str | None = None, schedule: dict | None = None) -> tuple:
+        """Credit unions ordered by total cost (all payments over the term) of their cheapest
+        program in `category` (every program when None), per principal.
+        `sheet_of[i]` is credit union i's sheet. Returns (order, cost, program): order is
+        (credit unions, principals) with the cheapest first and credit unions without a
+        program in the category last (cost inf, program -1)."""
+        schedule = schedule or self.schedule(principals)
+        total = schedule['total_paid']
+        eligible = ~np.isnan(total)
+        if category is not None:
+            eligible &= self.categories.get(category, np.zeros(self.rates.shape, dtype=bool))[:, :, None]
+        total = np.where(eligible, total, np.inf)
+        program = np.argmin(total, axis=1) # (sheets, principals)
+        cost = np.take_along_axis(total, program[:, None, :], axis=1)[:, 0, :]
+        program = np.where(np.isinf(cost), -1, program)
+        sheet_of = np.asarray(sheet_of, dtype=np.intp)
+        cost, program = cost[sheet_of], program[sheet_of] # Sheets -> credit unions
+        return np.argsort(cost, axis=0, kind='stable'), cost, program
+
+def monthly_payments_by_position(engine: PaymentEngine, sheets: list, principals) -> list:
+    """Whole-dollar monthly payment per principal for every rate position of the page
+    payload (sheets in order, programs in sheet order), -1 without a numeric rate."""
+    monthly = engine.schedule(principals)['monthly']
+    lengths = np.array([len(sheet) for sheet in sheets], dtype=np.intp)
+    filled = np.arange(monthly.shape[1])[None, :] < lengths[:, None] # Drop the padding of shorter sheets
+    by_position = np.rint(monthly[filled]) # (positions, principals)
+    by_position = np.where(np.isnan(by_position), -1, by_position).astype(np.int64)
+    return by_position.T.tolist()
+
+if __name__ == "__main__":
+    # Imported here: convert_csv_to_html imports this module
+    from convert_csv_to_html import CATEGORIES, program_categories, read_credit_unions
+    parser = argparse.ArgumentParser(description="Rank credit unions by the total cost of a loan scenario")
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "mortgage_rates.csv"))
+    parser.add_argument("--price", type=float, nargs="+", default=list(DEFAULT_HOME_PRICES), help="Home prices")
+    parser.add_argument("--down", type=float, nargs="+", default=list(DEFAULT_DOWN_PAYMENTS), help="Down payment shares, e.g. 0.2")
+    parser.add_argument("--category", default="conventional30", choices=list(CATEGORIES))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    credit_unions = read_credit_unions(args.csv)
+    sheet_ids = {}
+    sheets = []
+    for credit_union in credit_unions:
+        if credit_union['sheet'] not in sheet_ids:
+            sheet_ids[credit_union['sheet']] = len(sheets)
+            sheets.append(credit_union['parsedRates'])
+    sheet_of = [sheet_ids[credit_union['sheet']] for credit_union in credit_unions]
+    prices, downs, principals = scenario_grid(args.price, args.down)
+
+    started = time.perf_counter()
+    engine = PaymentEngine(sheets, lambda rate: program_categories(rate['simplifiedType'], rate['yearTerm']))
+    schedule = engine.schedule(principals)
+    order, cost, program = engine.rank(principals, sheet_of, args.category, schedule)
+    elapsed = time.perf_counter() - started
+    print(f"{len(credit_unions)} credit unions ({len(sheets)} sheets) x {engine.rates.shape[1]} programs x {len(principals)} scenarios "
+          f"in {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+    for scenario in range(len(principals)):
+        print(f"\n${prices[scenario]:,.0f} home, {downs[scenario]:.0%} down (${principals[scenario]:,.0f} loan), {args.category}:")
+        for rank, index in enumerate(order[:args.top, scenario], start=1):
+            if np.isinf(cost[index, scenario]):
+                break
+            rate = credit_unions[index]['parsedRates'][program[index, scenario]]
+            sheet = sheet_of[index]
+            print(f"{rank:>3}. {credit_unions[index]['CreditUnion']:<45} {rate['loanTypeFull']:<28} {rate['rateStr']:>8} "
+                  f"${schedule['monthly'][sheet, program[index, scenario], scenario]:>9,.0f}/mo  total ${cost[index, scenario]:>12,.0f}")
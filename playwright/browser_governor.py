@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import signal
+from process_stats import is_chromium, process_tree, read_stat
+
+class GovernorConfig:
+    """Limits of one long-lived Chromium. Every field can be overridden from the
+    environment with the SCRAPE_ prefix, e.g. SCRAPE_BROWSER_RSS_MB=512."""
+
+    def __init__(self, pages_per_context=50, pages_per_browser=500, browser_rss_mb=768.0,
+                 rss_check_interval=5.0, close_timeout=10.0):
+        self.pages_per_context = pages_per_context # A context (and its page) is replaced after this many pages
+        self.pages_per_browser = pages_per_browser # The whole browser is replaced after this many pages
+        self.browser_rss_mb = browser_rss_mb # ... or once its process tree holds more memory than this
+        self.rss_check_interval = rss_check_interval # Seconds between /proc scans per browser
+        self.close_timeout = close_timeout # A context that takes longer to close has a hung renderer
+
+    @classmethod
+    def from_env(cls, **overrides):
+        config = cls(**overrides)
+        for name, value in vars(config).items():
+            env_value = os.environ.get(f"SCRAPE_{name.upper()}")
+            if env_value is not None:
+                setattr(config, name, type(value)(float(env_value)) if isinstance(value, int) else float(env_value))
+        return config
+
+def chromium_roots(parent_pid: int | None = None) -> set:
+    """Pids of the Chromium processes in this process's tree whose parent is not
+    Chromium, i.e. one per launched browser (the renderers hang off them)."""
+    tree = process_tree(parent_pid or os.getpid())
+    chromium = {stat['pid'] for stat in tree if is_chromium(stat)}
+    return {stat['pid'] for stat in tree if stat['pid'] in chromium and stat['ppid'] not in chromium}
+
+class BrowserHandle:
+    """One Chromium of the pool plus the accounting the governor decides on."""
+
+    def __init__(self, browser, pid: int | None):
+        self.browser = browser
+        self.pid = pid # Root Chromium process, None where /proc is unavailable
+        self.pages_served = 0
+        self.in_flight = 0
+        self.retiring = False # No new pages; closed once in_flight drops to 0
+        self.killed = False
+        self.rss = 0
+        self._rss_checked = 0.0
+
+class BrowserGovernor:
+    """Decides when a context or a browser has served enough pages or grown too big,
+    and kills browsers whose renderer hangs."""
+
+    def __init__(self, config: GovernorConfig | None = None):
+        self.config = config or GovernorConfig()
+        self.recycles = {}
+
+    def context_expired(self, slot) -> bool:
+        return slot.pages_served >= self.config.pages_per_context
+
+    def sample_rss(self, handle: BrowserHandle) -> int:
+        """RSS of the browser's process tree in bytes, re-read at most every rss_check_interval seconds."""
+        now = time.monotonic()
+        if handle.pid and now - handle._rss_checked >= self.config.rss_check_interval:
+            handle._rss_checked = now
+            handle.rss = sum(stat['rss'] for stat in process_tree(handle.pid))
+        return handle.rss
+
+    def browser_recycle_reason(self, handle: BrowserHandle) -> str | None:
+        if handle.pages_served >= self.config.pages_per_browser:
+            return "pages"
+        if self.sample_rss(handle) > self.config.browser_rss_mb * 2**20:
+            return "rss"
+        return None
+
+    def count(self, reason: str):
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+
+    def kill(self, handle: BrowserHandle) -> bool:
+        """SIGKILL a browser whose renderer stopped answering; its pages fail at once."""
+        handle.killed = True
+        if not handle.pid or read_stat(handle.pid) is None:
+            return False
+        try:
+            os.kill(handle.pid, signal.SIGKILL)
+        except OSError as e:
+            print(f"[BrowserGovernor] Could not kill browser {handle.pid}: {e}", file=sys.stderr)
+            return False
+        return True
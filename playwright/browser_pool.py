@@ -0,0 +1,237 @@
+import asyncio
+import argparse
+import sys
+import json
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from scrape_single_url import CHROMIUM_ARGS, empty_result, scrape_page
+from request_router import RequestRouter
+from metrics import METRICS
+from browser_governor import BrowserGovernor, BrowserHandle, GovernorConfig, chromium_roots
+
+DEFAULT_CONCURRENCY = 4
+SCRAPE_TIMEOUT_SECONDS = 120 # Same budget the per-URL subprocess used to get
+
+class PageSlot:
+    """One reusable BrowserContext with its single Page."""
+
+    def __init__(self, handle, context, page, load_stats=None):
+        self.handle = handle # BrowserHandle of the browser the context lives in
+        self.browser = handle.browser
+        self.context = context
+        self.page = page
+        self.load_stats = load_stats # PageLoadStats when lean request routing is on
+        self.pages_served = 0
+
+class BrowserPool:
+    """Keeps a small fixed number of Chromium instances alive and hands out
+    reusable pages to at most `concurrency` concurrent scrapes.
+
+    A BrowserGovernor keeps the long-lived browsers bounded: contexts are replaced
+    after a number of pages, and a browser that has served too many pages or whose
+    process tree grew past the RSS limit is retired. A retiring browser gets no new
+    pages, its replacement is launched right away and it is closed only once its
+    in-flight pages are done. A context that does not close in time means a hung
+    renderer; its browser is killed and replaced."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, browsers: int = 1, router: RequestRouter | None = None,
+                 governor: BrowserGovernor | None = None):
+        self.concurrency = max(1, concurrency)
+        self.browser_count = max(1, min(browsers, self.concurrency))
+        self.router = router
+        self.governor = governor or BrowserGovernor(GovernorConfig.from_env())
+        self._playwright = None
+        self._browsers = [] # Active BrowserHandles; retiring ones are only in _retiring
+        self._retiring = []
+        self._idle_slots = []
+        self._slots_created = 0
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._browsers)
+
+    async def _launch(self) -> BrowserHandle:
+        print(f"[BrowserPool] Launching browser {len(self._browsers) + 1}/{self.browser_count}", file=sys.stderr)
+        before = chromium_roots()
+        with METRICS.timed("browser_launch"):
+            browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        launched = chromium_roots() - before
+        return BrowserHandle(browser, launched.pop() if len(launched) == 1 else None)
+
+    async def _ensure_capacity(self):
+        """Launch browsers until browser_count of them are active (retiring ones do not count)."""
+        if len(self._browsers) >= self.browser_count:
+            return
+        async with self._start_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            while len(self._browsers) < self.browser_count:
+                self._browsers.append(await self._launch())
+
+    async def start(self):
+        await self._ensure_capacity()
+        return self
+
+    async def close(self):
+        for slot in self._idle_slots:
+            await self._discard(slot)
+        self._idle_slots = []
+        for handle in self._browsers + self._retiring:
+            await self._close_browser(handle)
+        self._browsers = []
+        self._retiring = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        # Browsers are launched on the first page() request, so a run whose
+        # pages are all served without a browser never pays for a launch.
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def snapshot(self) -> dict:
+        return {
+            'browsers': [{'pid': handle.pid, 'pages_served': handle.pages_served, 'in_flight': handle.in_flight,
+                          'rss_mib': round(handle.rss / 2**20, 1)} for handle in self._browsers],
+            'retiring': len(self._retiring),
+            'recycles': dict(self.governor.recycles),
+        }
+
+    async def _new_slot(self) -> PageSlot:
+        handle = self._browsers[self._slots_created % len(self._browsers)]
+        self._slots_created += 1
+        with METRICS.timed("context_create"):
+            context = await handle.browser.new_context()
+            page = await context.new_page()
+        load_stats = await self.router.attach(page) if self.router else None
+        return PageSlot(handle, context, page, load_stats)
+
+    async def _discard(self, slot: PageSlot):
+        if slot.handle.killed:
+            return # Went down with its browser
+        try:
+            await asyncio.wait_for(slot.context.close(), self.governor.config.close_timeout)
+        except asyncio.TimeoutError:
+            print(f"[BrowserPool] Context did not close within {self.governor.config.close_timeout}s, killing hung browser {slot.handle.pid}", file=sys.stderr)
+            await self._kill(slot.handle)
+        except Exception as e:
+            print(f"[BrowserPool] Error closing context: {e}", file=sys.stderr)
+
+    async def _close_browser(self, handle: BrowserHandle):
+        try:
+            await asyncio.wait_for(handle.browser.close(), self.governor.config.close_timeout)
+        except asyncio.TimeoutError:
+            self.governor.kill(handle)
+        except Exception as e:
+            if not handle.killed:
+                print(f"[BrowserPool] Error closing browser: {e}", file=sys.stderr)
+
+    async def _retire(self, handle: BrowserHandle, reason: str):
+        """Take a browser out of rotation, launch its replacement and close it once idle."""
+        if handle.retiring:
+            return
+        handle.retiring = True
+        self.governor.count(reason)
+        METRICS.inc("browser_recycles", reason=reason)
+        print(f"[BrowserPool] Recycling browser {handle.pid} ({reason}): {handle.pages_served} pages, "
+              f"{round(handle.rss / 2**20, 1)} MiB, {handle.in_flight} in flight", file=sys.stderr)
+        self._browsers.remove(handle)
+        self._retiring.append(handle)
+        idle = [slot for slot in self._idle_slots if slot.handle is handle]
+        self._idle_slots = [slot for slot in self._idle_slots if slot.handle is not handle]
+        for slot in idle:
+            await self._discard(slot)
+        await self._ensure_capacity() # Launches the replacement
+        await self._reap(handle)
+
+    async def _reap(self, handle: BrowserHandle):
+        if handle.retiring and handle.in_flight == 0 and handle in self._retiring:
+            self._retiring.remove(handle)
+            await self._close_browser(handle)
+
+    async def _kill(self, handle: BrowserHandle):
+        self.governor.kill(handle)
+        await self._retire(handle, "hung")
+
+    async def _govern(self, handle: BrowserHandle):
+        if handle.retiring:
+            await self._reap(handle)
+            return
+        reason = self.governor.browser_recycle_reason(handle)
+        if reason:
+            await self._retire(handle, reason)
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a PageSlot. Pages whose scrape raised (including timeouts) are
+        thrown away instead of being returned to the pool, and so are pages whose
+        context has served its share of pages."""
+        async with self._semaphore:
+            await self.start()
+            slot = self._idle_slots.pop() if self._idle_slots else await self._new_slot()
+            handle = slot.handle
+            handle.in_flight += 1
+            reusable = False
+            try:
+                yield slot
+                reusable = True
+            finally:
+                handle.in_flight -= 1
+                slot.pages_served += 1
+                handle.pages_served += 1
+                if reusable and not handle.retiring and not self.governor.context_expired(slot):
+                    self._idle_slots.append(slot)
+                else:
+                    await self._discard(slot)
+                await self._govern(handle)
+
+    async def scrape(self, credit_union: str, url: str, timeout: float = SCRAPE_TIMEOUT_SECONDS) -> dict:
+        for attempt in range(2):
+            slot = None
+            try:
+                async with self.page() as slot:
+                    if slot.load_stats:
+                        slot.load_stats.reset()
+                    result = await asyncio.wait_for(scrape_page(slot.page, credit_union, url), timeout)
+                    if slot.load_stats:
+                        result['page_load'] = slot.load_stats.summary()
+                        print(f"[BrowserPool] Page load for {url}: {result['page_load']}", file=sys.stderr)
+                    if result['status'] != "SUCCESS" and slot.handle.killed and attempt == 0:
+                        continue # The browser was killed under this page for another page's hung renderer
+                    return result
+            except asyncio.TimeoutError:
+                result = empty_result(credit_union, url)
+                result['error_message'] = f"Scrape timed out after {timeout} seconds"
+                return result
+            except Exception as e:
+                if slot is not None and slot.handle.killed and attempt == 0:
+                    continue
+                result = empty_result(credit_union, url)
+                result['error_message'] = f"Error acquiring browser page: {e}"
+                return result
+        return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape several credit unions with one shared browser")
+    parser.add_argument("urls", nargs='+', help="'Credit Union Name>URL' pairs to scrape")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Number of pages scraped at once")
+    parser.add_argument("--browsers", type=int, default=1, help="Number of Chromium instances to share the pages between")
+    args = parser.parse_args()
+
+    rows = []
+    for pair in args.urls:
+        credit_union, _, url = pair.rpartition('>')
+        rows.append({'CreditUnion': credit_union or url, 'Link': url})
+
+    async def scrape_rows():
+        # A one-off check of a few pages; full runs go through scrape_mortgage_data's pipeline
+        async with BrowserPool(concurrency=args.concurrency, browsers=args.browsers, router=RequestRouter.from_env()) as pool:
+            return await asyncio.gather(*(pool.scrape(row['CreditUnion'], row['Link']) for row in rows))
+
+    for scrape_result in asyncio.run(scrape_rows()):
+        print(json.dumps(scrape_result)) # One JSON result per line
@@ -0,0 +1,108 @@
+import re
+import json
+import hashlib
+import datetime
+
+RATE_BOX_OPEN = re.compile(r"""<div\b[^>]*\bid\s*=\s*["']?rate_box["'\s>]""", re.IGNORECASE)
+DIV_TAG = re.compile(r"<(/?)div\b[^>]*>", re.IGNORECASE)
+
+def extract_rate_box_fragment(html_content: str) -> str | None:
+    """Cut the <div id="rate_box">...</div> fragment out of raw HTML with a
+    div-depth scan, without building a DOM. None when there is no rate box."""
+    opening = RATE_BOX_OPEN.search(html_content)
+    if not opening:
+        return None
+    depth = 0
+    for tag in DIV_TAG.finditer(html_content, opening.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html_content[opening.start():tag.end()]
+    return html_content[opening.start():]
+
+def site_id_from_url(url: str) -> str:
+    return url.split('siteId=', 1)[-1]
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def rates_hash(rates: list) -> str:
+    """Fingerprint of extracted rate rows: the change basis of every tier, since the HTTP
+    fragment and the browser's rendered page of the same rates never hash alike."""
+    return content_hash(json.dumps(rates, separators=(",", ":")))
+
+class ChangeDetector:
+    """Remembers, per siteId, the HTTP validators (ETag/Last-Modified), the hash of the
+    extracted rates (content_hash, see rates_hash) and, when the page came over plain
+    HTTP, the hash of its raw #rate_box fragment from the last stored scrape. Unchanged
+    pages are recognised right after the fetch when the fragment is byte-identical, and
+    otherwise after parsing, whichever tier fetched them before."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_fingerprints (
+                site_id TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                fragment_hash TEXT,
+                updated_at TEXT NOT NULL
+            )""")
+        columns = [column[1] for column in self.conn.execute("PRAGMA table_info(page_fingerprints)")]
+        if 'fragment_hash' not in columns:
+            # Older stores hashed HTTP fragments into content_hash, which no rates hash can match;
+            # clearing it (and the validators, so no 304 vouches for it) costs one parse per site
+            self.conn.execute("ALTER TABLE page_fingerprints ADD COLUMN fragment_hash TEXT")
+            self.conn.execute("UPDATE page_fingerprints SET content_hash = NULL, etag = NULL, last_modified = NULL")
+        self.conn.commit()
+        self.fingerprints = {
+            site_id: {'etag': etag, 'last_modified': last_modified, 'content_hash': fingerprint, 'fragment_hash': fragment_hash}
+            for site_id, etag, last_modified, fingerprint, fragment_hash in self.conn.execute(
+                "SELECT site_id, etag, last_modified, content_hash, fragment_hash FROM page_fingerprints")
+        }
+
+    def reload(self, site_id: str):
+        """Re-read one siteId's fingerprint, e.g. after a rolled-back remember()."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, fragment_hash FROM page_fingerprints WHERE site_id = ?", (site_id,)).fetchone()
+        if row is None:
+            self.fingerprints.pop(site_id, None)
+        else:
+            self.fingerprints[site_id] = {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2], 'fragment_hash': row[3]}
+
+    def conditional_headers(self, site_id: str) -> dict:
+        known = self.fingerprints.get(site_id) or {}
+        headers = {}
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+        return headers
+
+    def is_unchanged(self, site_id: str, fingerprint: str) -> bool:
+        """Whether the rates hash matches the last stored scrape's, from either tier."""
+        known = self.fingerprints.get(site_id)
+        return known is not None and fingerprint is not None and known.get('content_hash') == fingerprint
+
+    def fragment_unchanged(self, site_id: str, fragment_hash: str) -> bool:
+        """Whether the raw #rate_box fragment is byte-identical to the last stored HTTP scrape's."""
+        known = self.fingerprints.get(site_id)
+        return known is not None and known.get('content_hash') is not None and known.get('fragment_hash') == fragment_hash
+
+    def remember(self, site_id: str, fingerprint: dict, commit: bool = True):
+        """Store the fingerprint of a result once it has been stored, so a crash
+        in between can only cause a redundant re-parse, never a missed change."""
+        self.fingerprints[site_id] = fingerprint
+        self.conn.execute("""
+            INSERT INTO page_fingerprints (site_id, etag, last_modified, content_hash, fragment_hash, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (site_id) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                content_hash = excluded.content_hash,
+                fragment_hash = excluded.fragment_hash,
+                updated_at = excluded.updated_at""",
+            (site_id, fingerprint.get('etag'), fingerprint.get('last_modified'), fingerprint.get('content_hash'),
+             fingerprint.get('fragment_hash'), datetime.datetime.now().isoformat(timespec='seconds')))
+        if commit:
+            self.conn.commit()
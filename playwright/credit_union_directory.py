@@ -0,0 +1,147 @@
+import asyncio
+import argparse
+import os
+import sys
+import time
+import json
+import sqlite3
+import datetime
+from bs4 import BeautifulSoup
+from http_fetcher import HttpConnectionPool
+
+# SCRAPE_SITE_URL points every scrape at another host, e.g. benchmarks/stand_in_site.py
+SITE_URL = os.environ.get("SCRAPE_SITE_URL", "https://mortgages.cumortgage.net").rstrip('/')
+BASE_URL = f"{SITE_URL}/start_up.asp"
+SITEID_URL = f"{SITE_URL}/default.asp?siteId="
+DIRECTORY_TTL_SECONDS = float(os.environ.get("SCRAPE_DIRECTORY_TTL", 12 * 3600))
+
+def clean_union_name(name: str) -> str:
+    return name.strip().replace('-', '').replace(',', '').replace('.', '').replace("'", '').replace('\r', '').strip()
+
+def parse_site_options(html_content: str) -> dict:
+    """{siteId: name} from the <select name="siteId"> options of start_up.asp."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    select = soup.find('select', attrs={'name': 'siteId'})
+    if select is None:
+        return {}
+    sites = {}
+    for option in select.find_all('option'):
+        site_id = (option.get('value') or '').strip()
+        if site_id and site_id != '0' and site_id not in sites: # Ignore empty or default options
+            sites[site_id] = clean_union_name(option.get_text())
+    return sites
+
+class DirectoryDiff:
+    def __init__(self, added=None, removed=None, renamed=None):
+        self.added = added or {} # siteId -> name
+        self.removed = removed or {} # siteId -> last known name
+        self.renamed = renamed or {} # siteId -> (old name, new name)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed)
+
+    def summary(self) -> str:
+        return f"added={len(self.added)}, removed={len(self.removed)}, renamed={len(self.renamed)}"
+
+class CreditUnionDirectory:
+    """siteId -> name directory of cumortgage.net, cached in SQLite and refreshed at
+    most once per TTL. A refresh reads start_up.asp over plain HTTP and only falls
+    back to a browser when the static page has no siteId options; every refresh
+    is diffed against the cached directory."""
+
+    def __init__(self, conn, ttl_seconds: float = DIRECTORY_TTL_SECONDS):
+        self.conn = conn
+        self.ttl_seconds = ttl_seconds
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS credit_union_directory (
+                site_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                removed_at TEXT
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS directory_refreshes (
+                refreshed_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                diff TEXT NOT NULL
+            )""")
+        self.conn.commit()
+        self.sites = dict(self.conn.execute(
+            "SELECT site_id, name FROM credit_union_directory WHERE removed_at IS NULL ORDER BY rowid"))
+
+    def last_refreshed(self) -> float | None:
+        return self.conn.execute("SELECT MAX(refreshed_at) FROM directory_refreshes").fetchone()[0]
+
+    def is_stale(self, now: float | None = None) -> bool:
+        last_refreshed = self.last_refreshed()
+        return not self.sites or last_refreshed is None or (now if now is not None else time.time()) - last_refreshed > self.ttl_seconds
+
+    def diff(self, fetched: dict) -> DirectoryDiff:
+        return DirectoryDiff(
+            added={site_id: name for site_id, name in fetched.items() if site_id not in self.sites},
+            removed={site_id: name for site_id, name in self.sites.items() if site_id not in fetched},
+            renamed={site_id: (self.sites[site_id], name) for site_id, name in fetched.items()
+                     if site_id in self.sites and self.sites[site_id] != name})
+
+    def apply(self, fetched: dict, source: str) -> DirectoryDiff:
+        """Replace the cached directory with a freshly fetched one and record the diff."""
+        diff = self.diff(fetched)
+        today = datetime.date.today().isoformat()
+        for site_id, name in fetched.items():
+            self.conn.execute("""
+                INSERT INTO credit_union_directory (site_id, name, first_seen) VALUES (?, ?, ?)
+                ON CONFLICT (site_id) DO UPDATE SET name = excluded.name, removed_at = NULL""",
+                (site_id, name, today))
+        self.conn.executemany("UPDATE credit_union_directory SET removed_at = ? WHERE site_id = ?",
+                              [(today, site_id) for site_id in diff.removed])
+        self.conn.execute("INSERT INTO directory_refreshes (refreshed_at, source, diff) VALUES (?, ?, ?)",
+                          (time.time(), source, json.dumps({'added': diff.added, 'removed': diff.removed, 'renamed': diff.renamed})))
+        self.conn.commit()
+        self.sites = dict(fetched)
+        return diff
+
+    async def fetch(self, http_pool: HttpConnectionPool, url: str = BASE_URL) -> tuple:
+        """(sites, source): plain HTTP first, the browser only if the static page has no options."""
+        try:
+            response = await asyncio.to_thread(http_pool.get, url)
+            sites = parse_site_options(response.text)
+            if sites:
+                return sites, "http"
+            print(f"[Directory] No siteId options in static HTML of {url}, falling back to browser", file=sys.stderr)
+        except Exception as e:
+            print(f"[Directory] Error fetching {url} over HTTP: {e}, falling back to browser", file=sys.stderr)
+        from fetch_credit_union_list import fetch_credit_union_options # Only needs Playwright on this path
+        output = await fetch_credit_union_options(url)
+        sites = {}
+        for line in (output or "").splitlines():
+            if '>' in line:
+                site_id, union_name = line.split('>', 1)
+                sites.setdefault(site_id, clean_union_name(union_name))
+        return sites, "browser"
+
+    async def refresh(self, http_pool: HttpConnectionPool, url: str = BASE_URL, force: bool = False) -> DirectoryDiff | None:
+        """Refresh when stale (or forced). None when the cache was still fresh or the
+        fetch came back empty, in which case the cached directory stays in use."""
+        if not force and not self.is_stale():
+            return None
+        sites, source = await self.fetch(http_pool, url)
+        if not sites:
+            print(f"[Directory] Fetch of {url} returned no credit unions, keeping {len(self.sites)} cached", file=sys.stderr)
+            return None
+        return self.apply(sites, source)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh and print the cached credit union directory")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mortgage_rates.db"))
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--force", action="store_true", help="Refresh even if the cache is within its TTL")
+    args = parser.parse_args()
+
+    directory = CreditUnionDirectory(sqlite3.connect(args.db))
+    pool = HttpConnectionPool()
+    diff = asyncio.run(directory.refresh(pool, args.url, force=args.force))
+    pool.close()
+    if diff is not None:
+        print(f"[Directory] Refreshed: {diff.summary()}", file=sys.stderr)
+    for site_id, name in directory.sites.items():
+        print(f"{site_id}>{name}")
@@ -2,11 +2,14 @@ import asyncio
 import argparse
 import sys
 from playwright.async_api import async_playwright
+from request_router import RequestRouter
 
 async def fetch_credit_union_options(url: str) -> str | None:
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
+        router = RequestRouter.from_env()
+        load_stats = await router.attach(page) if router else None
         try:
             await page.goto(url, wait_until="domcontentloaded", timeout=60000)
             # Wait for a <select> element or similar to be present
@@ -25,6 +28,8 @@ async def fetch_credit_union_options(url: str) -> str | None:
                     union_name = union_name.replace('-', '').replace(',', '').replace('.', '').replace("'", '').replace('\r', '')
                     formatted_output.append(f"{option['value']}>{union_name}")
             
+            if load_stats:
+                print(f"[Playwright-ListFetcher] Page load for {url}: {load_stats.summary()}", file=sys.stderr)
             return "\n".join(formatted_output)
 
         except Exception as e:
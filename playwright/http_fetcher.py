@@ -0,0 +1,239 @@
+import asyncio
+import argparse
+import json
+import time
+import gzip
+import zlib
+import threading
+from collections import OrderedDict
+import http.client
+import urllib.parse
+from rate_extractors import RATE_PAYLOAD_MARKERS, RAW_FRAGMENT, empty_result, parse_rate_html
+from change_detector import content_hash, extract_rate_box_fragment, rates_hash, site_id_from_url
+from metrics import METRICS
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+MAX_REDIRECTS = 5
+PARSED_FRAGMENT_CACHE_SIZE = 512 # Distinct #rate_box fragments whose parse is kept for credit unions sharing a rate sheet
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+class HttpFetchError(Exception):
+    pass
+
+class HttpResponse:
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers # dict with lower-cased header names
+        self.body = body # raw (decompressed) bytes
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        content_type = self.headers.get("content-type", "")
+        if "charset=" in content_type:
+            charset = content_type.split("charset=", 1)[1].split(";", 1)[0].strip() or charset
+        return self.body.decode(charset, errors="replace")
+
+class HttpConnectionPool:
+    """Thread-safe pool of keep-alive http.client connections, one idle list per host."""
+
+    def __init__(self, max_idle_per_host: int = 8, timeout: float = 30, user_agent: str = DEFAULT_USER_AGENT):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout), False
+
+    def _checkin(self, scheme, netloc, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle = {}
+
+    def _request_once(self, url, headers):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        request_headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        request_headers.update(headers or {})
+
+        for attempt in range(2):
+            conn, reused = self._checkout(parts.scheme, parts.netloc)
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue # Stale keep-alive connection, retry on a fresh one
+                METRICS.observe("http_request", time.perf_counter() - started, outcome="error")
+                raise
+            except Exception:
+                conn.close()
+                METRICS.observe("http_request", time.perf_counter() - started, outcome="error")
+                raise
+            METRICS.observe("http_request", time.perf_counter() - started, outcome="ok", status=response.status)
+            METRICS.inc("bytes_fetched", len(body), tier=TIER_HTTP) # On the wire, before decompression
+
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(parts.scheme, parts.netloc, conn)
+
+            encoding = response_headers.get("content-encoding", "")
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding == "deflate":
+                body = zlib.decompress(body)
+            return HttpResponse(url, response.status, response_headers, body)
+
+    def get(self, url: str, headers: dict | None = None) -> HttpResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(url, headers)
+            if response.status in (301, 302, 303, 307, 308) and "location" in response.headers:
+                url = urllib.parse.urljoin(url, response.headers["location"])
+                continue
+            if response.status >= 400:
+                raise HttpFetchError(f"HTTP {response.status} for {url}")
+            return response
+        raise HttpFetchError(f"Too many redirects for {url}")
+
+def _mark_unchanged(result, fingerprint):
+    result['status'] = "SUCCESS"
+    result['error_message'] = ""
+    result['changed'] = False
+    result['fingerprint'] = fingerprint
+    return result
+
+async def fetch_via_http(http_pool: HttpConnectionPool, credit_union: str, url: str, detector=None) -> dict:
+    """Network half of scrape_via_http: a plain GET of the siteId page, cut down to its
+    #rate_box fragment. The result is final (an unchanged SUCCESS or an ERROR) unless it
+    carries a 'fragment', whose rates parse_fetched() still has to extract."""
+    result = empty_result(credit_union, url)
+    result['tier'] = TIER_HTTP
+    site_id = site_id_from_url(url)
+    try:
+        headers = detector.conditional_headers(site_id) if detector else None
+        response = await asyncio.to_thread(http_pool.get, url, headers)
+        fingerprint = {'etag': response.headers.get('etag'), 'last_modified': response.headers.get('last-modified')}
+        if response.status == 304 and detector:
+            known = detector.fingerprints.get(site_id, {})
+            fingerprint.update(content_hash=known.get('content_hash'), fragment_hash=known.get('fragment_hash'))
+            return _mark_unchanged(result, fingerprint)
+
+        fragment = extract_rate_box_fragment(response.text)
+        if fragment is None:
+            result['error_message'] = "No rates found in static HTML"
+            return result
+        fingerprint['fragment_hash'] = content_hash(fragment)
+        if detector and detector.fragment_unchanged(site_id, fingerprint['fragment_hash']):
+            # Same bytes as the last stored HTTP scrape: no need to parse
+            fingerprint['content_hash'] = detector.fingerprints[site_id]['content_hash']
+            return _mark_unchanged(result, fingerprint)
+        if not all(marker in fragment for marker in RATE_PAYLOAD_MARKERS):
+            # Empty box that a script fills in; only the browser tier can get these rates
+            result['error_message'] = "No rates found in static HTML"
+            return result
+        result['fragment'] = fragment
+        result['fingerprint'] = fingerprint
+    except Exception as e:
+        result['error_message'] = f"Error fetching URL over HTTP: {e}"
+    return result
+
+_parsed_fragments = OrderedDict()
+_parsed_fragments_lock = threading.Lock()
+
+def parse_fragment(fragment: str, digest: str | None, url: str = "") -> dict:
+    """parse_rate_html() of a #rate_box fragment, memoized by its content hash: credit
+    unions posting the same rate sheet serve byte-identical fragments, parsed once."""
+    if digest is not None:
+        with _parsed_fragments_lock:
+            parsed = _parsed_fragments.get(digest)
+            if parsed is not None:
+                _parsed_fragments.move_to_end(digest)
+                METRICS.inc("parse_cache_hits")
+                return dict(parsed)
+    parsed = parse_rate_html(fragment, url)
+    if digest is not None:
+        with _parsed_fragments_lock:
+            _parsed_fragments[digest] = parsed
+            while len(_parsed_fragments) > PARSED_FRAGMENT_CACHE_SIZE:
+                _parsed_fragments.popitem(last=False)
+    return dict(parsed)
+
+def parse_fetched(result: dict, detector=None) -> dict:
+    """CPU half of scrape_via_http: parse the fragment fetch_via_http() left in the result
+    and fingerprint its rates. A result whose rates match the last stored scrape's (e.g.
+    one the browser tier rendered) is unchanged. It touches no event loop or connection
+    and only reads the detector, so it can run in a worker thread."""
+    fragment = result.pop('fragment', None)
+    if fragment is None:
+        return result
+    result['raw_page'] = fragment
+    result['raw_kind'] = RAW_FRAGMENT
+    try:
+        result.update(parse_fragment(fragment, result.get('fingerprint', {}).get('fragment_hash'), result['link']))
+    except Exception as e:
+        result['error_message'] = f"Error parsing static HTML: {e}"
+        return result
+    if result['rates_30_years'] == "None":
+        result['error_message'] = "No rates found in static HTML"
+        return result
+    fingerprint = result.setdefault('fingerprint', {})
+    fingerprint['content_hash'] = rates_hash(result.get('rates', []))
+    result['changed'] = not (detector and detector.is_unchanged(site_id_from_url(result['link']), fingerprint['content_hash']))
+    result['status'] = "SUCCESS"
+    result['error_message'] = ""
+    return result
+
+async def scrape_via_http(http_pool: HttpConnectionPool, credit_union: str, url: str, detector=None) -> dict:
+    """Fast path: plain GET of the siteId page and the same #rate_box extraction on the static HTML.
+    Returns a SUCCESS result only when rates were actually found, or when `detector`
+    (a ChangeDetector) shows the page is unchanged; those results have 'changed' False
+    and carry no rates, as nothing was parsed."""
+    return parse_fetched(await fetch_via_http(http_pool, credit_union, url, detector), detector)
+
+async def render_via_browser(browser_pool, credit_union: str, url: str, detector=None) -> dict:
+    """Browser tier: render the page in the pool and fingerprint the rates it extracted."""
+    result = await browser_pool.scrape(credit_union, url)
+    result['tier'] = TIER_BROWSER
+    if result['status'] == "SUCCESS":
+        fingerprint = {'content_hash': rates_hash(result.get('rates', []))}
+        result['fingerprint'] = fingerprint
+        result['changed'] = not (detector and detector.is_unchanged(site_id_from_url(url), fingerprint['content_hash']))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape mortgage data for a single URL over plain HTTP (no browser)")
+    parser.add_argument("credit_union", help="Name of the credit union")
+    parser.add_argument("url", help="The URL to scrape")
+    args = parser.parse_args()
+
+    pool = HttpConnectionPool()
+    scrape_result = asyncio.run(scrape_via_http(pool, args.credit_union, args.url))
+    pool.close()
+    print(json.dumps(scrape_result)) # Output JSON result
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Process-wide run metrics: latency histograms, counters and byte totals recorded around
+# the hot steps of a scrape (browser launch, context creation, goto, #rate_box wait,
+# page.content(), parse, store write, HTML build), written once per run as a Prometheus
+# text-format file (node_exporter textfile collector) and a JSON summary.
+
+METRIC_PREFIX = "mortgage_scrape"
+# Upper bounds in seconds; parses take milliseconds, browser navigations tens of seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets) # Per bucket, not cumulative; cumulated on export
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def quantile(self, fraction: float) -> float | None:
+        """Upper bound of the bucket holding the `fraction` quantile (max for the overflow)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+class MetricsRegistry:
+    """Thread-safe (parses run in worker threads) histograms and counters keyed by
+    metric name and labels."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(_label_key(labels))
+            if histogram is None:
+                histogram = series[_label_key(labels)] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        """Observe the duration of the block under `name`, with outcome="error" added
+        when it raises (and "ok" otherwise)."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.observe(name, time.perf_counter() - started, outcome=outcome, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{METRIC_PREFIX}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_format_labels(key, (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+            for name, series in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_started_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_started_timestamp_seconds {self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """{'histograms': {name: [{labels, count, sum, p50, p95, max}]}, 'counters': {name: [{labels, value}]}}."""
+        with self._lock:
+            histograms = {
+                name: [{'labels': dict(key), 'count': histogram.count, 'sum_seconds': round(histogram.sum, 6),
+                        'p50_seconds': histogram.quantile(0.5), 'p95_seconds': histogram.quantile(0.95),
+                        'max_seconds': round(histogram.max, 6)}
+                       for key, histogram in sorted(series.items())]
+                for name, series in sorted(self.histograms.items())}
+            counters = {name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                        for name, series in sorted(self.counters.items())}
+        return {'started': self.started, 'finished': time.time(), 'histograms': histograms, 'counters': counters}
+
+    def write(self, prometheus_path: str, json_path: str, extra: dict | None = None):
+        """Write both exports, each through a temp file and a rename so a scraper or
+        collector never reads a partial file."""
+        summary = self.summary()
+        summary.update(extra or {})
+        for path, content in ((prometheus_path, self.prometheus_text()), (json_path, json.dumps(summary, indent=2) + "\n")):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, mode='w', encoding='utf-8') as outfile:
+                outfile.write(content)
+            os.replace(temp_path, path)
+
+# The registry every module records into
+METRICS = MetricsRegistry()
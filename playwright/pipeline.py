@@ -0,0 +1,186 @@
+import asyncio
+import sys
+import time
+from collections import deque
+
+LATENCY_SAMPLES = 10000 # Most recent handler durations kept per stage for percentiles
+
+def percentile(values, fraction: float) -> float | None:
+    """Nearest-rank percentile, e.g. percentile(durations, 0.95); None for no values."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class Stage:
+    """One step of a Pipeline: `workers` tasks take items from a bounded inbox and run
+    `handler(item)` on each (or on a list of up to `batch_size` items when batch_size > 1).
+    Whatever the handler returns (an iterable of items, or None) is passed to the next
+    stage; a full inbox blocks the stage upstream, which is the backpressure. `flush()`,
+    if given, runs once after everything upstream has drained (for stages that aggregate)."""
+
+    def __init__(self, name: str, handler, workers: int = 1, capacity: int = 1, batch_size: int = 1, flush=None):
+        self.name = name
+        self.handler = handler
+        self.flush = flush
+        self.workers = max(1, workers)
+        self.capacity = max(1, capacity)
+        self.batch_size = max(1, batch_size)
+        self.next = None # Set by Pipeline
+        self._inbox = asyncio.Queue() # (item, holds_capacity); the semaphore bounds it
+        self._space = asyncio.Semaphore(self.capacity)
+        self._unfinished = 0
+        self.busy = 0
+        self.received = 0
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.durations = deque(maxlen=LATENCY_SAMPLES) # Seconds per handler call
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return self._inbox.qsize()
+
+    @property
+    def pending(self) -> bool:
+        return self._unfinished > 0
+
+    async def put(self, item):
+        """Wait for room in the inbox, then queue the item."""
+        await self._space.acquire()
+        self._enqueue(item, True)
+
+    def requeue(self, item):
+        """Send back an item that already went through the pipeline's admission (e.g. a
+        fetch to retry with another tier). It skips the capacity check: waiting for room
+        here could deadlock two stages that are each waiting on the other."""
+        self._enqueue(item, False)
+
+    def _enqueue(self, item, holds_capacity):
+        self._inbox.put_nowait((item, holds_capacity))
+        self._unfinished += 1
+        self.received += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    async def _take(self):
+        item, holds_capacity = await self._inbox.get()
+        if holds_capacity:
+            self._space.release()
+        return item
+
+    async def _work(self):
+        while True:
+            items = [await self._take()]
+            while len(items) < self.batch_size and not self._inbox.empty():
+                items.append(await self._take())
+            self.busy += 1
+            started = time.monotonic()
+            try:
+                outputs = await self.handler(items if self.batch_size > 1 else items[0])
+                self.busy_seconds += time.monotonic() - started
+                self.durations.append(time.monotonic() - started)
+                await self.emit(outputs)
+                self.processed += len(items)
+            except Exception as e:
+                self.busy_seconds += time.monotonic() - started
+                self.errors += len(items)
+                print(f"[Pipeline] {self.name} failed on {len(items)} item(s): {e}", file=sys.stderr)
+            finally:
+                self.busy -= 1
+                for _ in items:
+                    self._unfinished -= 1
+                    self._inbox.task_done()
+
+    async def emit(self, outputs):
+        for output in outputs or ():
+            if self.next is not None:
+                await self.next.put(output)
+
+    def snapshot(self, elapsed: float) -> dict:
+        p50, p95 = percentile(self.durations, 0.5), percentile(self.durations, 0.95)
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'busy': self.busy,
+            'processed': self.processed,
+            'errors': self.errors,
+            'per_second': round(self.processed / elapsed, 3) if elapsed > 0 else 0.0,
+            'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 3) if p95 is not None else None,
+            # Share of the stage's worker time spent in its handler; the highest one is the bottleneck
+            'utilization': round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed > 0 else 0.0,
+        }
+
+class Pipeline:
+    """Linear chain of asyncio Stages fed by an async iterable source. The source waits
+    whenever the first stage's inbox is full, so every stage only runs as far ahead of
+    the slowest one as the capacities allow."""
+
+    def __init__(self, stages: list, source_name: str = "source", report=None, report_interval: float = 30.0):
+        self.stages = stages
+        self.source_name = source_name
+        self.admitted = 0
+        self.source_blocked = False # True while the source waits for room in the first stage
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        self.report = report # Called with snapshot() every report_interval seconds
+        self.report_interval = report_interval
+        self.started = None
+
+    def stage(self, name: str) -> Stage:
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        source = {'admitted': self.admitted, 'blocked': self.source_blocked,
+                  'per_second': round(self.admitted / elapsed, 3) if elapsed > 0 else 0.0}
+        return {self.source_name: source, **{stage.name: stage.snapshot(elapsed) for stage in self.stages}}
+
+    def bottleneck(self) -> str | None:
+        snapshot = {stage.name: stage.snapshot(time.monotonic() - self.started) for stage in self.stages} if self.started else {}
+        busiest = max(snapshot, key=lambda name: snapshot[name]['utilization'], default=None)
+        return busiest if busiest and snapshot[busiest]['utilization'] > 0 else None
+
+    async def _drain(self):
+        while any(stage.pending for stage in self.stages):
+            for stage in self.stages:
+                await stage._inbox.join()
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report(self.snapshot())
+
+    async def run(self, source):
+        """Push every item of `source` into the first stage and return once all stages
+        have drained (items requeued upstream included) and been flushed."""
+        self.started = time.monotonic()
+        workers = [asyncio.create_task(stage._work()) for stage in self.stages for _ in range(stage.workers)]
+        reporter = asyncio.create_task(self._report_periodically()) if self.report else None
+        try:
+            async for item in source:
+                self.source_blocked = True
+                await self.stages[0].put(item)
+                self.source_blocked = False
+                self.admitted += 1
+            await self._drain()
+            for stage in self.stages:
+                if stage.flush:
+                    await stage.emit(await stage.flush())
+                    await self._drain()
+        finally:
+            for task in workers + ([reporter] if reporter else []):
+                task.cancel()
+            await asyncio.gather(*workers, *([reporter] if reporter else []), return_exceptions=True)
+
+def format_snapshot(snapshot: dict) -> str:
+    """One log line per Pipeline.snapshot(): 'fetch depth=3 busy=4 processed=120 2.1/s util=0.93 | ...'."""
+    parts = []
+    for name, stats in snapshot.items():
+        if 'depth' in stats:
+            parts.append(f"{name} depth={stats['depth']} (max {stats['max_depth']}) busy={stats['busy']} processed={stats['processed']} "
+                         f"errors={stats['errors']} {stats['per_second']}/s p95={stats['p95_ms']}ms util={stats['utilization']}")
+        else:
+            parts.append(f"{name} admitted={stats['admitted']} {stats['per_second']}/s{' blocked' if stats['blocked'] else ''}")
+    return " | ".join(parts)
@@ -0,0 +1,88 @@
+import os
+import threading
+
+# Linux /proc readers for a process and its descendants (the Playwright driver and the
+# Chromium processes it starts); everything returns empty/zero where /proc is missing.
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def read_stat(pid: int) -> dict | None:
+    """{'pid', 'name', 'ppid', 'cpu_seconds', 'rss'} of one process, None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", mode='r', encoding='utf-8') as stat_file:
+            stat = stat_file.read()
+    except OSError:
+        return None
+    # The name is in parentheses and may itself contain spaces or parentheses
+    name = stat[stat.index('(') + 1:stat.rindex(')')]
+    fields = stat[stat.rindex(')') + 2:].split()
+    return {
+        'pid': pid,
+        'name': name,
+        'ppid': int(fields[1]),
+        'cpu_seconds': (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, # utime + stime
+        'rss': int(fields[21]) * PAGE_SIZE,
+    }
+
+def process_tree(root_pid: int) -> list:
+    """read_stat() of root_pid and all of its live descendants."""
+    try:
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return []
+    stats = {stat['pid']: stat for stat in map(read_stat, pids) if stat}
+    children = {}
+    for stat in stats.values():
+        children.setdefault(stat['ppid'], []).append(stat['pid'])
+    tree = []
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        if pid in stats:
+            tree.append(stats[pid])
+            pending.extend(children.get(pid, ()))
+    return tree
+
+def is_chromium(stat: dict) -> bool:
+    name = stat['name'].lower()
+    return 'chrom' in name or 'headless' in name
+
+def rss_by_group(root_pid: int) -> dict:
+    """Resident memory of the tree in bytes, split into the root process ('python'),
+    Chromium processes and anything else (e.g. the Playwright node driver)."""
+    groups = {'python': 0, 'chromium': 0, 'other': 0}
+    for stat in process_tree(root_pid):
+        group = 'python' if stat['pid'] == root_pid else 'chromium' if is_chromium(stat) else 'other'
+        groups[group] += stat['rss']
+    return groups
+
+class ProcessTreeSampler:
+    """Background thread tracking the peak RSS per rss_by_group() group (and of the
+    whole tree) of a process while it runs."""
+
+    def __init__(self, root_pid: int, interval: float = 0.2):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.peaks = {'python': 0, 'chromium': 0, 'other': 0, 'total': 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        groups = rss_by_group(self.root_pid)
+        groups['total'] = sum(groups.values())
+        for group, rss in groups.items():
+            self.peaks[group] = max(self.peaks[group], rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+from bs4 import BeautifulSoup
+from metrics import METRICS
+
+try:
+    import lxml.html
+except ImportError: # lxml is optional; the BeautifulSoup backend always works
+    lxml = None
+
+# Markers that identify an XHR/fetch payload carrying the #rate_box content
+RATE_PAYLOAD_MARKERS = ("sr-only", "Interest Rate")
+# Kinds of the raw content a result carries in 'raw_page' (see page_archive.py), by the parser that reads it back
+RAW_FRAGMENT = "fragment" # #rate_box HTML or a whole page: parse_rate_html()
+RAW_PAYLOAD = "payload" # XHR/fetch body: parse_rate_payload()
+
+def empty_result(credit_union: str, url: str) -> dict:
+    return {'credit_union': credit_union, 'link': url, 'rates_30_years': "None", 'best_rate': "None", 'status': "ERROR", 'error_message': "Unknown error"}
+
+# Every backend returns the same list of (loan_type, rate_str, apr_str, numeric_rate)
+# tuples, in document order, or [] when the page has no #rate_box.
+
+def _clean_loan_type(caption_text):
+    return caption_text.strip().replace(' - Conforming', '').replace(' - Jumbo', '').strip()
+
+def _numeric_rate(rate_str):
+    if not rate_str.endswith('%'):
+        return None
+    try:
+        return float(rate_str.strip('%'))
+    except ValueError:
+        return None
+
+def extract_rates_bs4(html_content: str) -> list:
+    soup = BeautifulSoup(html_content, 'html.parser')
+    rate_box = soup.find('div', id='rate_box')
+    if not rate_box:
+        return []
+
+    extracted = []
+    for table in rate_box.find_all('table', recursive=True):
+        caption_tag = table.find('caption')
+        if not caption_tag:
+            continue
+        loan_type = _clean_loan_type(caption_tag.text)
+        for row_data in table.find_all('tr'):
+            interest_rate_span = row_data.find('span', class_="sr-only", string="Interest Rate")
+            apr_span = row_data.find('span', class_="sr-only", string="APR")
+
+            if interest_rate_span and interest_rate_span.next_sibling:
+                rate_str = interest_rate_span.next_sibling.strip()
+                apr_str = "N/A"
+                if apr_span and apr_span.next_sibling:
+                    apr_str = apr_span.next_sibling.strip()
+                extracted.append((loan_type, rate_str, apr_str, _numeric_rate(rate_str)))
+    return extracted
+
+def _sr_only_span(row, label):
+    for span in row.iterfind(".//span"):
+        if 'sr-only' in (span.get('class') or '').split() and len(span) == 0 and span.text == label:
+            return span
+    return None
+
+def extract_rates_lxml(html_content: str) -> list:
+    if lxml is None:
+        raise RuntimeError("lxml is not installed")
+    document = lxml.html.fromstring(html_content)
+    rate_boxes = document.xpath('//div[@id="rate_box"]')
+    if not rate_boxes:
+        return []
+
+    extracted = []
+    for table in rate_boxes[0].iterfind('.//table'):
+        caption_tag = next(table.iterfind('.//caption'), None)
+        if caption_tag is None:
+            continue
+        loan_type = _clean_loan_type(caption_tag.text_content())
+        for row_data in table.iterfind('.//tr'):
+            interest_rate_span = _sr_only_span(row_data, "Interest Rate")
+            if interest_rate_span is None or not interest_rate_span.tail:
+                continue
+            rate_str = interest_rate_span.tail.strip()
+            apr_str = "N/A"
+            apr_span = _sr_only_span(row_data, "APR")
+            if apr_span is not None and apr_span.tail:
+                apr_str = apr_span.tail.strip()
+            extracted.append((loan_type, rate_str, apr_str, _numeric_rate(rate_str)))
+    return extracted
+
+# Same walk as extract_rates_bs4, run inside the page so the DOM never has to be
+# serialised with page.content() and re-parsed in Python.
+EXTRACT_RATES_JS = """
+() => {
+    const rateBox = document.querySelector('div#rate_box');
+    if (!rateBox) return [];
+    const cleanLoanType = text => text.trim().split(' - Conforming').join('').split(' - Jumbo').join('').trim();
+    const srOnly = (row, label) => Array.from(row.querySelectorAll('span.sr-only'))
+        .find(span => span.children.length === 0 && span.textContent === label);
+    const numericRate = rate => {
+        if (!rate.endsWith('%')) return null;
+        const digits = rate.replace(/^%+|%+$/g, '').trim();
+        return /^[+-]?(\\d+\\.?\\d*|\\.\\d+)([eE][+-]?\\d+)?$/.test(digits) ? Number(digits) : null;
+    };
+    const extracted = [];
+    for (const table of rateBox.querySelectorAll('table')) {
+        const caption = table.querySelector('caption');
+        if (!caption) continue;
+        const loanType = cleanLoanType(caption.textContent);
+        for (const row of table.querySelectorAll('tr')) {
+            const rateSpan = srOnly(row, 'Interest Rate');
+            if (!rateSpan || !rateSpan.nextSibling || rateSpan.nextSibling.nodeType !== Node.TEXT_NODE) continue;
+            const rate = rateSpan.nextSibling.textContent.trim();
+            let apr = 'N/A';
+            const aprSpan = srOnly(row, 'APR');
+            if (aprSpan && aprSpan.nextSibling && aprSpan.nextSibling.nodeType === Node.TEXT_NODE) {
+                apr = aprSpan.nextSibling.textContent.trim();
+            }
+            extracted.push([loanType, rate, apr, numericRate(rate)]);
+        }
+    }
+    return extracted;
+}
+"""
+
+async def extract_rates_in_page(page) -> list:
+    return [tuple(item) for item in await page.evaluate(EXTRACT_RATES_JS)]
+
+# Backends that take serialised HTML
+HTML_EXTRACTORS = {
+    'bs4': extract_rates_bs4,
+    'lxml': extract_rates_lxml,
+}
+IN_PAGE_EXTRACTOR = 'evaluate'
+
+def default_extractor_name() -> str:
+    """SCRAPE_EXTRACTOR picks the backend; lxml is preferred when installed."""
+    name = os.environ.get("SCRAPE_EXTRACTOR")
+    if name:
+        return name
+    return 'lxml' if lxml is not None else 'bs4'
+
+def get_html_extractor(name: str | None = None):
+    name = name or default_extractor_name()
+    if name == IN_PAGE_EXTRACTOR or name not in HTML_EXTRACTORS:
+        # The in-page backend only applies to live pages; static HTML uses the best HTML backend
+        name = 'lxml' if lxml is not None else 'bs4'
+    if name == 'lxml' and lxml is None:
+        print("[RateExtractors] lxml not installed, using bs4", file=sys.stderr)
+        name = 'bs4'
+    return HTML_EXTRACTORS[name]
+
+def summarize_rates(extracted: list) -> dict:
+    """Turn extracted tuples into the 'rates_30_years'/'best_rate' fields of a scrape result,
+    plus 'rates' with the structured [loan_type, rate, apr, numeric_rate] rows."""
+    summary = {'rates_30_years': "None", 'best_rate': "None", 'rates': [list(item) for item in extracted]}
+    if not extracted:
+        return summary
+
+    formatted_rates_30_years = []
+    all_numeric_rates = []
+    for loan_type, rate_str, _, numeric_rate in extracted:
+        formatted_rates_30_years.append(f"{loan_type}-{rate_str}")
+        if numeric_rate is not None:
+            all_numeric_rates.append((numeric_rate, f"{loan_type}-{rate_str}"))
+
+    summary['rates_30_years'] = "|".join(formatted_rates_30_years)
+    if all_numeric_rates:
+        best_rate_info = min(all_numeric_rates, key=lambda item: item[0])
+        summary['best_rate'] = best_rate_info[1]
+    return summary
+
+def parse_rate_html(html_content: str, url: str = "", extractor: str | None = None) -> dict:
+    extract_rates = get_html_extractor(extractor)
+    print(f"[RateExtractors] Parsing HTML with {extract_rates.__name__} for {url}", file=sys.stderr)
+    with METRICS.timed("parse", extractor=extract_rates.__name__):
+        return summarize_rates(extract_rates(html_content))
+
+def _collect_json_strings(value, found):
+    if isinstance(value, str):
+        if all(marker in value for marker in RATE_PAYLOAD_MARKERS):
+            found.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_json_strings(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_json_strings(item, found)
+
+def parse_rate_payload(payload: str, url: str = "") -> dict:
+    """Parse a network response body that fills the rate box: either an HTML
+    fragment or JSON whose string values hold such fragments."""
+    stripped = payload.lstrip()
+    if stripped.startswith(('{', '[')):
+        try:
+            fragments = []
+            _collect_json_strings(json.loads(stripped), fragments)
+            payload = "".join(fragments)
+        except ValueError:
+            pass
+    if 'rate_box' not in payload:
+        # Fragments hold the inner tables only; wrap them so the same parser applies
+        payload = f'<div id="rate_box">{payload}</div>'
+    return parse_rate_html(payload, url)
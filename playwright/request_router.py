@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import urllib.parse
+
+# Resource types (Playwright's request.resource_type) that never contribute to #rate_box
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+# Third-party hosts whose requests are dropped regardless of type
+DEFAULT_DENIED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "newrelic.com",
+    "nr-data.net",
+)
+# Static asset types worth keeping in the shared on-disk cache
+CACHEABLE_RESOURCE_TYPES = ("script", "stylesheet", "image", "font")
+DEFAULT_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+DEFAULT_ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "asset_cache")
+
+def _host_matches(host, patterns):
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+def _split_env_list(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return tuple(default)
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+class RouteRules:
+    """Allow/deny rules by resource type and host. Allowed hosts win over every deny rule."""
+
+    def __init__(self, blocked_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES, denied_hosts=DEFAULT_DENIED_HOSTS, allowed_hosts=()):
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.denied_hosts = tuple(denied_hosts)
+        self.allowed_hosts = tuple(allowed_hosts)
+
+    @classmethod
+    def from_env(cls):
+        """SCRAPE_BLOCK_TYPES, SCRAPE_DENY_HOSTS and SCRAPE_ALLOW_HOSTS are comma separated overrides."""
+        return cls(
+            blocked_resource_types=_split_env_list("SCRAPE_BLOCK_TYPES", DEFAULT_BLOCKED_RESOURCE_TYPES),
+            denied_hosts=_split_env_list("SCRAPE_DENY_HOSTS", DEFAULT_DENIED_HOSTS),
+            allowed_hosts=_split_env_list("SCRAPE_ALLOW_HOSTS", ()),
+        )
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        host = urllib.parse.urlsplit(url).hostname or ""
+        if self.allowed_hosts and _host_matches(host, self.allowed_hosts):
+            return True
+        if resource_type in self.blocked_resource_types:
+            return False
+        if _host_matches(host, self.denied_hosts):
+            return False
+        return True
+
+class AssetCache:
+    """Persistent cache of static asset responses shared by every page (and every run)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_ASSET_CACHE_DIR, max_age_seconds: float = DEFAULT_CACHE_MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".body", base + ".json"
+
+    def get(self, url):
+        """Return (meta, body) for a fresh entry or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, mode='r', encoding='utf-8') as mf:
+                meta = json.load(mf)
+            if time.time() - meta.get("stored_at", 0) > self.max_age_seconds:
+                return None
+            with open(body_path, mode='rb') as bf:
+                body = bf.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, status, headers, body, fetch_seconds):
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        meta = {"url": url, "status": status, "headers": headers, "fetch_seconds": fetch_seconds, "stored_at": time.time()}
+        # Write to temp files and rename so concurrent pages never read a partial entry
+        suffix = f".{os.getpid()}.{id(body)}.tmp"
+        with open(body_path + suffix, mode='wb') as bf:
+            bf.write(body)
+        with open(meta_path + suffix, mode='w', encoding='utf-8') as mf:
+            json.dump(meta, mf)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+
+class PageLoadStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.blocked = 0
+        self.cache_hits = 0
+        self.bytes_fetched = 0
+        self.bytes_from_cache = 0
+        self.fetch_seconds = 0.0
+        self.seconds_saved = 0.0
+
+    def summary(self) -> dict:
+        return {
+            'requests': self.requests,
+            'blocked': self.blocked,
+            'cache_hits': self.cache_hits,
+            'bytes_fetched': self.bytes_fetched,
+            'bytes_from_cache': self.bytes_from_cache,
+            'fetch_seconds': round(self.fetch_seconds, 3),
+            'seconds_saved': round(self.seconds_saved, 3),
+        }
+
+class RequestRouter:
+    """Routes every request of a page through the rules and the shared asset cache."""
+
+    def __init__(self, rules: RouteRules | None = None, cache: AssetCache | None = None):
+        self.rules = rules or RouteRules()
+        self.cache = cache
+
+    @classmethod
+    def from_env(cls):
+        """Lean mode is on unless SCRAPE_LEAN=0; SCRAPE_ASSET_CACHE_DIR overrides the cache location."""
+        if os.environ.get("SCRAPE_LEAN", "1") == "0":
+            return None
+        return cls(RouteRules.from_env(), AssetCache(os.environ.get("SCRAPE_ASSET_CACHE_DIR", DEFAULT_ASSET_CACHE_DIR)))
+
+    async def attach(self, page) -> PageLoadStats:
+        stats = PageLoadStats()
+
+        async def handle(route):
+            await self._handle(route, stats)
+
+        def count_passthrough_bytes(response):
+            # Documents/XHRs bypass route.fetch(), so their size comes from the response headers
+            if self.cache is not None and response.request.resource_type in CACHEABLE_RESOURCE_TYPES:
+                return
+            try:
+                stats.bytes_fetched += int(response.headers.get("content-length", 0))
+            except ValueError:
+                pass
+
+        await page.route("**/*", handle)
+        page.on("response", count_passthrough_bytes)
+        return stats
+
+    async def _handle(self, route, stats):
+        request = route.request
+        stats.requests += 1
+        if not self.rules.allows(request.resource_type, request.url):
+            stats.blocked += 1
+            await route.abort("blockedbyclient")
+            return
+
+        cacheable = self.cache is not None and request.method == "GET" and request.resource_type in CACHEABLE_RESOURCE_TYPES
+        if cacheable:
+            cached = self.cache.get(request.url)
+            if cached:
+                meta, body = cached
+                stats.cache_hits += 1
+                stats.bytes_from_cache += len(body)
+                stats.seconds_saved += meta.get("fetch_seconds", 0.0)
+                await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+                return
+
+        if not cacheable:
+            # Documents and XHRs go straight to the network untouched
+            await route.continue_()
+            return
+
+        started = time.perf_counter()
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            print(f"[RequestRouter] Error fetching {request.url}: {e}", file=sys.stderr)
+            await route.abort()
+            return
+        elapsed = time.perf_counter() - started
+        stats.fetch_seconds += elapsed
+        stats.bytes_fetched += len(body)
+        if response.status == 200:
+            headers = {name: value for name, value in response.headers.items() if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+            try:
+                self.cache.put(request.url, response.status, headers, body, elapsed)
+            except OSError as e:
+                print(f"[RequestRouter] Could not cache {request.url}: {e}", file=sys.stderr)
+        await route.fulfill(response=response, body=body)
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+class SchedulerConfig:
+    """Throughput/politeness targets. Every field can be overridden from the
+    environment with the SCRAPE_ prefix, e.g. SCRAPE_MAX_RATE=2."""
+
+    def __init__(self, initial_rate=1.0, min_rate=0.05, max_rate=4.0, initial_concurrency=2, min_concurrency=1,
+                 max_concurrency=8, target_latency=20.0, max_error_rate=0.2, additive_increase=0.1,
+                 multiplicative_decrease=0.5, window=10, burst=2):
+        self.initial_rate = initial_rate # Requests per second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency # Seconds; slower successes count as congestion
+        self.max_error_rate = max_error_rate # Congestion share over the window that triggers a decrease
+        self.additive_increase = additive_increase # Requests per second added per healthy result
+        self.multiplicative_decrease = multiplicative_decrease
+        self.window = window # Results per concurrency step and error-rate window
+        self.burst = burst # Token bucket capacity
+
+    @classmethod
+    def from_env(cls, **overrides):
+        config = cls(**overrides)
+        for name, value in vars(config).items():
+            env_value = os.environ.get(f"SCRAPE_{name.upper()}")
+            if env_value is not None:
+                setattr(config, name, type(value)(float(env_value)) if isinstance(value, int) else float(env_value))
+        return config
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AdaptiveScheduler:
+    """Paces scrapes with a token bucket (request rate) and a dynamic in-flight
+    limit (concurrency), both adjusted AIMD-style from the observed results:
+    healthy results grow the rate additively (and concurrency by one per
+    window), while a congestion signal (timeout, overload error or slow
+    response) halves both once the share of such signals over the window
+    exceeds max_error_rate. Only results that started after the last decrease can
+    trigger another one, so one burst of failures backs off once."""
+
+    def __init__(self, config: SchedulerConfig | None = None):
+        self.config = config or SchedulerConfig()
+        self.bucket = TokenBucket(self.config.initial_rate, self.config.burst)
+        self.concurrency = min(self.config.initial_concurrency, self.config.max_concurrency)
+        self.in_flight = 0
+        self.completed = 0
+        self.decreases = 0
+        self._healthy_streak = 0
+        self._last_decrease = 0.0
+        self._outcomes = deque(maxlen=self.config.window)
+        self._slot_freed = asyncio.Condition()
+
+    @property
+    def current_rate(self) -> float:
+        return self.bucket.rate
+
+    def snapshot(self) -> dict:
+        return {
+            'rate': round(self.current_rate, 3),
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'decreases': self.decreases,
+            'error_rate': round(self.error_rate, 3),
+        }
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def observe(self, started: float, duration: float, congested: bool):
+        """Feed one finished scrape back into the controller."""
+        config = self.config
+        self.completed += 1
+        slow = duration is not None and duration > config.target_latency
+        self._outcomes.append(1 if (congested or slow) else 0)
+
+        if (congested or slow) and self.error_rate > config.max_error_rate and started >= self._last_decrease:
+            self.bucket.rate = max(config.min_rate, self.bucket.rate * config.multiplicative_decrease)
+            self.concurrency = max(config.min_concurrency, int(self.concurrency * config.multiplicative_decrease))
+            self._last_decrease = time.monotonic()
+            self._healthy_streak = 0
+            self.decreases += 1
+            print(f"[Scheduler] Backing off: {self.snapshot()}", file=sys.stderr)
+            return
+        if congested or slow:
+            return
+
+        self.bucket.rate = min(config.max_rate, self.bucket.rate + config.additive_increase)
+        self._healthy_streak += 1
+        if self._healthy_streak >= config.window and self.concurrency < config.max_concurrency:
+            self.concurrency += 1
+            self._healthy_streak = 0
+
+    async def _acquire_slot(self):
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+
+    async def _release_slot(self):
+        async with self._slot_freed:
+            self.in_flight -= 1
+            self._slot_freed.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one in-flight slot (and spend one rate token) for a scrape the caller runs
+        itself, e.g. from a pipeline stage's workers; report its outcome with observe()."""
+        await self._acquire_slot()
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            await self._release_slot()
@@ -1,117 +1,185 @@
 import asyncio
 import argparse
+import os
 import sys
 import json
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from rate_extractors import (IN_PAGE_EXTRACTOR, RATE_PAYLOAD_MARKERS, RAW_FRAGMENT, RAW_PAYLOAD, default_extractor_name,
+                             empty_result, extract_rates_in_page, parse_rate_html, parse_rate_payload, summarize_rates)
+from request_router import RequestRouter
+from change_detector import extract_rate_box_fragment
+from metrics import METRICS
 
-async def scrape_single_url(credit_union: str, url: str) -> dict:
-    result = {'credit_union': credit_union, 'link': url, 'rates_30_years': "None", 'best_rate': "None", 'status': "ERROR", 'error_message': "Unknown error"}
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-crash-reporter",
+    "--disable-extensions",
+    "--single-process",
+    "--no-zygote"
+]
 
-    async with async_playwright() as p:
-        print(f"[Playwright] Launching browser for {url}", file=sys.stderr)
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-software-rasterizer",
-                "--disable-crash-reporter",
-                "--disable-extensions",
-                "--single-process",
-                "--no-zygote"
-            ]
-        )
-        page = await browser.new_page()
-        print(f"[Playwright] New page created for {url}", file=sys.stderr)
+CAPTURE_NETWORK_DEFAULT = os.environ.get("SCRAPE_CAPTURE_NETWORK", "1") != "0"
+NETWORK_IDLE_TIMEOUT_MS = 30000
+RATE_BOX_TIMEOUT_MS = 15000
+# Once the network is idle nothing else will fill #rate_box, so the DOM fallback barely waits
+RATE_BOX_AFTER_IDLE_TIMEOUT_MS = 1000
+# The #rate_box markup the in-page extractor read, archived like the DOM path's fragment
+RATE_BOX_HTML_JS = "() => { const rateBox = document.querySelector('div#rate_box'); return rateBox ? rateBox.outerHTML : null; }"
+
+class RateResponseCapture:
+    """Listens for the XHR/fetch responses that carry the rate tables and
+    resolves `parsed` with the first one that yields rates."""
+
+    def __init__(self, page, url: str):
+        self.page = page
+        self.url = url
+        self.parsed = asyncio.get_running_loop().create_future()
+        self._tasks = set()
+
+    def __enter__(self):
+        self.page.on("response", self._on_response)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.page.remove_listener("response", self._on_response)
+        for task in self._tasks:
+            task.cancel()
+        if not self.parsed.done():
+            self.parsed.cancel()
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch") or self.parsed.done():
+            return
+        task = asyncio.create_task(self._inspect(response))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _inspect(self, response):
         try:
-            print(f"[Playwright] Going to URL: {url}", file=sys.stderr)
-            await page.goto(url, wait_until="domcontentloaded", timeout=90000) # Increased timeout to 90 seconds
-            print(f"[Playwright] Page loaded for {url}", file=sys.stderr)
-            
-            try:
-                print(f"[Playwright] Waiting for #rate_box for {url}", file=sys.stderr)
-                await page.wait_for_selector('#rate_box', timeout=15000) # Wait up to 15 seconds for the element
-                print(f"[Playwright] #rate_box found for {url}", file=sys.stderr)
-            except Exception as e:
-                print(f"[Playwright] #rate_box not found or timed out for {url}: {e}", file=sys.stderr)
-                # If rate_box is not found, we still proceed to get content, it might be in static HTML
-                pass
+            body = await response.text()
+        except Exception:
+            return
+        if not all(marker in body for marker in RATE_PAYLOAD_MARKERS):
+            return
+        parsed = parse_rate_payload(body, self.url)
+        if parsed['rates_30_years'] != "None" and not self.parsed.done():
+            print(f"[Playwright] Rates captured from {response.url} for {self.url}", file=sys.stderr)
+            parsed['raw_page'] = body
+            parsed['raw_kind'] = RAW_PAYLOAD
+            self.parsed.set_result(parsed)
 
-            html_content = await page.content()
-            print(f"[Playwright] Fetched HTML content for {url}", file=sys.stderr)
-            
-            if not html_content:
-                result['error_message'] = "No HTML content returned from Playwright"
-                return result
+    async def wait(self):
+        """Return the parsed rates as soon as a rate response arrives, or None
+        once the page's network has gone idle without one."""
+        idle = asyncio.create_task(self.page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT_MS))
+        try:
+            await asyncio.wait({self.parsed, idle}, return_when=asyncio.FIRST_COMPLETED)
+            if not self.parsed.done() and self._tasks:
+                # Responses that arrived just before idle may still be being read
+                await asyncio.wait(set(self._tasks))
+            return self.parsed.result() if self.parsed.done() and not self.parsed.cancelled() else None
+        finally:
+            if idle.done() and not idle.cancelled():
+                idle.exception() # A networkidle timeout just means we fall back to the DOM
+            idle.cancel()
 
-            try:
-                print(f"[BeautifulSoup] Parsing HTML for {url}", file=sys.stderr)
-                soup = BeautifulSoup(html_content, 'html.parser')
-                print(f"[BeautifulSoup] Finding #rate_box for {url}", file=sys.stderr)
-                rate_box = soup.find('div', id='rate_box')
-                
-                if rate_box:
-                    print(f"[BeautifulSoup] Found #rate_box. Iterating tables for {url}", file=sys.stderr)
-                    all_extracted_rates_info = []
-                    for table in rate_box.find_all('table', recursive=True):
-                        caption_tag = table.find('caption')
-                        if caption_tag:
-                            loan_type = caption_tag.text.strip()
-                            loan_type = loan_type.replace(' - Conforming', '').replace(' - Jumbo', '').strip()
-
-                            print(f"[BeautifulSoup] Iterating rows for loan type '{loan_type}' for {url}", file=sys.stderr)
-                            for row_data in table.find_all('tr'):
-                                interest_rate_span = row_data.find('span', class_="sr-only", string="Interest Rate")
-                                apr_span = row_data.find('span', class_="sr-only", string="APR")
-
-                                if interest_rate_span and interest_rate_span.next_sibling:
-                                    rate_str = interest_rate_span.next_sibling.strip()
-                                    if rate_str.endswith('%'):
-                                        numeric_rate = None
-                                        try:
-                                            numeric_rate = float(rate_str.strip('%'))
-                                        except ValueError:
-                                            pass
-
-                                    apr_str = "N/A"
-                                    if apr_span and apr_span.next_sibling:
-                                        apr_str = apr_span.next_sibling.strip()
-
-                                    all_extracted_rates_info.append((loan_type, rate_str, apr_str, numeric_rate))
-
-                    if all_extracted_rates_info:
-                        formatted_rates_30_years = []
-                        all_numeric_rates = []
-                        for loan_type, rate_str, _, numeric_rate in all_extracted_rates_info:
-                            formatted_rates_30_years.append(f"{loan_type}-{rate_str}")
-                            if numeric_rate is not None:
-                                all_numeric_rates.append((numeric_rate, f"{loan_type}-{rate_str}"))
-
-                        result['rates_30_years'] = "|".join(formatted_rates_30_years)
-
-                        if all_numeric_rates:
-                            best_rate_info = min(all_numeric_rates, key=lambda item: item[0])
-                            result['best_rate'] = best_rate_info[1]
-                        else:
-                            result['best_rate'] = "None"
-
-                    else:
-                        result['rates_30_years'] = "None"
-                        result['best_rate'] = "None"
-                
+async def scrape_page(page, credit_union: str, url: str, capture_network: bool = CAPTURE_NETWORK_DEFAULT) -> dict:
+    """Scrape one credit union using an already open page (owned by the caller).
+
+    With capture_network the rates are parsed straight from the XHR/fetch
+    response that fills #rate_box; the DOM path below is only the fallback."""
+    result = empty_result(credit_union, url)
+    rate_box_timeout = RATE_BOX_TIMEOUT_MS
+    try:
+        print(f"[Playwright] Going to URL: {url}", file=sys.stderr)
+        if capture_network:
+            with RateResponseCapture(page, url) as capture:
+                with METRICS.timed("goto"):
+                    await page.goto(url, wait_until="domcontentloaded", timeout=90000) # Increased timeout to 90 seconds
+                print(f"[Playwright] Page loaded for {url}", file=sys.stderr)
+                with METRICS.timed("rate_response_wait"):
+                    parsed = await capture.wait()
+            if parsed:
+                result.update(parsed)
+                result['extraction'] = "network"
                 result['status'] = "SUCCESS"
                 result['error_message'] = ""
                 return result
+            print(f"[Playwright] No rate response captured for {url}, falling back to DOM", file=sys.stderr)
+            rate_box_timeout = RATE_BOX_AFTER_IDLE_TIMEOUT_MS
+        else:
+            with METRICS.timed("goto"):
+                await page.goto(url, wait_until="domcontentloaded", timeout=90000) # Increased timeout to 90 seconds
+            print(f"[Playwright] Page loaded for {url}", file=sys.stderr)
+        result['extraction'] = "dom"
 
+        try:
+            print(f"[Playwright] Waiting for #rate_box for {url}", file=sys.stderr)
+            with METRICS.timed("rate_box_wait"):
+                await page.wait_for_selector('#rate_box', timeout=rate_box_timeout) # Wait up to 15 seconds for the element (1s after network idle)
+            print(f"[Playwright] #rate_box found for {url}", file=sys.stderr)
+        except Exception as e:
+            print(f"[Playwright] #rate_box not found or timed out for {url}: {e}", file=sys.stderr)
+            # If rate_box is not found, we still proceed to get content, it might be in static HTML
+            pass
+
+        if default_extractor_name() == IN_PAGE_EXTRACTOR:
+            try:
+                with METRICS.timed("parse", extractor=IN_PAGE_EXTRACTOR):
+                    extracted = await extract_rates_in_page(page)
+                result.update(summarize_rates(extracted))
+                fragment = await page.evaluate(RATE_BOX_HTML_JS)
+                if fragment:
+                    result['raw_page'] = fragment
+                    result['raw_kind'] = RAW_FRAGMENT
+                result['status'] = "SUCCESS"
+                result['error_message'] = ""
             except Exception as e:
-                result['error_message'] = f"Error parsing HTML: {e}"
-                return result
+                result['error_message'] = f"Error extracting rates in page: {e}"
+            return result
+
+        with METRICS.timed("page_content"):
+            html_content = await page.content()
+        print(f"[Playwright] Fetched HTML content for {url}", file=sys.stderr)
+
+        if not html_content:
+            result['error_message'] = "No HTML content returned from Playwright"
+            return result
+
+        result['raw_page'] = extract_rate_box_fragment(html_content) or html_content
+        result['raw_kind'] = RAW_FRAGMENT
+        try:
+            result.update(parse_rate_html(html_content, url))
+            result['status'] = "SUCCESS"
+            result['error_message'] = ""
+            return result
 
         except Exception as e:
-            result['error_message'] = f"Error fetching URL with Playwright: {e}"
+            result['error_message'] = f"Error parsing HTML: {e}"
+            return result
+
+    except Exception as e:
+        result['error_message'] = f"Error fetching URL with Playwright: {e}"
+        return result
+
+async def scrape_single_url(credit_union: str, url: str) -> dict:
+    async with async_playwright() as p:
+        print(f"[Playwright] Launching browser for {url}", file=sys.stderr)
+        with METRICS.timed("browser_launch"):
+            browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        with METRICS.timed("context_create"):
+            page = await browser.new_page()
+        print(f"[Playwright] New page created for {url}", file=sys.stderr)
+        router = RequestRouter.from_env()
+        load_stats = await router.attach(page) if router else None
+        try:
+            result = await scrape_page(page, credit_union, url)
+            if load_stats:
+                result['page_load'] = load_stats.summary()
             return result
         finally:
             await browser.close()
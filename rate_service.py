@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import bisect
+import argparse
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rate_store import site_id_from_link
+from convert_csv_to_html import CATEGORIES, file_hash, read_credit_unions
+
+DEFAULT_PORT = 8701
+POLL_INTERVAL = float(os.environ.get("SCRAPE_SERVICE_POLL_INTERVAL", 2)) # Seconds between checks for a new export
+RESPONSE_CACHE_SIZE = 1024 # Encoded responses kept per data version
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 1000
+NAME_SEPARATOR = "\n" # Between the names of RateIndex.name_blob; never part of a query
+
+class RateIndex:
+    """Immutable in-memory snapshot of one export of the rate store (mortgage_rates.csv),
+    indexed for the service's queries:
+      - by_category[category]: credit unions offering a program in the category, ordered by
+        their best rate there (no numeric rate last), so top-k is a slice;
+      - names: (lowercased name, index) sorted, for prefix search by bisection, and
+        name_blob, every lowercased name joined by "\\n", for substring search with str.find;
+      - by_site_id: siteId -> credit union.
+    The indexes are never modified after they are built; the service swaps in a new snapshot.
+    Responses are cached on the snapshot, i.e. keyed on its data version."""
+
+    def __init__(self, credit_unions: list, data_version: str, source_stat=None):
+        self.credit_unions = credit_unions
+        self.data_version = data_version # sha256[:12] of the CSV, the page's dataVersion
+        self.source_stat = source_stat
+        self.loaded_at = time.time()
+        self.sheet_count = len({credit_union['sheet'] for credit_union in credit_unions})
+
+        self.by_site_id = {site_id_from_link(credit_union['Link']): index for index, credit_union in enumerate(credit_unions)}
+        self.by_category = {}
+        for category in CATEGORIES:
+            offering = [index for index, credit_union in enumerate(credit_unions) if category in credit_union['best']]
+            offering.sort(key=lambda index: (self.best_rate(index, category) is None, self.best_rate(index, category) or 0,
+                                             credit_unions[index]['CreditUnion'].lower()))
+            self.by_category[category] = offering
+
+        lowered = [credit_union['CreditUnion'].lower() for credit_union in credit_unions]
+        self.names = sorted((name, index) for index, name in enumerate(lowered))
+        self.name_blob = NAME_SEPARATOR.join(lowered)
+        self.name_starts = [] # Offset of each name in name_blob, in index order
+        offset = 0
+        for name in lowered:
+            self.name_starts.append(offset)
+            offset += len(name) + 1
+
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, csv_path: str):
+        stat = os.stat(csv_path)
+        return cls(read_credit_unions(csv_path), file_hash(csv_path)[:12], source_stat=(stat.st_ino, stat.st_mtime_ns, stat.st_size))
+
+    def best_rate(self, index: int, category: str):
+        """Numeric best rate of a credit union in a category, None without one."""
+        credit_union = self.credit_unions[index]
+        position = credit_union['best'].get(category, -1)
+        return credit_union['parsedRates'][position]['numericRate'] if position >= 0 else None
+
+    def entry(self, index: int, category: str | None = None) -> dict:
+        credit_union = self.credit_unions[index]
+        entry = {'creditUnion': credit_union['CreditUnion'], 'siteId': site_id_from_link(credit_union['Link']), 'link': credit_union['Link']}
+        if category is not None:
+            position = credit_union['best'].get(category, -2)
+            best = credit_union['parsedRates'][position] if position >= 0 else None
+            entry.update({'category': category, 'program': best['loanTypeFull'] if best else None,
+                          'rate': best['rateStr'] if best else None, 'numericRate': best['numericRate'] if best else None})
+        return entry
+
+    def top(self, category: str, limit: int) -> list:
+        return [self.entry(index, category) for index in self.by_category[category][:limit]]
+
+    def search(self, query: str, mode: str = "substring", category: str | None = None, limit: int = DEFAULT_LIMIT) -> list:
+        """Credit unions whose name starts with (mode="prefix") or contains the query, case
+        insensitive, in name order; with a category only those offering a program in it.
+        An empty or blank query matches every credit union."""
+        query = query.lower().replace(NAME_SEPARATOR, "") # A match must not span two names
+        if not self.credit_unions:
+            return []
+        if not query.strip():
+            matches = [index for _, index in self.names]
+        elif mode == "prefix":
+            start = bisect.bisect_left(self.names, (query,))
+            matches = []
+            for name, index in self.names[start:]:
+                if not name.startswith(query):
+                    break
+                matches.append(index)
+        else:
+            matches = set()
+            found = self.name_blob.find(query)
+            while found != -1:
+                index = bisect.bisect_right(self.name_starts, found) - 1
+                matches.add(index)
+                if index + 1 >= len(self.name_starts):
+                    break # Matched in the last name
+                found = self.name_blob.find(query, self.name_starts[index + 1])
+            matches = sorted(matches, key=lambda index: self.credit_unions[index]['CreditUnion'].lower())
+        if category is not None:
+            matches = [index for index in matches if category in self.credit_unions[index]['best']]
+        return [self.entry(index, category) for index in matches[:limit]]
+
+    def credit_union(self, site_id: str) -> dict | None:
+        index = self.by_site_id.get(site_id)
+        if index is None:
+            return None
+        credit_union = self.credit_unions[index]
+        entry = self.entry(index)
+        entry['rates'] = [{'program': rate['loanTypeFull'], 'rate': rate['rateStr'], 'numericRate': rate['numericRate']}
+                          for rate in credit_union['parsedRates']]
+        entry['best'] = {category: self.entry(index, category) for category in credit_union['best']}
+        return entry
+
+    def info(self) -> dict:
+        return {'dataVersion': self.data_version, 'creditUnions': len(self.credit_unions), 'sheets': self.sheet_count,
+                'categories': {category: len(indices) for category, indices in self.by_category.items()},
+                'loadedAt': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at))}
+
+    def cached_response(self, key: str, build) -> bytes:
+        """Encoded JSON for key, built once per snapshot (least recently used dropped first)."""
+        with self._lock:
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                return body
+        body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._responses[key] = body
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return body
+
+class RateService:
+    """Holds the current RateIndex and replaces it when a scrape publishes a new export.
+    The export is written to a temp file and renamed over the CSV (RateStore.export_csv),
+    so a changed inode, mtime or size means a complete new export. The replacement index
+    is built on the watcher thread and swapped in with one assignment: requests already
+    running finish on the snapshot they started with, and none wait for the reload."""
+
+    def __init__(self, csv_path: str, poll_interval: float = POLL_INTERVAL):
+        self.csv_path = csv_path
+        self.poll_interval = poll_interval
+        self.index = RateIndex.load(csv_path)
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def reload(self, force: bool = False) -> bool:
+        """Swap in a new index if the export changed since the current one; returns True if it did."""
+        with self._reload_lock:
+            try:
+                stat = os.stat(self.csv_path)
+            except OSError as e:
+                print(f"[RateService] Could not stat {self.csv_path}: {e}", file=sys.stderr)
+                return False
+            if not force and (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self.index.source_stat:
+                return False
+            try:
+                index = RateIndex.load(self.csv_path)
+            except (OSError, ValueError, StopIteration) as e:
+                print(f"[RateService] Could not load {self.csv_path}, keeping data version {self.index.data_version}: {e}", file=sys.stderr)
+                return False
+            if index.data_version == self.index.data_version and not force:
+                self.index.source_stat = index.source_stat # Rewritten with the same content
+                return False
+            self.index = index
+            self.reloads += 1
+            print(f"[RateService] Loaded data version {index.data_version}: {len(index.credit_unions)} credit unions", file=sys.stderr)
+            return True
+
+    def start_watcher(self):
+        def watch():
+            while not self._stop.wait(self.poll_interval):
+                self.reload()
+        self._watcher = threading.Thread(target=watch, name="rate-service-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+def positive_int(value, default: int) -> int:
+    try:
+        return max(1, min(int(value), MAX_LIMIT))
+    except (TypeError, ValueError):
+        return default
+
+def route(service: RateService, index: RateIndex, path: str, query: dict) -> tuple:
+    """(status, cache key or None, payload builder) of a GET against one snapshot."""
+    def param(name, default=None):
+        return query.get(name, [default])[0]
+
+    category = param('category')
+    if category is not None and category not in CATEGORIES:
+        return 400, None, lambda: {'error': f"Unknown category {category!r}", 'categories': list(CATEGORIES)}
+    limit = positive_int(param('limit'), DEFAULT_LIMIT)
+
+    if path == "/version":
+        return 200, None, lambda: dict(index.info(), reloads=service.reloads)
+    if path == "/top":
+        category = category or 'all'
+        return 200, f"top:{category}:{limit}", lambda: {'dataVersion': index.data_version, 'results': index.top(category, limit)}
+    if path == "/search":
+        text = param('q', "")
+        mode = param('mode', "substring")
+        if mode not in ("prefix", "substring"):
+            return 400, None, lambda: {'error': "mode must be prefix or substring"}
+        return 200, f"search:{mode}:{category}:{limit}:{text.lower()}", \
+            lambda: {'dataVersion': index.data_version, 'results': index.search(text, mode, category, limit)}
+    if path.startswith("/credit-unions/"):
+        site_id = urllib.parse.unquote(path[len("/credit-unions/"):])
+        if site_id not in index.by_site_id:
+            return 404, None, lambda: {'error': f"No credit union with siteId {site_id!r}"}
+        return 200, f"credit-union:{site_id}", lambda: {'dataVersion': index.data_version, 'result': index.credit_union(site_id)}
+    return 404, None, lambda: {'error': "Not found", 'paths': ["/version", "/top", "/search", "/credit-unions/<siteId>"]}
+
+def make_handler(service: RateService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive for dashboards polling the service
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            index = service.index # One snapshot for the whole request, even if a reload swaps it meanwhile
+            parts = urllib.parse.urlsplit(self.path)
+            status, cache_key, build = route(service, index, parts.path.rstrip("/") or "/", urllib.parse.parse_qs(parts.query))
+            if cache_key is not None:
+                body = index.cached_response(cache_key, build)
+            else:
+                body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+            etag = f'"{index.data_version}"'
+            if status == 200 and cache_key is not None and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 200 and cache_key is not None:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if urllib.parse.urlsplit(self.path).path.rstrip("/") != "/reload":
+                self.send_error(404)
+                return
+            reloaded = service.reload(force=True)
+            body = json.dumps({'reloaded': reloaded, 'dataVersion': service.index.data_version}).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    return Handler
+
+def serve(service: RateService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Serve the latest rates as JSON from in-memory indexes")
+    parser.add_argument("--csv", default=os.path.join(script_dir, "mortgage_rates.csv"), help="Export of the rate store to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Seconds between checks for a new export")
+    args = parser.parse_args()
+
+    service = RateService(args.csv, args.poll_interval)
+    service.start_watcher()
+    server = serve(service, args.host, args.port)
+    print(f"http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    print(f"[RateService] Serving data version {service.index.data_version}: {len(service.index.credit_unions)} credit unions", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
@@ -0,0 +1,393 @@
+import csv
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+import datetime
+
+CSV_FIELDNAMES = ['CreditUnion', 'Link', 'Rates', 'BestRate']
+# Rates are quoted to 0.001%, so history keeps them as integers in thousandths of a
+# percent (tenths of a basis point): 5.375% -> 5375.
+RATE_SCALE = 1000
+
+def site_id_from_link(link: str) -> str:
+    return link.split('siteId=', 1)[-1]
+
+def rate_to_units(rate_str):
+    """'5.375%' -> 5375; None for anything that is not a percentage."""
+    if not rate_str or not rate_str.endswith('%'):
+        return None
+    try:
+        return round(float(rate_str.strip('%')) * RATE_SCALE)
+    except ValueError:
+        return None
+
+def units_to_rate(units):
+    return None if units is None else units / RATE_SCALE
+
+def rates_to_string(rates: list) -> str:
+    """[loan_type, rate, apr, numeric_rate] rows -> the CSV 'Rates' value ('None' when empty)."""
+    return "|".join(f"{loan_type}-{rate_str}" for loan_type, rate_str, _, _ in rates) or "None"
+
+def sheet_key(rates: list, best_rate: str) -> str:
+    """Identity of a rate sheet: the programs with their rate and APR text, in page order."""
+    canonical = json.dumps([[loan_type, rate_str, apr_str] for loan_type, rate_str, apr_str, _ in rates] + [best_rate], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def rates_from_string(rates_raw: str) -> list:
+    """Parse a CSV 'Rates' value ('30 Year Fixed-5.375%|...') into [loan_type, rate, apr, numeric_rate] rows."""
+    rates = []
+    if not rates_raw or rates_raw == "None":
+        return rates
+    for rate_entry in rates_raw.split('|'):
+        parts = rate_entry.rsplit('-', 1) # Split from right, once
+        if len(parts) == 2:
+            loan_type, rate_str = parts[0].strip(), parts[1].strip()
+            units = rate_to_units(rate_str)
+            rates.append([loan_type, rate_str, "N/A", units_to_rate(units)])
+    return rates
+
+class RateStore:
+    """SQLite (WAL mode) store of scrape results. Each result is one upsert, so
+    the cost per scrape is constant and a crash never leaves a partial file;
+    mortgage_rates.csv is produced from it by export_csv().
+
+    Rate sheets are interned: many credit unions post exactly the same programs and
+    rates, so each distinct sheet is stored once in rate_sheets (CSV text and best
+    rate) and sheet_rates (one row per program, integer rates, dictionary-encoded
+    program names), and results and history only point at a sheet id.
+
+    Rate snapshots are kept in sheet_history, one row per (credit union, day)
+    naming the sheet in effect, indexed for per-credit-union ranges and per-day
+    scans. Rows are only written on days a credit union's rates changed (see
+    ChangeDetector); the rates in effect on a day are those of the latest
+    snapshot up to it. A snapshot without a sheet (NULL) ends the credit union's
+    rates: it left the directory (end()) or its page posted none.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30) # Wait for other worker processes' write transactions
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL") # WAL keeps this crash-safe; only the last commit can be lost on power failure
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_sheets (
+                id INTEGER PRIMARY KEY,
+                sheet_key TEXT NOT NULL UNIQUE,
+                rates TEXT NOT NULL,
+                best_rate TEXT NOT NULL
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sheet_rates (
+                sheet_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                program_id INTEGER NOT NULL,
+                rate INTEGER,
+                apr INTEGER,
+                PRIMARY KEY (sheet_id, position)
+            ) WITHOUT ROWID""")
+        # Serves "sheets offering program X", e.g. a program's history across credit unions
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sheet_rates_by_program ON sheet_rates (program_id, sheet_id)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS credit_unions (
+                id INTEGER PRIMARY KEY,
+                site_id TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS programs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )""")
+        history_columns = {column[1]: column[3] for column in self.conn.execute("PRAGMA table_info(sheet_history)")}
+        if not history_columns:
+            self._create_sheet_history()
+        elif history_columns['sheet_id']:
+            self._allow_history_end_markers()
+        columns = [column[1] for column in self.conn.execute("PRAGMA table_info(scrape_results)")]
+        if not columns:
+            self._create_scrape_results()
+        self.conn.commit()
+        self.forget_cached_ids()
+        if 'rates' in columns:
+            self._intern_existing_results()
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rate_history'").fetchone():
+            self._intern_rate_history()
+
+    def _create_sheet_history(self):
+        # day is date.toordinal(); the primary key serves "credit union Y over N days" and
+        # "latest snapshot of credit union Y up to day D". sheet_id NULL: no rates from that day on
+        self.conn.execute("""
+            CREATE TABLE sheet_history (
+                credit_union_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                sheet_id INTEGER,
+                PRIMARY KEY (credit_union_id, day)
+            ) WITHOUT ROWID""")
+        # Serves "every credit union on day D"
+        self.conn.execute("CREATE INDEX sheet_history_by_day ON sheet_history (day, credit_union_id)")
+
+    def _allow_history_end_markers(self):
+        """One-time migration of a sheet_history whose sheet_id could not be NULL."""
+        self.conn.execute("ALTER TABLE sheet_history RENAME TO sheet_history_without_ends")
+        self.conn.execute("DROP INDEX IF EXISTS sheet_history_by_day")
+        self._create_sheet_history()
+        self.conn.execute("INSERT INTO sheet_history (credit_union_id, day, sheet_id) SELECT credit_union_id, day, sheet_id FROM sheet_history_without_ends")
+        self.conn.execute("DROP TABLE sheet_history_without_ends")
+
+    def _create_scrape_results(self):
+        self.conn.execute("""
+            CREATE TABLE scrape_results (
+                run_date TEXT NOT NULL,
+                link TEXT NOT NULL,
+                credit_union TEXT NOT NULL,
+                sheet_id INTEGER NOT NULL,
+                scraped_at TEXT NOT NULL,
+                PRIMARY KEY (run_date, link)
+            )""")
+        # Serves "latest row of each link" for carrying unchanged credit unions forward
+        self.conn.execute("CREATE INDEX scrape_results_by_link ON scrape_results (link, run_date)")
+
+    def _intern_existing_results(self):
+        """One-time migration of a store that kept each result's full rate text."""
+        old_rows = self.conn.execute(
+            "SELECT run_date, link, credit_union, rates, best_rate, scraped_at FROM scrape_results ORDER BY rowid").fetchall()
+        self.conn.execute("ALTER TABLE scrape_results RENAME TO scrape_results_unshared")
+        self.conn.execute("DROP INDEX IF EXISTS scrape_results_by_link")
+        self._create_scrape_results()
+        self.conn.executemany(
+            "INSERT INTO scrape_results (run_date, link, credit_union, sheet_id, scraped_at) VALUES (?, ?, ?, ?, ?)",
+            [(run_date, link, credit_union, self._sheet_id(rates_from_string(rates), best_rate), scraped_at)
+             for run_date, link, credit_union, rates, best_rate, scraped_at in old_rows])
+        self.conn.execute("DROP TABLE scrape_results_unshared")
+        self.conn.commit()
+
+    def _intern_rate_history(self):
+        """One-time migration of per-program history rows into sheet snapshots. Rate text
+        is rebuilt from the integers (the form every page quotes: 5.375%)."""
+        snapshots = {}
+        for cu_id, day, program, rate, apr in self.conn.execute("""
+                SELECT h.credit_union_id, h.day, p.name, h.rate, h.apr
+                FROM rate_history h JOIN programs p ON p.id = h.program_id
+                ORDER BY h.credit_union_id, h.day, h.program_id"""):
+            rate_str = "N/A" if rate is None else f"{units_to_rate(rate):.3f}%"
+            apr_str = "N/A" if apr is None else f"{units_to_rate(apr):.3f}%"
+            snapshots.setdefault((cu_id, day), []).append([program, rate_str, apr_str, units_to_rate(rate)])
+        for (cu_id, day), rates in snapshots.items():
+            numeric = [(numeric_rate, f"{loan_type}-{rate_str}") for loan_type, rate_str, _, numeric_rate in rates if numeric_rate is not None]
+            best_rate = min(numeric)[1] if numeric else "None"
+            self.conn.execute("INSERT OR IGNORE INTO sheet_history (credit_union_id, day, sheet_id) VALUES (?, ?, ?)",
+                              (cu_id, day, self._sheet_id(rates, best_rate)))
+        self.conn.execute("DROP TABLE rate_history")
+        self.conn.commit()
+
+    def forget_cached_ids(self):
+        """(Re)load the dictionary-encoding caches, e.g. after a rolled-back transaction."""
+        self._program_ids = dict(self.conn.execute("SELECT name, id FROM programs"))
+        self._credit_union_ids = {site_id: (cu_id, name) for cu_id, site_id, name in self.conn.execute("SELECT id, site_id, name FROM credit_unions")}
+        self._sheet_ids = dict(self.conn.execute("SELECT sheet_key, id FROM rate_sheets"))
+
+    def close(self):
+        self.conn.close()
+
+    def _program_id(self, name):
+        program_id = self._program_ids.get(name)
+        if program_id is None:
+            # OR IGNORE + SELECT: another worker process may have added it since the cache was loaded
+            self.conn.execute("INSERT OR IGNORE INTO programs (name) VALUES (?)", (name,))
+            program_id = self.conn.execute("SELECT id FROM programs WHERE name = ?", (name,)).fetchone()[0]
+            self._program_ids[name] = program_id
+        return program_id
+
+    def _credit_union_id(self, site_id, name):
+        known = self._credit_union_ids.get(site_id)
+        if known is None:
+            self.conn.execute("INSERT OR IGNORE INTO credit_unions (site_id, name) VALUES (?, ?)", (site_id, name))
+            known = self.conn.execute("SELECT id, name FROM credit_unions WHERE site_id = ?", (site_id,)).fetchone()
+            self._credit_union_ids[site_id] = known
+        cu_id, known_name = known
+        if known_name != name:
+            self.conn.execute("UPDATE credit_unions SET name = ? WHERE id = ?", (name, cu_id))
+            self._credit_union_ids[site_id] = (cu_id, name)
+        return cu_id
+
+    def _sheet_id(self, rates: list, best_rate: str) -> int:
+        """Id of the interned sheet with these rates, storing it on first sight."""
+        key = sheet_key(rates, best_rate)
+        sheet_id = self._sheet_ids.get(key)
+        if sheet_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO rate_sheets (sheet_key, rates, best_rate) VALUES (?, ?, ?)",
+                              (key, rates_to_string(rates), best_rate))
+            sheet_id = self.conn.execute("SELECT id FROM rate_sheets WHERE sheet_key = ?", (key,)).fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sheet_rates (sheet_id, position, program_id, rate, apr) VALUES (?, ?, ?, ?, ?)",
+                [(sheet_id, position, self._program_id(loan_type), rate_to_units(rate_str), rate_to_units(apr_str))
+                 for position, (loan_type, rate_str, apr_str, _) in enumerate(rates)])
+            self._sheet_ids[key] = sheet_id
+        return sheet_id
+
+    def sheet_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM rate_sheets").fetchone()[0]
+
+    def record(self, run_date: str, row: dict, rates: list | None = None, commit: bool = True):
+        """Upsert one CSV-shaped row ({'CreditUnion', 'Link', 'Rates', 'BestRate'}) for run_date.
+        An update keeps the row's original position in the export. `rates` are the
+        structured [loan_type, rate, apr, numeric_rate] rows of the scrape result;
+        without them the sheet is derived from row['Rates'] (no APR). Returns the
+        interned sheet id. With commit=False the caller commits, e.g. together with
+        the run state. A result without rates ends the credit union's history (see end())."""
+        rates = rates if rates is not None else rates_from_string(row['Rates'])
+        sheet_id = self._sheet_id(rates, row['BestRate'])
+        self.conn.execute("""
+            INSERT INTO scrape_results (run_date, link, credit_union, sheet_id, scraped_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (run_date, link) DO UPDATE SET
+                credit_union = excluded.credit_union,
+                sheet_id = excluded.sheet_id,
+                scraped_at = excluded.scraped_at""",
+            (run_date, row['Link'], row['CreditUnion'], sheet_id, datetime.datetime.now().isoformat(timespec='seconds')))
+        cu_id = self._credit_union_id(site_id_from_link(row['Link']), row['CreditUnion'])
+        self.conn.execute("INSERT OR REPLACE INTO sheet_history (credit_union_id, day, sheet_id) VALUES (?, ?, ?)",
+                          (cu_id, datetime.date.fromisoformat(run_date).toordinal(), sheet_id if rates else None))
+        if commit:
+            self.conn.commit()
+        return sheet_id
+
+    def end(self, site_ids, run_date: str, commit: bool = True) -> int:
+        """Record that credit unions left the directory on run_date: from then on rates_on()
+        has nothing for them, until a later record(). Returns how many had a history."""
+        day = datetime.date.fromisoformat(run_date).toordinal()
+        ended = 0
+        for site_id in site_ids:
+            known = self._credit_union_ids.get(site_id)
+            if known is None:
+                continue # Never stored
+            self.conn.execute("INSERT OR REPLACE INTO sheet_history (credit_union_id, day, sheet_id) VALUES (?, ?, NULL)", (known[0], day))
+            ended += 1
+        if commit:
+            self.conn.commit()
+        return ended
+
+    def prune_raw_results(self, keep_days: int):
+        """Drop scrape_results rows older than keep_days; sheet_history keeps the rates of every day.
+        The latest row of every link is kept, as unchanged credit unions are exported from it."""
+        cutoff = (datetime.date.today() - datetime.timedelta(days=keep_days)).isoformat()
+        deleted = self.conn.execute("""
+            DELETE FROM scrape_results WHERE run_date < ? AND run_date < (
+                SELECT MAX(latest.run_date) FROM scrape_results latest WHERE latest.link = scrape_results.link)""",
+            (cutoff,)).rowcount
+        self.conn.commit()
+        return deleted
+
+    def program_history(self, site_id: str, program: str, start_date: str, end_date: str) -> list:
+        """[(date, rate, apr)] for one credit union's program between two ISO dates (inclusive):
+        the change days in the range, preceded by the value in effect on start_date."""
+        known = self._credit_union_ids.get(site_id)
+        program_id = self._program_ids.get(program)
+        if known is None or program_id is None:
+            return []
+        start_day = datetime.date.fromisoformat(start_date).toordinal()
+        first_day = self.conn.execute("""
+            SELECT MAX(h.day) FROM sheet_history h JOIN sheet_rates r ON r.sheet_id = h.sheet_id AND r.program_id = ?
+            WHERE h.credit_union_id = ? AND h.day <= ?""",
+            (program_id, known[0], start_day)).fetchone()[0]
+        cursor = self.conn.execute("""
+            SELECT h.day, r.rate, r.apr FROM sheet_history h JOIN sheet_rates r ON r.sheet_id = h.sheet_id AND r.program_id = ?
+            WHERE h.credit_union_id = ? AND h.day BETWEEN ? AND ? ORDER BY h.day""",
+            (program_id, known[0], first_day if first_day is not None else start_day, datetime.date.fromisoformat(end_date).toordinal()))
+        return [(datetime.date.fromordinal(max(day, start_day)).isoformat(), units_to_rate(rate), units_to_rate(apr)) for day, rate, apr in cursor]
+
+    def rates_on(self, run_date: str) -> list:
+        """[(site_id, credit_union, program, rate, apr)] in effect for every credit union on one ISO date,
+        i.e. each credit union's latest snapshot up to that date; none for those whose latest
+        snapshot is an end marker (NULL sheet)."""
+        cursor = self.conn.execute("""
+            SELECT cu.site_id, cu.name, p.name, r.rate, r.apr
+            FROM credit_unions cu
+            JOIN sheet_history h ON h.credit_union_id = cu.id AND h.day = (
+                SELECT MAX(latest.day) FROM sheet_history latest WHERE latest.credit_union_id = cu.id AND latest.day <= ?)
+                AND h.sheet_id IS NOT NULL
+            JOIN sheet_rates r ON r.sheet_id = h.sheet_id
+            JOIN programs p ON p.id = r.program_id
+            ORDER BY cu.name, p.name""", (datetime.date.fromisoformat(run_date).toordinal(),))
+        return [(site_id, name, program, units_to_rate(rate), units_to_rate(apr)) for site_id, name, program, rate, apr in cursor]
+
+    def rows_for_date(self, run_date: str) -> list:
+        cursor = self.conn.execute("""
+            SELECT r.credit_union, r.link, s.rates, s.best_rate FROM scrape_results r JOIN rate_sheets s ON s.id = r.sheet_id
+            WHERE r.run_date = ? ORDER BY r.rowid""", (run_date,))
+        return [{'CreditUnion': cu, 'Link': link, 'Rates': rates, 'BestRate': best_rate} for cu, link, rates, best_rate in cursor]
+
+    def latest_rows(self, run_date: str, links=None) -> list:
+        """Each link's most recent row up to run_date, so credit unions whose rates did not
+        change since an earlier day are carried forward. `links` restricts the result."""
+        cursor = self.conn.execute("""
+            SELECT r.credit_union, r.link, s.rates, s.best_rate FROM scrape_results r JOIN rate_sheets s ON s.id = r.sheet_id
+            WHERE r.run_date = (SELECT MAX(latest.run_date) FROM scrape_results latest WHERE latest.link = r.link AND latest.run_date <= ?)
+            ORDER BY r.credit_union COLLATE NOCASE""", (run_date,))
+        wanted = set(links) if links is not None else None
+        return [{'CreditUnion': cu, 'Link': link, 'Rates': rates, 'BestRate': best_rate}
+                for cu, link, rates, best_rate in cursor if wanted is None or link in wanted]
+
+    def last_recorded_at(self) -> str | None:
+        """ISO timestamp of the most recent record() call, to tell whether an export is stale."""
+        return self.conn.execute("SELECT MAX(scraped_at) FROM scrape_results").fetchone()[0]
+
+    def count_for_date(self, run_date: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM scrape_results WHERE run_date = ?", (run_date,)).fetchone()[0]
+
+    def import_csv(self, run_date: str, csv_path: str) -> int:
+        """Seed run_date from an existing CSV (e.g. one written before this store existed)."""
+        imported = 0
+        with open(csv_path, mode='r', newline='', encoding='utf-8') as infile:
+            for row in csv.DictReader(infile):
+                if 'Rates(30Years)' in row: # Handle potential old header name
+                    row['Rates'] = row.pop('Rates(30Years)')
+                if row.get('Link'):
+                    self.record(run_date, {key: row.get(key) or "None" for key in CSV_FIELDNAMES})
+                    imported += 1
+        return imported
+
+    def export_csv(self, run_date: str, csv_path: str, links=None) -> int:
+        """Compact the rows in effect on run_date (see latest_rows) into csv_path atomically:
+        write a temp file in the same directory, fsync it, then rename it over the old CSV."""
+        rows = self.latest_rows(run_date, links)
+        temp_path = f"{csv_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, mode='w', newline='', encoding='utf-8') as outfile:
+                writer = csv.DictWriter(outfile, fieldnames=CSV_FIELDNAMES)
+                writer.writeheader()
+                writer.writerows(rows)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            os.replace(temp_path, csv_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return len(rows)
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Query the historical rate store")
+    parser.add_argument("--db", default=os.path.join(script_dir, "mortgage_rates.db"), help="Path to the rate store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    history_parser = subparsers.add_parser("history", help="One program of one credit union over time")
+    history_parser.add_argument("site_id")
+    history_parser.add_argument("program", help='e.g. "30 Year Fixed"')
+    history_parser.add_argument("--days", type=int, default=90)
+    day_parser = subparsers.add_parser("day", help="Every credit union on one date")
+    day_parser.add_argument("date", help="YYYY-MM-DD")
+    args = parser.parse_args()
+
+    store = RateStore(args.db)
+    if args.command == "history":
+        end_date = datetime.date.today()
+        start_date = end_date - datetime.timedelta(days=args.days)
+        rows = store.program_history(args.site_id, args.program, start_date.isoformat(), end_date.isoformat())
+    else:
+        rows = store.rates_on(args.date)
+    store.close()
+    json.dump(rows, sys.stdout, indent=1)
+    print()
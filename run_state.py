@@ -0,0 +1,185 @@
+import time
+import sqlite3
+import datetime
+
+STATUS_IN_PROGRESS = "IN_PROGRESS"
+STATUS_SUCCESS = "SUCCESS"
+STATUS_UNCHANGED = "UNCHANGED" # Fetched, same rates as the last stored scrape
+STATUS_RETRY = "RETRY"
+STATUS_FAILED = "FAILED" # Gave up for today
+DONE_STATUSES = (STATUS_SUCCESS, STATUS_UNCHANGED, STATUS_FAILED)
+
+MAX_ATTEMPTS_PER_DAY = 5
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+
+def classify_error(error_message: str) -> str:
+    """Map a scrape result's error_message to a coarse error class."""
+    message = (error_message or "").lower()
+    if "timed out" in message or "timeout" in message:
+        return "TimeoutError"
+    if "over http" in message or "http " in message:
+        return "HttpError"
+    if "browser" in message or "playwright" in message:
+        return "BrowserError"
+    if "pars" in message or "extract" in message:
+        return "ParseError"
+    if "no rates" in message:
+        return "NoRatesError"
+    return "ScrapeError"
+
+def exported_site_ids(conn, run_date: str) -> set | None:
+    """siteIds whose rows the CSV export of run_date holds: the credit unions scraped that day,
+    changed or unchanged (forget() drops those that left the directory, failed ones never count).
+    None for a day without run state, e.g. one imported from a CSV."""
+    try:
+        statuses = dict(conn.execute("SELECT site_id, status FROM run_state WHERE run_date = ?", (run_date,)))
+    except sqlite3.OperationalError: # No run state table yet
+        return None
+    if not statuses:
+        return None
+    return {site_id for site_id, status in statuses.items() if status in (STATUS_SUCCESS, STATUS_UNCHANGED)}
+
+class SiteState:
+    __slots__ = ("site_id", "status", "attempts", "error_class", "last_duration", "next_eligible")
+
+    def __init__(self, site_id, status, attempts=0, error_class=None, last_duration=None, next_eligible=0.0):
+        self.site_id = site_id
+        self.status = status
+        self.attempts = attempts
+        self.error_class = error_class
+        self.last_duration = last_duration
+        self.next_eligible = next_eligible
+
+class RunState:
+    """Per-day scrape state keyed by siteId, persisted in the rate store's SQLite
+    database. The day's rows are loaded once, so resume and completion checks are
+    dict lookups; every transition is committed before the next scrape starts, so a
+    killed run resumes with exactly the credit unions that had not succeeded."""
+
+    def __init__(self, conn, run_date: str):
+        self.conn = conn
+        self.run_date = run_date
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_state (
+                run_date TEXT NOT NULL,
+                site_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error_class TEXT,
+                last_duration REAL,
+                next_eligible REAL NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_date, site_id)
+            )""")
+        self.conn.commit()
+        self.load()
+
+    def load(self):
+        """(Re)load the day's rows, e.g. to see what other worker processes have done."""
+        self.sites = {}
+        cursor = self.conn.execute(
+            "SELECT site_id, status, attempts, error_class, last_duration, next_eligible FROM run_state WHERE run_date = ?",
+            (self.run_date,))
+        for row in cursor:
+            self.sites[row[0]] = SiteState(*row)
+
+    def _save(self, state: SiteState, commit: bool = True):
+        self.sites[state.site_id] = state
+        self.conn.execute("""
+            INSERT INTO run_state (run_date, site_id, status, attempts, error_class, last_duration, next_eligible, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (run_date, site_id) DO UPDATE SET
+                status = excluded.status,
+                attempts = excluded.attempts,
+                error_class = excluded.error_class,
+                last_duration = excluded.last_duration,
+                next_eligible = excluded.next_eligible,
+                updated_at = excluded.updated_at""",
+            (self.run_date, state.site_id, state.status, state.attempts, state.error_class, state.last_duration,
+             state.next_eligible, datetime.datetime.now().isoformat(timespec='seconds')))
+        if commit:
+            self.conn.commit()
+
+    def reload(self, site_id: str) -> SiteState | None:
+        """Re-read one siteId, which another worker process may have updated."""
+        row = self.conn.execute(
+            "SELECT site_id, status, attempts, error_class, last_duration, next_eligible FROM run_state WHERE run_date = ? AND site_id = ?",
+            (self.run_date, site_id)).fetchone()
+        if row is None:
+            self.sites.pop(site_id, None)
+            return None
+        self.sites[site_id] = SiteState(*row)
+        return self.sites[site_id]
+
+    def get(self, site_id: str) -> SiteState | None:
+        return self.sites.get(site_id)
+
+    def is_done(self, site_id: str) -> bool:
+        state = self.sites.get(site_id)
+        return state is not None and state.status in DONE_STATUSES
+
+    def is_eligible(self, site_id: str, now: float | None = None) -> bool:
+        state = self.sites.get(site_id)
+        if state is None:
+            return True
+        if state.status in DONE_STATUSES:
+            return False
+        # IN_PROGRESS here means a previous run died mid-scrape; that work is still owed
+        return state.next_eligible <= (now if now is not None else time.time())
+
+    def pending(self, site_ids, now: float | None = None) -> list:
+        now = now if now is not None else time.time()
+        return [site_id for site_id in site_ids if self.is_eligible(site_id, now)]
+
+    def all_done(self, site_ids) -> bool:
+        """True when every siteId of the current directory is finished for the day;
+        siteIds no longer in the directory do not count."""
+        return all(self.is_done(site_id) for site_id in site_ids)
+
+    def forget(self, site_ids):
+        """Drop today's state of siteIds that left the directory, so they no longer count."""
+        site_ids = [site_id for site_id in site_ids if site_id in self.sites]
+        self.conn.executemany("DELETE FROM run_state WHERE run_date = ? AND site_id = ?",
+                              [(self.run_date, site_id) for site_id in site_ids])
+        self.conn.commit()
+        for site_id in site_ids:
+            del self.sites[site_id]
+        return len(site_ids)
+
+    def seed_successes(self, site_ids):
+        """Mark siteIds already present in today's results (e.g. imported from a CSV) as done."""
+        for site_id in site_ids:
+            if site_id not in self.sites:
+                self._save(SiteState(site_id, STATUS_SUCCESS), commit=False)
+        self.conn.commit()
+
+    def mark_started(self, site_id: str):
+        state = self.sites.get(site_id) or SiteState(site_id, STATUS_IN_PROGRESS)
+        self._save(SiteState(site_id, STATUS_IN_PROGRESS, state.attempts + 1, state.error_class, state.last_duration, state.next_eligible))
+
+    def mark_success(self, site_id: str, duration: float | None, commit: bool = True):
+        state = self.sites.get(site_id) or SiteState(site_id, STATUS_IN_PROGRESS, 1)
+        self._save(SiteState(site_id, STATUS_SUCCESS, state.attempts, None, duration, 0.0), commit=commit)
+
+    def mark_unchanged(self, site_id: str, duration: float | None, commit: bool = True):
+        state = self.sites.get(site_id) or SiteState(site_id, STATUS_IN_PROGRESS, 1)
+        self._save(SiteState(site_id, STATUS_UNCHANGED, state.attempts, None, duration, 0.0), commit=commit)
+
+    def done_site_ids(self, statuses=(STATUS_SUCCESS, STATUS_UNCHANGED)) -> set:
+        return {site_id for site_id, state in self.sites.items() if state.status in statuses}
+
+    def mark_failure(self, site_id: str, duration: float | None, error_class: str, now: float | None = None, commit: bool = True):
+        state = self.sites.get(site_id) or SiteState(site_id, STATUS_IN_PROGRESS, 1)
+        now = now if now is not None else time.time()
+        if state.attempts >= MAX_ATTEMPTS_PER_DAY:
+            self._save(SiteState(site_id, STATUS_FAILED, state.attempts, error_class, duration, 0.0), commit=commit)
+            return
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, state.attempts - 1))
+        self._save(SiteState(site_id, STATUS_RETRY, state.attempts, error_class, duration, now + delay), commit=commit)
+
+    def counts(self) -> dict:
+        counts = {}
+        for state in self.sites.values():
+            counts[state.status] = counts.get(state.status, 0) + 1
+        return counts
@@ -1,98 +1,96 @@
-import csv
-import subprocess
 import sys
 import os
-from bs4 import BeautifulSoup
 import datetime
-import json
 import time
-
-# Define the base URLs as provided by the user
-BASE_URL = "https://mortgages.cumortgage.net/start_up.asp"
-SITEID_URL = "https://mortgages.cumortgage.net/default.asp?siteId="
-
-def get_credit_union_links(script_dir, venv_python_path_for_list_fetch):
-    fetch_list_script_path = os.path.join(script_dir, "playwright", "fetch_credit_union_list.py") 
-    
+import asyncio
+import argparse
+import sqlite3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "playwright"))
+from browser_pool import BrowserPool, DEFAULT_CONCURRENCY
+from http_fetcher import HttpConnectionPool, fetch_via_http, parse_fetched, render_via_browser
+from request_router import RequestRouter
+from scheduler import AdaptiveScheduler, SchedulerConfig
+from pipeline import Pipeline, Stage, format_snapshot
+from change_detector import ChangeDetector
+from credit_union_directory import BASE_URL, SITEID_URL, CreditUnionDirectory
+from rate_store import RateStore, rates_from_string, site_id_from_link
+from convert_csv_to_html import convert_csv_to_html
+from run_state import RunState, classify_error
+from work_queue import WorkQueue, default_worker_id
+from page_archive import ARCHIVE_DIRNAME, PageArchive
+from metrics import METRICS
+
+try:
+    from market_aggregates import MarketAggregates, read_aggregates
+except ImportError: # NumPy is optional: runs without it keep no market aggregates
+    MarketAggregates = None
+
+RATE_STORE_FILENAME = "mortgage_rates.db"
+RAW_RESULT_RETENTION_DAYS = 7 # Older days live on only in the compact sheet_history table
+EXTRACT_WORKERS = 2 # Threads parsing #rate_box fragments while the fetch stage waits on the network
+STORE_BATCH_SIZE = 20 # Results written per store transaction, at most
+PIPELINE_REPORT_INTERVAL = float(os.environ.get("SCRAPE_PIPELINE_REPORT_INTERVAL", 30)) # Seconds between queue depth/throughput lines
+LOG_FLUSH_INTERVAL = float(os.environ.get("SCRAPE_LOG_FLUSH_INTERVAL", 5)) # Seconds log lines may sit in the write buffer
+LOG_BUFFER_BYTES = 64 * 1024
+
+def get_credit_union_links(directory, http_pool):
+    """Credit unions of the cached directory, refreshed over plain HTTP once its TTL has
+    passed. Returns (rows, diff); diff is None when the cache was used as is."""
     try:
-        cmd = [venv_python_path_for_list_fetch, fetch_list_script_path, BASE_URL]
-        process = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
-        raw_output = process.stdout
-
-        # Use a dictionary to store unique credit unions by link
-        unique_credit_unions = {}
-        for line in raw_output.strip().split('\n'):
-            if '>' in line:
-                site_id, union_name = line.split('>', 1)
-                union_name = union_name.replace('-', '').replace(',', '').replace('.', '').replace("'", '').replace('\r', '')
-                full_link = f"{SITEID_URL}{site_id}"
-                if full_link not in unique_credit_unions: # Add only if link is not already present
-                    unique_credit_unions[full_link] = {'CreditUnion': union_name.strip(), 'Link': full_link.strip()}
-        return list(unique_credit_unions.values())
-    except subprocess.CalledProcessError as e:
-        print(f"[ListFetcher] Error fetching credit union list: Stderr: {e.stderr}", file=sys.stderr)
-        return []
-    except subprocess.TimeoutExpired:
-        print(f"[ListFetcher] Playwright list fetch script timed out.", file=sys.stderr)
-        return []
+        diff = asyncio.run(directory.refresh(http_pool, BASE_URL))
     except Exception as e:
         print(f"[ListFetcher] An unexpected error occurred during list fetch: {e}", file=sys.stderr)
-        return []
-
-def scrape_mortgage_data(output_csv_filename, max_scrapes_per_run=None):
+        diff = None
+    rows = [{'CreditUnion': union_name, 'Link': f"{SITEID_URL}{site_id}"} for site_id, union_name in directory.sites.items()]
+    return rows, diff
+
+def scrape_mortgage_data(output_csv_filename, concurrency=DEFAULT_CONCURRENCY, browsers=1, scheduler_config=None, worker_id=None, output_dir=None):
+    """Scrape every credit union of the directory. With worker_id, this process is one of
+    possibly many workers sharing the day's siteIds through the work_queue table.
+    Logs, the store, the CSV and the page go to output_dir (default: next to this script).
+    Returns a summary of the run (pipeline, scheduler and run state), or None when
+    there was nothing to scrape."""
     script_dir = os.path.dirname(__file__)
-    # Processed URLs are tracked in processed.log for daily resume functionality
-    processed_log_file_path = os.path.join(script_dir, "processed.log")
-    # Overall script execution logs are tracked in execution.log and reset on each run
-    execution_log_file_path = os.path.join(script_dir, "execution.log")
-    output_csv_path_abs = os.path.join(script_dir, output_csv_filename)
+    output_dir = output_dir or script_dir
+    # Processed URLs are logged to processed.log; resume uses the run_state table in mortgage_rates.db
+    processed_log_file_path = os.path.join(output_dir, "processed.log")
+    # Overall script execution logs are tracked in execution.log and reset on each run (one per worker in queue mode)
+    execution_log_file_path = os.path.join(output_dir, f"execution.{worker_id}.log" if worker_id else "execution.log")
+    output_csv_path_abs = os.path.join(output_dir, output_csv_filename)
+    # Histograms and counters of this run, written next to the logs at the end (one pair per worker in queue mode)
+    metrics_prefix = os.path.join(output_dir, f"metrics.{worker_id}" if worker_id else "metrics")
+    METRICS.reset()
 
-    venv_python_path = os.path.join(os.path.expanduser("~"), ".venv", "bin", "python") 
     current_date_str = datetime.datetime.now().strftime("%Y-%m-%d") # Define once for both log and CSV
 
-    processed_urls = set()
-    if os.path.exists(processed_log_file_path):
-        with open(processed_log_file_path, mode='r', encoding='utf-8') as lf:
-            for line in lf:
-                if "SUCCESS" in line:
-                    try:
-                        # Extract the timestamp and date from the log line
-                        log_timestamp_str = line.split(']')[0][1:]  # e.g., '2026-02-16 22:56:09'
-                        log_date_str = log_timestamp_str.split(' ')[0]  # e.g., '2026-02-16'
-                        
-                        # Get the current date for comparison
-
-                        # Only add to processed_urls if the entry is for today
-                        if log_date_str == current_date_str:
-                            parts = line.split(" for ", 1)
-                            if len(parts) > 1:
-                                url_part = parts[1].split(" - SUCCESS", 1)
-                                if len(url_part) > 0:
-                                    processed_urls.add(url_part[0].strip())
-                    except Exception as e:
-                        # Log parsing can fail for malformed lines, just skip it gracefully
-                        pass 
-
-    current_date_str = datetime.datetime.now().strftime("%Y-%m-%d") # Define once for both log and CSV
-    csv_last_modified_date = None
-    if os.path.exists(output_csv_path_abs):
+    # Scrape results are recorded in mortgage_rates.db as they arrive; the CSV is only an export of today's rows
+    # SCRAPE_DB lets workers on several hosts share one store
+    rate_store = RateStore(os.environ.get("SCRAPE_DB") or os.path.join(output_dir, RATE_STORE_FILENAME))
+    if rate_store.count_for_date(current_date_str) == 0 and os.path.exists(output_csv_path_abs):
         csv_mtime = os.path.getmtime(output_csv_path_abs)
         csv_last_modified_date = datetime.datetime.fromtimestamp(csv_mtime).strftime("%Y-%m-%d")
-
-    # Read existing CSV data into a dictionary for updates or start fresh
-    existing_csv_data = {}
-    if os.path.exists(output_csv_path_abs) and csv_last_modified_date == current_date_str:
-        # It's the same day, load existing data to append/update
-        with open(output_csv_path_abs, mode='r', newline='', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            fieldnames = reader.fieldnames if reader.fieldnames else ['CreditUnion', 'Link', 'Rates', 'BestRate']
-            for row in reader:
-                if 'Rates(30Years)' in row: # Handle potential old header name
-                    row['Rates'] = row.pop('Rates(30Years)')
-                existing_csv_data[row['Link']] = row
-    else:
-        # New day or CSV doesn't exist, start fresh
-        fieldnames = ['CreditUnion', 'Link', 'Rates', 'BestRate']
+        if csv_last_modified_date == current_date_str:
+            # Same-day CSV written before the store existed, keep its rows
+            rate_store.import_csv(current_date_str, output_csv_path_abs)
+
+    # Resume state (status, attempts, error class, duration, next eligible time per siteId)
+    # lives next to the results, so processed.log is now only a human-readable log
+    run_state = RunState(rate_store.conn, current_date_str)
+    if not run_state.sites:
+        run_state.seed_successes(site_id_from_link(row['Link']) for row in rate_store.rows_for_date(current_date_str))
+    # ETag/Last-Modified and #rate_box hash of each siteId's last stored scrape
+    change_detector = ChangeDetector(rate_store.conn)
+    # Raw fragment/payload behind every stored result, for offline re-parses (python3 page_archive.py reparse)
+    page_archive = None
+    if os.environ.get("SCRAPE_ARCHIVE", "1") != "0":
+        page_archive = PageArchive(rate_store.conn, os.environ.get("SCRAPE_ARCHIVE_DIR") or os.path.join(output_dir, ARCHIVE_DIRNAME))
+    # Today's market-wide statistics per loan category, seeded with the rates in effect once the
+    # directory is known and then updated from each committed store batch (python3 market_aggregates.py show)
+    market = None
+    if MarketAggregates is not None:
+        market = MarketAggregates(rate_store.conn, current_date_str)
+    market_updates = {} # siteId -> [(program, rate)] of the open store batch
     # Determine if it's a new day's run for the log file
     log_file_mode = 'a'
     if os.path.exists(processed_log_file_path):
@@ -109,9 +107,12 @@ def scrape_mortgage_data(output_csv_filename, max_scrapes_per_run=None):
             log_file_mode = 'w' # New day, overwrite processed_log_file_path
 
     # Open processed.log based on daily logic
-    processed_log_file = open(processed_log_file_path, mode=log_file_mode, encoding='utf-8')
+    # Both logs are block buffered and flushed every LOG_FLUSH_INTERVAL seconds (and on errors),
+    # not once per line
+    processed_log_file = open(processed_log_file_path, mode=log_file_mode, encoding='utf-8', buffering=LOG_BUFFER_BYTES)
     # Always open execution.log in write mode to clear it for each run
-    execution_log_file = open(execution_log_file_path, mode='w', encoding='utf-8')
+    execution_log_file = open(execution_log_file_path, mode='w', encoding='utf-8', buffering=LOG_BUFFER_BYTES)
+    last_log_flush = time.monotonic()
 
     def log_message(message, status="INFO", url="", log_to_processed=False, log_to_execution=True):
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -124,11 +125,18 @@ def scrape_mortgage_data(output_csv_filename, max_scrapes_per_run=None):
 
         if log_to_execution:
             execution_log_file.write(f"{full_log_entry}\n")
-            execution_log_file.flush()
 
         if log_to_processed: 
             processed_log_file.write(f"{full_log_entry}\n")
-            processed_log_file.flush()
+
+        if status == "ERROR" or time.monotonic() - last_log_flush >= LOG_FLUSH_INTERVAL:
+            flush_logs()
+
+    def flush_logs():
+        nonlocal last_log_flush
+        execution_log_file.flush()
+        processed_log_file.flush()
+        last_log_flush = time.monotonic()
 
     # Ensure log files are closed on script exit
     import atexit
@@ -136,128 +144,395 @@ def scrape_mortgage_data(output_csv_filename, max_scrapes_per_run=None):
     atexit.register(execution_log_file.close)
 
 
+    scheduler_config = scheduler_config or SchedulerConfig.from_env(max_concurrency=concurrency)
+    http_pool = HttpConnectionPool(max_idle_per_host=scheduler_config.max_concurrency)
+
     log_message("Starting to fetch credit union list...", log_to_processed=False)
-    credit_unions_to_scrape = get_credit_union_links(script_dir, venv_python_path) 
+    directory = CreditUnionDirectory(rate_store.conn)
+    credit_unions_to_scrape, directory_diff = get_credit_union_links(directory, http_pool)
     if not credit_unions_to_scrape:
         log_message("Failed to get credit union list. Aborting scraping.", status="ERROR")
+        http_pool.close()
         return
-    log_message(f"Fetched {len(credit_unions_to_scrape)} unique credit unions.", log_to_processed=False)
-
-    # NEW LOGIC: Check if all credit unions have already been processed for today
-    if len(processed_urls) == len(credit_unions_to_scrape):
+    # New and renamed credit unions are scraped even if their page is unchanged, so the new name is stored
+    force_rescrape = set()
+    if directory_diff is None:
+        log_message(f"Using {len(credit_unions_to_scrape)} cached credit unions.", log_to_processed=False)
+    else:
+        log_message(f"Fetched {len(credit_unions_to_scrape)} unique credit unions ({directory_diff.summary()}).", log_to_processed=False)
+        for site_id, union_name in directory_diff.added.items():
+            log_message(f"New credit union: {union_name}", status="ADDED", url=f"{SITEID_URL}{site_id}", log_to_processed=True)
+        for site_id, (old_name, union_name) in directory_diff.renamed.items():
+            log_message(f"Credit union renamed from {old_name} to {union_name}", status="RENAMED", url=f"{SITEID_URL}{site_id}", log_to_processed=True)
+        for site_id, union_name in directory_diff.removed.items():
+            log_message(f"Credit union left the directory: {union_name}", status="REMOVED", url=f"{SITEID_URL}{site_id}", log_to_processed=True)
+        # Removed siteIds no longer count towards today's run; renamed ones are owed a scrape under their new name
+        run_state.forget(list(directory_diff.removed) + list(directory_diff.renamed))
+        # ... and their rates stop being in effect (rates_on: market aggregates and history queries)
+        rate_store.end(list(directory_diff.removed), current_date_str)
+        force_rescrape = set(directory_diff.added) | set(directory_diff.renamed)
+    work_queue = WorkQueue(rate_store.conn, current_date_str, worker_id) if worker_id else None
+    if work_queue and directory_diff is not None:
+        work_queue.remove(list(directory_diff.removed) + list(directory_diff.renamed))
+
+    # Check if all credit unions of the current list have already been processed for today
+    current_site_ids = [site_id_from_link(row_data['Link']) for row_data in credit_unions_to_scrape]
+    if run_state.all_done(current_site_ids):
         log_message("All credit unions already processed for today. Skipping further scraping.", status="SKIPPED", log_to_processed=False)
+        http_pool.close()
         return
-
-    scraped_count = 0
-    for row_data in credit_unions_to_scrape:
-        if max_scrapes_per_run is not None and scraped_count >= max_scrapes_per_run:
-            log_message(f"Reached max_scrapes_per_run limit of {max_scrapes_per_run}. Pausing for 2 minutes...", status="INFO", log_to_processed=False)
-            time.sleep(120)  # Pause for 2 minutes
-            log_message("Resuming scraping after pause.", status="INFO", log_to_processed=False)
-            scraped_count = 0  # Reset count for the next batch
-
-        credit_union = row_data['CreditUnion']
-        link = row_data['Link']
-
-        if link in processed_urls:
-            log_message(f"Skipping already processed credit union: {credit_union}", status="SKIPPED", url=link, log_to_processed=True, log_to_execution=False)
+    if market:
+        # Today's exported credit unions so far (all with rates in effect on a new day: those that
+        # left the directory were just ended); publish() reseeds with exactly the ones exported
+        market.seed(rate_store)
+
+    pending_credit_unions = []
+    now = time.time()
+    for row_data, site_id in zip(credit_unions_to_scrape, current_site_ids):
+        if not run_state.is_eligible(site_id, now):
+            site_state = run_state.get(site_id)
+            log_message(f"Skipping credit union in state {site_state.status}: {row_data['CreditUnion']}", status="SKIPPED", url=row_data['Link'], log_to_processed=True, log_to_execution=False)
             continue
-
-        rates_30_years = "None"
-        best_rate = "None"
-        scrape_status = "ERROR"
-        scrape_error_message = "Unknown error"
-
-        log_message(f"Scraping data for {credit_union}", url=link, log_to_processed=False)
-
-        scrape_result = {}
-        try:
-            scrape_single_script_path = os.path.join(script_dir, 'playwright', 'scrape_single_url.py') 
-            
-            cmd = [venv_python_path, scrape_single_script_path, credit_union, link]
-            
-            log_message(f"Running scrape_single_url.py for {credit_union} via subprocess", status="INFO", url=link, log_to_processed=False) 
-            process = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=120) 
-            raw_output = process.stdout
-            
-            if raw_output:
-                try:
-                    scrape_result = json.loads(raw_output)
-                    rates_30_years = scrape_result.get('rates_30_years', 'None')
-                    best_rate = scrape_result.get('best_rate', 'None')
-                    scrape_status = scrape_result.get('status', 'ERROR')
-                    scrape_error_message = scrape_result.get('error_message', 'Unknown error')
-
-                except json.JSONDecodeError as e:
-                    log_message(f"Error decoding scrape_single_url.py response: {e}. Raw response: {raw_output}", status="ERROR", url=link, log_to_processed=True)
-                    continue 
-            else:
-                log_message(f"scrape_single_url.py returned no output for {credit_union}", status="ERROR", url=link, log_to_processed=True)
-                continue 
-
-        except subprocess.TimeoutExpired:
-            log_message(f"scrape_single_url.py timed out for {credit_union}", status="ERROR", url=link, log_to_processed=True)
-            continue 
-        except subprocess.CalledProcessError as e:
-            log_message(f"scrape_single_url.py failed for {credit_union}. Stderr: {e.stderr}", status="ERROR", url=link, log_to_processed=True)
-            continue 
-        except FileNotFoundError:
-            log_message(f"Error: scrape_single_url.py or python executable not found.", status="ERROR", url=link)
-            continue 
-        except Exception as e:
-            log_message(f"An unexpected error during scrape_single_url.py call: {e}", status="ERROR", url=link, log_to_processed=True)
-            continue 
-        
+        pending_credit_unions.append(row_data)
+    if work_queue:
+        # Every worker enqueues the same rows; only the first insert of each siteId counts
+        added = work_queue.enqueue(pending_credit_unions, [site_id_from_link(row_data['Link']) for row_data in pending_credit_unions])
+        log_message(f"Worker {work_queue.worker_id}: queued {added} new siteIds, queue {work_queue.counts()}", status="INFO", log_to_processed=False)
+
+    tier_counts = {}
+    page_load_totals = {}
+    change_counts = {'changed': 0, 'unchanged': 0}
+
+    def handle_scrape_result(scrape_result):
+        """Write one result into the store's open batch transaction (the store stage commits)."""
+        credit_union = scrape_result.get('credit_union', '')
+        link = scrape_result.get('link', '')
+        rates_30_years = scrape_result.get('rates_30_years', 'None')
+        best_rate = scrape_result.get('best_rate', 'None')
+        scrape_status = scrape_result.get('status', 'ERROR')
+        scrape_error_message = scrape_result.get('error_message', 'Unknown error')
+        tier = scrape_result.get('tier', 'browser')
+        tier_counts[tier] = tier_counts.get(tier, 0) + 1
+        for key, value in scrape_result.get('page_load', {}).items():
+            page_load_totals[key] = page_load_totals.get(key, 0) + value
+        if scrape_result.get('page_load'):
+            METRICS.inc("bytes_fetched", scrape_result['page_load'].get('bytes_fetched', 0), tier=tier)
+            METRICS.inc("bytes_from_cache", scrape_result['page_load'].get('bytes_from_cache', 0), tier=tier)
+        if scrape_result.get('duration') is not None:
+            METRICS.observe("site", scrape_result['duration'], tier=tier, outcome=scrape_status.lower())
+
+        site_id = site_id_from_link(link)
         if scrape_status != "SUCCESS":
-            log_message(f"Scraping failed for {credit_union}: {scrape_error_message}", status="ERROR", url=link, log_to_processed=True)
-            continue 
-
-        # Update or add the scraped row to existing_csv_data
-        existing_csv_data[link] = {
+            error_class = classify_error(scrape_error_message)
+            METRICS.inc("results", tier=tier, outcome="error", error_class=error_class)
+            run_state.mark_failure(site_id, scrape_result.get('duration'), error_class, commit=False)
+            if finish_site(site_id, credit_union, link):
+                log_message(f"Scraping failed for {credit_union} ({error_class}): {scrape_error_message}", status="ERROR", url=link, log_to_processed=True)
+            return
+
+        if not scrape_result.get('changed', True):
+            # Same rates as the last stored scrape: no result written, the export carries the old row forward
+            METRICS.inc("results", tier=tier, outcome="unchanged", error_class="")
+            fingerprint = scrape_result.get('fingerprint') or {}
+            known = change_detector.fingerprints.get(site_id) or {}
+            if 'fragment_hash' in fingerprint and any(fingerprint.get(key) != known.get(key) for key in ('fragment_hash', 'etag', 'last_modified')):
+                # New bytes (or validators) for the same rates, e.g. last stored from the browser tier:
+                # remembered so the next plain-HTTP fetch is recognised without parsing
+                change_detector.remember(site_id, fingerprint, commit=False)
+            run_state.mark_unchanged(site_id, scrape_result.get('duration'), commit=False)
+            if finish_site(site_id, credit_union, link):
+                change_counts['unchanged'] += 1
+                log_message(f"Rates unchanged for {credit_union} via {tier}", status="UNCHANGED", url=link, log_to_processed=True)
+            return
+
+        # The result, its fingerprint and its state are committed together with the rest of the batch
+        rate_store.record(current_date_str, {
             'CreditUnion': credit_union,
             'Link': link,
             'Rates': rates_30_years, # Changed to 'Rates'
             'BestRate': best_rate
-        }
-        log_message(f"Successfully scraped and processed {credit_union}", status="SUCCESS", url=link, log_to_processed=True)
-        scraped_count += 1
-
-        # Write the consolidated data (including newly scraped) back to the CSV file (overwrite mode)
-        # This saves progress after each successful scrape.
-        log_message(f"Saving incremental results to {output_csv_filename} (after {credit_union})...", status="INFO", log_to_processed=False)
-        with open(output_csv_path_abs, mode='w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in existing_csv_data.values():
-                writer.writerow(row)
-
-    log_message(f"Scraping complete. Saving results to {output_csv_filename}", status="INFO", log_to_processed=False)
-
-    # Write the consolidated data back to the CSV file (overwrite mode)
-    with open(output_csv_path_abs, mode='w', newline='', encoding='utf-8') as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in existing_csv_data.values():
-            writer.writerow(row)
-
-    # After scraping is complete, convert CSV to HTML
-    log_message("Converting CSV to HTML...", status="INFO", log_to_processed=False)
+        }, rates=scrape_result.get('rates'), commit=False)
+        if scrape_result.get('fingerprint'):
+            change_detector.remember(site_id, scrape_result['fingerprint'], commit=False)
+        if page_archive and scrape_result.get('archive_hash'):
+            page_archive.record(current_date_str, site_id, credit_union, link, scrape_result['archive_hash'],
+                                scrape_result['raw_kind'], tier, commit=False)
+        if market:
+            market_updates[site_id] = [(loan_type, rate_str) for loan_type, rate_str, _, _ in
+                                       scrape_result.get('rates') or rates_from_string(rates_30_years)]
+        METRICS.inc("results", tier=tier, outcome="changed", error_class="")
+        run_state.mark_success(site_id, scrape_result.get('duration'), commit=False)
+        if finish_site(site_id, credit_union, link):
+            change_counts['changed'] += 1
+            log_message(f"Successfully scraped and processed {credit_union} via {tier}", status="SUCCESS", url=link, log_to_processed=True)
+
+    def discard_result(site_id):
+        """Undo one result back to its savepoint and resync the caches it touched."""
+        rate_store.conn.execute("ROLLBACK TO stored_result")
+        rate_store.forget_cached_ids()
+        market_updates.pop(site_id, None)
+        change_detector.reload(site_id)
+        run_state.reload(site_id)
+
+    def finish_site(site_id, credit_union, link):
+        """Queue mode: settle the lease in the same transaction as the result, or drop the
+        result if the lease expired and the siteId went to another worker."""
+        if work_queue is None or work_queue.finish(site_id, run_state.get(site_id), commit=False):
+            return True
+        discard_result(site_id)
+        log_message(f"Lease on {credit_union} was lost to another worker, discarding this result", status="SKIPPED", url=link, log_to_processed=True)
+        return False
+
+    # Errors that mean the site (or our browser) is overloaded, as opposed to a page without rates
+    congestion_error_classes = ("TimeoutError", "HttpError", "BrowserError")
+
+    def is_congestion(scrape_result):
+        return scrape_result.get('status') != "SUCCESS" and classify_error(scrape_result.get('error_message')) in congestion_error_classes
+
+    published = False
+
+    async def publish(stored_batches):
+        """Export the CSV and rebuild the page from everything stored; runs once, after the
+        store stage has drained (or after a failed pipeline, for what was stored until then)."""
+        nonlocal published
+        published = True
+        tier_summary = ", ".join(f"{tier}={count}" for tier, count in sorted(tier_counts.items()))
+        log_message(f"Pages served per tier: {tier_summary or 'none'}", status="INFO", log_to_processed=False)
+        if page_load_totals:
+            page_load_summary = ", ".join(f"{key}={round(value, 3)}" for key, value in page_load_totals.items())
+            log_message(f"Browser page load totals: {page_load_summary}", status="INFO", log_to_processed=False)
+        log_message(f"Rate pages changed={change_counts['changed']}, unchanged={change_counts['unchanged']} in {stored_batches} store batches", status="INFO", log_to_processed=False)
+
+        state_summary = ", ".join(f"{status}={count}" for status, count in sorted(run_state.counts().items()))
+        log_message(f"Run state for {current_date_str}: {state_summary}", status="INFO", log_to_processed=False)
+        if work_queue:
+            remaining = work_queue.remaining()
+            log_message(f"Worker {work_queue.worker_id} finished, queue {work_queue.counts()}", status="INFO", log_to_processed=False)
+            if remaining:
+                # The last worker to finish exports the merged results
+                log_message(f"{remaining} siteIds still with other workers, leaving the export to them", status="SKIPPED", log_to_processed=False)
+                return
+            run_state.load() # Merge in the other workers' results before exporting
+        # Credit unions scraped today (with or without a change) that are still in the directory
+        links_done_today = set(run_state.done_site_ids())
+        export_links = [row['Link'] for row in credit_unions_to_scrape if site_id_from_link(row['Link']) in links_done_today]
+        if market:
+            # The same credit unions as the CSV: none that failed today, and in queue mode the
+            # other workers' results too
+            market.seed(rate_store, [site_id_from_link(link) for link in export_links])
+
+        # Skip the export and HTML rebuild when nothing was recorded since the CSV was written
+        last_recorded_at = rate_store.last_recorded_at()
+        if change_counts['changed'] == 0 and os.path.exists(output_csv_path_abs) and last_recorded_at and \
+                last_recorded_at < datetime.datetime.fromtimestamp(os.path.getmtime(output_csv_path_abs)).isoformat(timespec='seconds'):
+            log_message("No rate page changed. Keeping the existing CSV and HTML.", status="SKIPPED", log_to_processed=False)
+            return
+        log_message(f"Scraping complete. Saving results to {output_csv_filename}", status="INFO", log_to_processed=False)
+
+        # Compact the rows in effect today into the CSV (temp file + rename, never a partial CSV):
+        # credit unions scraped today, with unchanged ones carried forward from their last stored row
+        exported_rows = rate_store.export_csv(current_date_str, output_csv_path_abs, links=export_links)
+        rate_store.prune_raw_results(RAW_RESULT_RETENTION_DAYS)
+        log_message(f"Exported {exported_rows} rows to {output_csv_filename}", status="INFO", log_to_processed=False)
+
+        # The build reads only the CSV, so it runs off the event loop; the build manifest makes this
+        # a no-op when the CSV and template are unchanged, and otherwise only the data file is rewritten
+        log_message("Converting CSV to HTML...", status="INFO", log_to_processed=False)
+        html_template_path = os.path.join(script_dir, "mortgage_rates_base64_template.html")
+        try:
+            with METRICS.timed("html_build"):
+                built = await asyncio.to_thread(convert_csv_to_html, output_csv_path_abs, os.path.join(output_dir, "mortgage_rates.html"), html_template_path,
+                                                market=read_aggregates(rate_store.conn, current_date_str) if market else None)
+            if built is None:
+                log_message("Error converting CSV to HTML, see stderr.", status="ERROR", log_to_processed=False)
+            elif built:
+                log_message("CSV to HTML conversion complete.", status="SUCCESS", log_to_processed=False)
+            else:
+                log_message("HTML is up to date with the CSV, nothing to rebuild.", status="SKIPPED", log_to_processed=False)
+        except Exception as e:
+            log_message(f"An unexpected error occurred during HTML conversion: {e}", status="ERROR", log_to_processed=False)
+
+    async def scrape_pending():
+        # Streaming pipeline, each stage connected to the next by a bounded queue:
+        #   directory -> fetch -> extract -> store -> publish
+        # fetch: plain keep-alive HTTP, paced by the adaptive scheduler (up to `concurrency` at
+        #        once); pages whose static HTML has no rates are rendered by the long-lived browser
+        # extract: parses the #rate_box fragments in worker threads, overlapping the network waits
+        # store: writes results in batches, one transaction each
+        # publish: exports the CSV and rebuilds the page once everything is stored
+        # A full queue makes the stage before it wait, down to the directory leasing or listing
+        # credit unions; each stage's queue depth and throughput are logged periodically.
+        scheduler = AdaptiveScheduler(scheduler_config)
+        capacity = scheduler.config.max_concurrency * 2
+
+        async def directory_rows():
+            if work_queue is None:
+                for row in pending_credit_unions:
+                    yield row
+                return
+            # Lease small batches until the queue has nothing left for us; leases are renewed
+            # while we work (including while they wait in the pipeline) and handed back if we stop early
+            while batch := work_queue.lease(capacity):
+                for row in batch:
+                    yield row
+
+        async def fetch(job):
+            credit_union, url = job['CreditUnion'], job['Link']
+            site_id = site_id_from_link(url)
+            detector = None if site_id in force_rescrape else change_detector
+            if 'started' not in job:
+                if work_queue:
+                    run_state.reload(site_id) # Attempts may have been counted by another worker
+                run_state.mark_started(site_id)
+                log_message(f"Scraping data for {credit_union}", url=url, log_to_processed=False)
+                job['started'] = time.monotonic()
+            async with scheduler.slot():
+                attempt_started = time.monotonic()
+                try:
+                    if job.get('escalate'):
+                        result = await render_via_browser(pool, credit_union, url, detector)
+                    else:
+                        result = await fetch_via_http(http_pool, credit_union, url, detector)
+                        if result['status'] != "SUCCESS" and 'fragment' not in result:
+                            print(f"[HttpFetcher] {result['error_message']} for {url}, escalating to browser", file=sys.stderr)
+                            result = await render_via_browser(pool, credit_union, url, detector)
+                except Exception as e:
+                    result = {'credit_union': credit_union, 'link': url, 'rates_30_years': "None", 'best_rate': "None",
+                              'status': "ERROR", 'error_message': f"Unexpected scrape error: {e}"}
+            scheduler.observe(attempt_started, time.monotonic() - attempt_started, 'fragment' not in result and is_congestion(result))
+            if scheduler.completed % scheduler.config.window == 0:
+                log_message(f"Scheduler state: {scheduler.snapshot()}", status="INFO", log_to_processed=False)
+            return [(job, result)]
+
+        async def extract(item):
+            job, result = item
+            if 'fragment' in result:
+                result = await asyncio.to_thread(parse_fetched, result, change_detector)
+                if result['status'] != "SUCCESS":
+                    # A rate box without parsable rates: back to fetch for a browser render
+                    print(f"[HttpFetcher] {result['error_message']} for {job['Link']}, escalating to browser", file=sys.stderr)
+                    job['escalate'] = True
+                    pipeline.stage("fetch").requeue(job)
+                    return None
+            raw_page = result.pop('raw_page', None)
+            if page_archive and raw_page and result['status'] == "SUCCESS" and result.get('changed', True):
+                # The blob is written here, off the event loop; its index row is committed with the result
+                try:
+                    result['archive_hash'] = await asyncio.to_thread(page_archive.put_blob, raw_page)
+                except OSError as e:
+                    print(f"[PageArchive] Could not archive the page of {job['Link']}: {e}", file=sys.stderr)
+            result['duration'] = round(time.monotonic() - job['started'], 3)
+            return [result]
+
+        async def store(results):
+            # Synchronous from BEGIN to COMMIT, so nothing else writes on the shared connection in
+            # between; every result gets a savepoint so one failure only drops that result. Whatever
+            # goes wrong, the transaction is closed before returning, or every later batch would fail
+            # at BEGIN on the shared connection
+            store_started = time.perf_counter()
+            rate_store.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for scrape_result in results:
+                    rate_store.conn.execute("SAVEPOINT stored_result")
+                    try:
+                        handle_scrape_result(scrape_result)
+                    except Exception as e: # sqlite3.Error, or a malformed result
+                        # Leave the siteId unfinished (a later run or worker retries it) rather than commit half a result
+                        discard_result(site_id_from_link(scrape_result.get('link', '')))
+                        log_message(f"Error storing the result for {scrape_result.get('credit_union')}: {e}", status="ERROR", url=scrape_result.get('link', ''), log_to_processed=True)
+                    rate_store.conn.execute("RELEASE stored_result")
+                rate_store.conn.commit()
+            except Exception as e:
+                rate_store.conn.rollback()
+                rate_store.forget_cached_ids()
+                run_state.load()
+                market_updates.clear()
+                for scrape_result in results:
+                    change_detector.reload(site_id_from_link(scrape_result.get('link', '')))
+                log_message(f"Error committing a batch of {len(results)} results: {e}", status="ERROR", log_to_processed=True)
+                METRICS.observe("store_write", time.perf_counter() - store_started, outcome="error")
+                return None
+            METRICS.observe("store_write", time.perf_counter() - store_started, outcome="ok")
+            METRICS.inc("stored_results", len(results))
+            if market_updates:
+                # Only the categories these results moved are recomputed
+                try:
+                    with METRICS.timed("market_aggregate"):
+                        for site_id, programs in market_updates.items():
+                            market.update(site_id, programs)
+                        market.flush()
+                except sqlite3.Error as e:
+                    rate_store.conn.rollback() # The categories stay dirty and are written with the next batch
+                    log_message(f"Error storing the market aggregates: {e}", status="ERROR", log_to_processed=False)
+                market_updates.clear()
+            return [len(results)]
+
+        stored_batches = []
+
+        async def collect(stored):
+            stored_batches.append(stored)
+
+        async def publish_all():
+            await publish(len(stored_batches))
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(work_queue.lease_seconds / 3)
+                work_queue.heartbeat()
+
+        pipeline = Pipeline([
+            Stage("fetch", fetch, workers=scheduler.config.max_concurrency, capacity=capacity),
+            Stage("extract", extract, workers=EXTRACT_WORKERS, capacity=capacity),
+            Stage("store", store, capacity=STORE_BATCH_SIZE * 2, batch_size=STORE_BATCH_SIZE),
+            Stage("publish", collect, flush=publish_all),
+        ], source_name="directory", report=lambda snapshot: log_message(f"Pipeline: {format_snapshot(snapshot)}", status="INFO", log_to_processed=False),
+            report_interval=PIPELINE_REPORT_INTERVAL)
+
+        async with BrowserPool(concurrency=scheduler.config.max_concurrency, browsers=browsers, router=RequestRouter.from_env()) as pool:
+            heartbeat_task = asyncio.create_task(heartbeat()) if work_queue else None
+            try:
+                await pipeline.run(directory_rows())
+            finally:
+                if heartbeat_task:
+                    heartbeat_task.cancel()
+                    work_queue.release()
+                if pool.started:
+                    run_summary['browsers'] = pool.snapshot()
+                    log_message(f"Browser pool final: {run_summary['browsers']}", status="INFO", log_to_processed=False)
+                run_summary['pipeline'] = pipeline.snapshot()
+                run_summary['bottleneck'] = pipeline.bottleneck()
+                log_message(f"Pipeline final: {format_snapshot(run_summary['pipeline'])}; bottleneck: {run_summary['bottleneck'] or 'none'}", status="INFO", log_to_processed=False)
+        run_summary['scheduler'] = scheduler.snapshot()
+        log_message(f"Scheduler final state: {run_summary['scheduler']}", status="INFO", log_to_processed=False)
+
+    run_summary = {}
+
     try:
-        convert_script_path = os.path.join(script_dir, "convert_csv_to_html.py")
-        cmd = [venv_python_path, convert_script_path]
-        subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
-        log_message("CSV to HTML conversion complete.", status="SUCCESS", log_to_processed=False)
-    except subprocess.CalledProcessError as e:
-        log_message(f"Error converting CSV to HTML: Stderr: {e.stderr}", status="ERROR", log_to_processed=False)
-    except subprocess.TimeoutExpired:
-        log_message("CSV to HTML conversion timed out.", status="ERROR", log_to_processed=False)
-    except FileNotFoundError:
-        log_message("Error: convert_csv_to_html.py script not found.", status="ERROR", log_to_processed=False)
+        asyncio.run(scrape_pending())
     except Exception as e:
-        log_message(f"An unexpected error occurred during HTML conversion: {e}", status="ERROR", log_to_processed=False)
+        log_message(f"An unexpected error occurred in the scrape pipeline: {e}", status="ERROR", log_to_processed=False)
+    if not published:
+        # The pipeline broke before its publish stage ran; still publish what was stored
+        asyncio.run(publish(0))
+    run_summary.update({'tiers': tier_counts, 'changes': change_counts, 'run_state': run_state.counts()})
+    try:
+        METRICS.write(f"{metrics_prefix}.prom", f"{metrics_prefix}.json", {'run_date': current_date_str, 'worker_id': worker_id, 'run': run_summary})
+        log_message(f"Metrics written to {metrics_prefix}.prom and {metrics_prefix}.json", status="INFO", log_to_processed=False)
+    except OSError as e:
+        log_message(f"Could not write metrics: {e}", status="ERROR", log_to_processed=False)
+    flush_logs()
+    http_pool.close()
+    rate_store.close()
+    return run_summary
 
 if __name__ == "__main__":
-    # Set a limit for the number of scrapes per run to avoid resource exhaustion
-    # The script will pick up where it left off on subsequent runs due to processed.log
-    MAX_SCRAPES_PER_RUN = 10  # You can adjust this value
-    scrape_mortgage_data("mortgage_rates.csv", max_scrapes_per_run=MAX_SCRAPES_PER_RUN)
+    parser = argparse.ArgumentParser(description="Scrape mortgage rates of every credit union")
+    parser.add_argument("--worker", nargs="?", const="", default=None, metavar="WORKER_ID",
+                        help="Run as one of several workers sharing the day's siteIds through the work queue (default id: host-pid)")
+    args = parser.parse_args()
+    # Upper bound on credit unions scraped at once; the adaptive scheduler picks the actual
+    # pace below it (SCRAPE_MAX_RATE, SCRAPE_TARGET_LATENCY, ... tune its targets)
+    # The script will pick up where it left off on subsequent runs due to the run_state table
+    CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", DEFAULT_CONCURRENCY))
+    worker_id = None if args.worker is None else (args.worker or default_worker_id())
+    scrape_mortgage_data("mortgage_rates.csv", concurrency=CONCURRENCY, worker_id=worker_id)
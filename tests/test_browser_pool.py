@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "playwright"))
+try:
+    from browser_pool import BrowserPool
+    from browser_governor import BrowserGovernor, GovernorConfig
+except ImportError: # Playwright is not installed
+    BrowserPool = None
+
+class FakeContext:
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        pass
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+@unittest.skipIf(BrowserPool is None, "Playwright is not installed")
+class BrowserPoolRecycleTest(unittest.IsolatedAsyncioTestCase):
+    async def test_recycled_browser_is_replaced(self):
+        governor = BrowserGovernor(GovernorConfig(pages_per_browser=1, browser_rss_mb=float('inf')))
+        pool = BrowserPool(concurrency=2, browsers=2, governor=governor)
+        pool._playwright = FakePlaywright()
+        await pool.start()
+        self.assertEqual(len(pool._browsers), 2)
+        first = pool._browsers[0]
+
+        async with pool.page() as slot:
+            self.assertIs(slot.handle, first)
+
+        self.assertEqual(governor.recycles, {'pages': 1})
+        self.assertEqual(len(pool._browsers), 2)
+        self.assertNotIn(first, pool._browsers)
+        self.assertEqual(pool._retiring, [])
+        self.assertTrue(first.browser.closed)
+        self.assertEqual(len(pool._playwright.chromium.launched), 3)
+        await pool.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_store import RateStore
+from run_state import RunState
+try:
+    from market_aggregates import MarketAggregates, read_aggregates, rebuild
+except ImportError: # NumPy is not installed
+    MarketAggregates = None
+
+LINK = "https://mortgages.cumortgage.net/default.asp?siteId="
+
+def record(store, run_date, site_id, rate):
+    program = f"30 Year Fixed-{rate}"
+    store.record(run_date, {'CreditUnion': f"Credit Union {site_id}", 'Link': f"{LINK}{site_id}", 'Rates': program, 'BestRate': program})
+
+@unittest.skipIf(MarketAggregates is None, "NumPy is not installed")
+class MarketMembershipTest(unittest.TestCase):
+    def setUp(self):
+        self.store = RateStore(":memory:")
+        # Day 1: A and B exported. Day 2: A unchanged, B failed, C new.
+        record(self.store, "2026-03-01", "A", "5.000%")
+        record(self.store, "2026-03-01", "B", "6.000%")
+        day1 = RunState(self.store.conn, "2026-03-01")
+        day1.mark_success("A", 1.0)
+        day1.mark_success("B", 1.0)
+        record(self.store, "2026-03-02", "C", "7.000%")
+        day2 = RunState(self.store.conn, "2026-03-02")
+        day2.mark_unchanged("A", 1.0)
+        day2.mark_failure("B", 1.0, "TimeoutError")
+        day2.mark_success("C", 1.0)
+
+    def tearDown(self):
+        self.store.close()
+
+    def stats(self, run_date):
+        return read_aggregates(self.store.conn, run_date)['conventional30']
+
+    def test_rebuild_uses_each_day_s_exported_credit_unions(self):
+        self.assertEqual(rebuild(self.store, "2026-03-01", "2026-03-02"), 2)
+        day1, day2 = self.stats("2026-03-01"), self.stats("2026-03-02")
+        self.assertEqual((day1['creditUnions'], day1['min'], day1['max']), (2, 5000, 6000))
+        self.assertEqual((day2['creditUnions'], day2['min'], day2['max']), (2, 5000, 7000))
+
+    def test_reseed_clears_credit_unions_left_out(self):
+        market = MarketAggregates(self.store.conn, "2026-03-02")
+        market.seed(self.store, ["A", "B", "C"])
+        self.assertEqual(self.stats("2026-03-02")['creditUnions'], 3)
+        market.seed(self.store, ["A"])
+        self.assertEqual(self.stats("2026-03-02")['creditUnions'], 1)
+
+    def test_day_without_run_state_uses_every_credit_union_with_rates(self):
+        MarketAggregates(self.store.conn, "2026-03-05").seed(self.store)
+        self.assertEqual(self.stats("2026-03-05")['creditUnions'], 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from payment_engine import PaymentEngine, monthly_payments_by_position
+
+def program(numeric_rate, year_term="30 Years"):
+    return {'numericRate': numeric_rate, 'yearTerm': year_term}
+
+# Sheet 0 has a program without a numeric rate; sheet 1 is shorter, so its second slot is padding
+SHEETS = [
+    [program(None), program(5.0)],
+    [program(6.0)],
+]
+PRINCIPALS = [320000.0]
+
+class PaymentEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = PaymentEngine(SHEETS, lambda rate: ['conventional30'])
+
+    def test_non_numeric_rate_and_padding_are_nan(self):
+        schedule = self.engine.schedule(PRINCIPALS)
+        for key, values in schedule.items():
+            self.assertTrue(np.isnan(values[0, 0, 0]), key)
+            self.assertTrue(np.isnan(values[1, 1, 0]), key)
+        self.assertAlmostEqual(schedule['monthly'][0, 1, 0], 1717.83, places=2)
+
+    def test_zero_rate_is_principal_over_term(self):
+        schedule = PaymentEngine([[program(0.0)]]).schedule(PRINCIPALS)
+        self.assertAlmostEqual(schedule['monthly'][0, 0, 0], 320000 / 360)
+        self.assertAlmostEqual(schedule['total_interest'][0, 0, 0], 0)
+
+    def test_rank_skips_programs_without_a_rate(self):
+        for category in (None, 'conventional30'):
+            order, cost, chosen = self.engine.rank(PRINCIPALS, [0, 1], category)
+            self.assertEqual(chosen[:, 0].tolist(), [1, 0], category)
+            self.assertEqual(order[:, 0].tolist(), [0, 1], category)
+            self.assertTrue(np.all(np.isfinite(cost)), category)
+
+    def test_rank_of_a_sheet_without_rates(self):
+        engine = PaymentEngine([[program(None)], [program(5.0), program(6.0)]])
+        order, cost, chosen = engine.rank(PRINCIPALS, [0, 1])
+        self.assertEqual(chosen[:, 0].tolist(), [-1, 0])
+        self.assertTrue(np.isinf(cost[0, 0]))
+        self.assertEqual(order[:, 0].tolist(), [1, 0])
+
+    def test_monthly_payments_by_position(self):
+        self.assertEqual(monthly_payments_by_position(self.engine, SHEETS, PRINCIPALS), [[-1, 1718, 1919]])
+
+if __name__ == "__main__":
+    unittest.main()
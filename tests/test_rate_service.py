@@ -0,0 +1,71 @@
+import os
+import sys
+import csv
+import json
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_service import RateIndex, RateService, serve
+
+ROWS = [
+    ("Alpha Credit Union", "A1", "30 Year Fixed-5.375%|15 Year Fixed-4.750%"),
+    ("Beta Federal Credit Union", "B2", "30 Year Fixed-5.500%"),
+    ("Gamma Credit Union", "C3", "Jumbo 30 Year Fixed-6.375%"),
+]
+
+def write_csv(path):
+    with open(path, mode='w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['CreditUnion', 'Link', 'Rates', 'BestRate'])
+        for name, site_id, rates in ROWS:
+            writer.writerow([name, f"https://mortgages.cumortgage.net/default.asp?siteId={site_id}", rates, "None"])
+
+class RateIndexSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "mortgage_rates.csv")
+        write_csv(self.csv_path)
+        self.index = RateIndex.load(self.csv_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def names(self, results):
+        return [result['creditUnion'] for result in results]
+
+    def test_empty_query_matches_every_credit_union(self):
+        self.assertEqual(self.names(self.index.search("")), [name for name, _, _ in ROWS])
+        self.assertEqual(self.names(self.index.search("   ", limit=2)), [name for name, _, _ in ROWS[:2]])
+        self.assertEqual(self.names(self.index.search("", mode="prefix")), [name for name, _, _ in ROWS])
+
+    def test_substring_match_in_the_last_name(self):
+        self.assertEqual(self.names(self.index.search("gamma")), ["Gamma Credit Union"])
+        self.assertEqual(self.names(self.index.search("credit union")), [name for name, _, _ in ROWS])
+
+    def test_query_does_not_span_two_names(self):
+        self.assertEqual(self.names(self.index.search("union\nbeta")), [])
+
+class RateServiceSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(self.directory.name, "mortgage_rates.csv")
+        write_csv(csv_path)
+        self.server = serve(RateService(csv_path), port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_search_without_q(self):
+        host, port = self.server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/search", timeout=5) as response:
+            payload = json.load(response)
+        self.assertEqual([result['creditUnion'] for result in payload['results']], [name for name, _, _ in ROWS])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_store import RateStore
+
+LINK = "https://mortgages.cumortgage.net/default.asp?siteId="
+
+def row(site_id, rates, best_rate="None"):
+    return {'CreditUnion': f"Credit Union {site_id}", 'Link': f"{LINK}{site_id}", 'Rates': rates, 'BestRate': best_rate}
+
+class RatesOnTest(unittest.TestCase):
+    def setUp(self):
+        self.store = RateStore(":memory:")
+        self.store.record("2026-03-01", row("A", "30 Year Fixed-5.375%", "30 Year Fixed-5.375%"))
+        self.store.record("2026-03-01", row("B", "30 Year Fixed-5.500%", "30 Year Fixed-5.500%"))
+
+    def tearDown(self):
+        self.store.close()
+
+    def site_ids_on(self, run_date):
+        return sorted({site_id for site_id, _, _, _, _ in self.store.rates_on(run_date)})
+
+    def test_unchanged_rates_stay_in_effect(self):
+        self.assertEqual(self.site_ids_on("2026-03-10"), ["A", "B"])
+
+    def test_credit_union_that_left_the_directory(self):
+        self.assertEqual(self.store.end(["B", "unknown"], "2026-03-05"), 1)
+        self.assertEqual(self.site_ids_on("2026-03-04"), ["A", "B"])
+        self.assertEqual(self.site_ids_on("2026-03-05"), ["A"])
+        self.assertEqual(self.site_ids_on("2026-03-10"), ["A"])
+        # Back in the directory: its next stored result is in effect again
+        self.store.record("2026-03-12", row("B", "30 Year Fixed-5.250%", "30 Year Fixed-5.250%"))
+        self.assertEqual(self.site_ids_on("2026-03-12"), ["A", "B"])
+
+    def test_result_without_rates_ends_the_history(self):
+        self.store.record("2026-03-05", row("A", "None"))
+        self.assertEqual(self.site_ids_on("2026-03-10"), ["B"])
+        self.assertEqual([r['Rates'] for r in self.store.latest_rows("2026-03-10") if r['Link'].endswith("A")], ["None"])
+
+class SheetHistoryMigrationTest(unittest.TestCase):
+    def test_history_without_end_markers_is_migrated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, "rates.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE sheet_history (
+                    credit_union_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    sheet_id INTEGER NOT NULL,
+                    PRIMARY KEY (credit_union_id, day)
+                ) WITHOUT ROWID""")
+            conn.execute("CREATE INDEX sheet_history_by_day ON sheet_history (day, credit_union_id)")
+            conn.commit()
+            conn.close()
+
+            store = RateStore(db_path)
+            store.record("2026-03-01", row("A", "30 Year Fixed-5.375%", "30 Year Fixed-5.375%"))
+            store.end(["A"], "2026-03-02")
+            self.assertEqual(store.rates_on("2026-03-02"), [])
+            self.assertEqual(len(store.rates_on("2026-03-01")), 1)
+            self.assertEqual([column[3] for column in store.conn.execute("PRAGMA table_info(sheet_history)") if column[1] == 'sheet_id'], [0])
+            store.close()
+
+if __name__ == "__main__":
+    unittest.main()
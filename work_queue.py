@@ -0,0 +1,125 @@
+import os
+import time
+import socket
+import datetime
+from run_state import STATUS_RETRY
+
+QUEUE_PENDING = "PENDING"
+QUEUE_LEASED = "LEASED"
+QUEUE_DONE = "DONE"
+
+DEFAULT_LEASE_SECONDS = 300
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """Shared per-day queue of siteIds in the rate store's SQLite database, so any
+    number of worker processes (or hosts sharing the file) can split a run. A worker
+    leases a batch of siteIds, heartbeats while it scrapes them, and finishes each one
+    in the same transaction as its result; a lease that is not renewed expires and
+    the siteId is handed to the next worker that asks for work."""
+
+    def __init__(self, conn, run_date: str, worker_id: str | None = None, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.conn = conn
+        self.run_date = run_date
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS work_queue (
+                run_date TEXT NOT NULL,
+                site_id TEXT NOT NULL,
+                credit_union TEXT NOT NULL,
+                link TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker_id TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                next_eligible REAL NOT NULL DEFAULT 0,
+                leases INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_date, site_id)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS work_queue_by_status ON work_queue (run_date, status, next_eligible)")
+        self.conn.commit()
+
+    def _now_iso(self):
+        return datetime.datetime.now().isoformat(timespec='seconds')
+
+    def enqueue(self, rows, site_ids) -> int:
+        """Add [{'CreditUnion', 'Link'}] rows; siteIds already queued today are left as they are,
+        so every worker can enqueue the same directory."""
+        added = self.conn.executemany("""
+            INSERT OR IGNORE INTO work_queue (run_date, site_id, credit_union, link, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            [(self.run_date, site_id, row['CreditUnion'], row['Link'], QUEUE_PENDING, self._now_iso())
+             for row, site_id in zip(rows, site_ids)]).rowcount
+        self.conn.commit()
+        return added
+
+    def remove(self, site_ids):
+        """Drop queued siteIds that left the directory (unless a worker holds them)."""
+        self.conn.executemany("DELETE FROM work_queue WHERE run_date = ? AND site_id = ? AND status != ?",
+                              [(self.run_date, site_id, QUEUE_LEASED) for site_id in site_ids])
+        self.conn.commit()
+
+    def lease(self, limit: int, now: float | None = None) -> list:
+        """Atomically take up to `limit` eligible siteIds: pending ones past their retry time
+        and leased ones whose lease expired. Returns [{'CreditUnion', 'Link'}] rows."""
+        now = now if now is not None else time.time()
+        # One UPDATE ... RETURNING statement, so two workers can never lease the same row
+        rows = self.conn.execute("""
+            UPDATE work_queue SET status = ?, worker_id = ?, lease_expires = ?, leases = leases + 1, updated_at = ?
+            WHERE rowid IN (
+                SELECT rowid FROM work_queue
+                WHERE run_date = ? AND ((status = ? AND next_eligible <= ?) OR (status = ? AND lease_expires < ?))
+                ORDER BY next_eligible, rowid
+                LIMIT ?)
+            RETURNING credit_union, link""",
+            (QUEUE_LEASED, self.worker_id, now + self.lease_seconds, self._now_iso(),
+             self.run_date, QUEUE_PENDING, now, QUEUE_LEASED, now, limit)).fetchall()
+        self.conn.commit()
+        return [{'CreditUnion': credit_union, 'Link': link} for credit_union, link in rows]
+
+    def heartbeat(self, now: float | None = None) -> int:
+        """Extend every lease this worker holds; returns how many it still holds."""
+        now = now if now is not None else time.time()
+        renewed = self.conn.execute(
+            "UPDATE work_queue SET lease_expires = ? WHERE run_date = ? AND worker_id = ? AND status = ?",
+            (now + self.lease_seconds, self.run_date, self.worker_id, QUEUE_LEASED)).rowcount
+        self.conn.commit()
+        return renewed
+
+    def finish(self, site_id: str, site_state, commit: bool = True) -> bool:
+        """Settle a leased siteId from its run state: a RETRY goes back to pending until its
+        next eligible time, anything else is done for the day. False (and nothing is
+        changed) when this worker no longer holds the lease; the caller should then roll
+        back the result it wrote in the same transaction."""
+        retry = site_state is not None and site_state.status == STATUS_RETRY
+        updated = self.conn.execute("""
+            UPDATE work_queue SET status = ?, worker_id = NULL, lease_expires = 0, next_eligible = ?, updated_at = ?
+            WHERE run_date = ? AND site_id = ? AND worker_id = ? AND status = ?""",
+            (QUEUE_PENDING if retry else QUEUE_DONE, site_state.next_eligible if retry else 0, self._now_iso(),
+             self.run_date, site_id, self.worker_id, QUEUE_LEASED)).rowcount
+        if commit:
+            self.conn.commit()
+        return updated == 1
+
+    def release(self):
+        """Hand back every lease this worker still holds (e.g. on shutdown)."""
+        self.conn.execute("""
+            UPDATE work_queue SET status = ?, worker_id = NULL, lease_expires = 0, updated_at = ?
+            WHERE run_date = ? AND worker_id = ? AND status = ?""",
+            (QUEUE_PENDING, self._now_iso(), self.run_date, self.worker_id, QUEUE_LEASED))
+        self.conn.commit()
+
+    def counts(self) -> dict:
+        return dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM work_queue WHERE run_date = ? GROUP BY status", (self.run_date,)))
+
+    def remaining(self, now: float | None = None) -> int:
+        """siteIds of today leased by any worker or waiting to be leased right now; retries
+        scheduled for later do not count, they are picked up by a later run."""
+        now = now if now is not None else time.time()
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM work_queue WHERE run_date = ? AND (status = ? OR (status = ? AND next_eligible <= ?))",
+            (self.run_date, QUEUE_LEASED, QUEUE_PENDING, now)).fetchone()[0]